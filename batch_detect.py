@@ -0,0 +1,175 @@
+"""Headless batch re-run of damage detection over a captures directory.
+
+Usage:
+    python batch_detect.py [captures_dir] [--workers N] [--canny-low 50 ...] [--force] [--catalog PATH]
+
+Each `capture_<id>.png` (or .jpg/.webp, depending on the encoding profile)
+holds the frame as it was on screen. Detection re-runs on the capture's
+`capture_<id>_raw.*` frame without HUD or guide overlay when there is one,
+so it sees exactly what the capture pipeline detected on. Captures are
+processed on a process pool and each `capture_<id>_det.*` is rewritten in
+the same format, along with the damage regions in `capture_<id>.json`. A
+capture is skipped when its detection image is newer than the frame it is
+detected on and was produced with the current detector settings. The
+rewritten metadata is upserted into the capture catalog. Progress is
+streamed to stdout and per-file timings are written as CSV.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from PIL import Image
+from config import CAPTURE_DIR, CAPTURE_CATALOG_PATH, DETECTOR_SETTINGS
+from capture_bundle import EXTENSIONS
+from capture_catalog import CaptureCatalog, capture_id_from_path
+from image_processing import (detect_damage, detect_damage_roi, detector_fingerprint,
+                              detector_save_params, read_detector_fingerprint)
+
+FORMATS = {ext: fmt for fmt, ext in EXTENSIONS.items()}
+
+
+def find_captures(root):
+    """Return all source capture images below `root`, oldest name first."""
+    return sorted(p for p in Path(root).rglob("capture_*")
+                  if p.suffix in FORMATS and not p.stem.endswith(("_det", "_raw")))
+
+def detection_source(src):
+    """The overlay-free `_raw` frame of `src` if it has one, else `src` itself."""
+    for ext in FORMATS:
+        raw = src.with_name(f"{src.stem}_raw{ext}")
+        if raw.exists():
+            return raw
+    return src
+
+def det_path(src):
+    """The existing detection image for `src` in any format, else a new one beside it."""
+    for ext in FORMATS:
+        det = src.with_name(f"{src.stem}_det{ext}")
+        if det.exists():
+            return det
+    return src.with_name(f"{src.stem}_det{src.suffix}")
+
+def is_up_to_date(src, fingerprint):
+    """True if the detection image is newer than the frame it is detected on and matches the settings."""
+    det = det_path(src)
+    if not det.exists() or det.stat().st_mtime < detection_source(src).stat().st_mtime:
+        return False
+    return read_detector_fingerprint(det) == fingerprint
+
+def capture_meta(src):
+    """The capture's JSON metadata, or None if it has none."""
+    try:
+        with open(src.with_suffix(".json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def process_capture(src, settings):
+    """Worker: run detection on one capture (within its ROI, if it has one) and return its timings in ms.
+
+    The damage regions in the capture's JSON metadata are updated as well;
+    the updated metadata is returned under "meta" (None without metadata).
+    """
+    t0 = time.perf_counter()
+    with Image.open(detection_source(src)) as im:
+        rgb = im.convert("RGB")
+    meta = capture_meta(src)
+    roi = meta.get("roi") if meta else None
+    t1 = time.perf_counter()
+    if roi:
+        damage, _ = detect_damage_roi(rgb, roi, lambda crop: detect_damage(crop, settings))
+    else:
+        damage = detect_damage(rgb, settings)
+    t2 = time.perf_counter()
+    out = det_path(src)
+    fmt = FORMATS[out.suffix]
+    damage.image.convert("RGB").save(out, format=fmt, **detector_save_params(fmt, settings))
+    if meta is not None:
+        # Captures from before capture ids only carry theirs in the file name
+        meta.setdefault("capture_id", capture_id_from_path(src.with_suffix(".json")))
+        meta["damage"] = damage.to_meta()
+        with open(src.with_suffix(".json"), "w") as f:
+            json.dump(meta, f, separators=(",", ":"))
+    t3 = time.perf_counter()
+    return {
+        "file": str(src),
+        "meta": meta,
+        "load_ms": (t1 - t0) * 1000,
+        "detect_ms": (t2 - t1) * 1000,
+        "save_ms": (t3 - t2) * 1000,
+        "total_ms": (t3 - t0) * 1000
+    }
+
+def run_batch(root, settings=None, workers=None, force=False, timings_path=None, out=sys.stdout,
+              catalog=None):
+    """Reprocess every stale capture below `root`. Returns the list of timing rows.
+
+    With a `catalog`, the rewritten metadata of each capture is upserted into it.
+    """
+    fingerprint = detector_fingerprint(settings)
+    sources = find_captures(root)
+    todo = [src for src in sources if force or not is_up_to_date(src, fingerprint)]
+    out.write(f"{len(sources)} captures, {len(sources) - len(todo)} up to date, {len(todo)} to process\n")
+
+    rows = []
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process_capture, src, settings): src for src in todo}
+        for n, future in enumerate(as_completed(futures), 1):
+            src = futures[future]
+            try:
+                row = future.result()
+                row["status"] = "ok"
+                meta = row.pop("meta")
+                if catalog is not None and meta is not None:
+                    catalog.add(meta, src.with_suffix(".json"))
+            except Exception as exc:
+                row = {"file": str(src), "status": f"error: {exc}"}
+            rows.append(row)
+            out.write(f"[{n}/{len(todo)}] {src.name} {row['status']}"
+                      + (f" {row['total_ms']:.1f} ms" if "total_ms" in row else "") + "\n")
+            out.flush()
+
+    elapsed = time.perf_counter() - t0
+    if todo:
+        out.write(f"Processed {len(todo)} captures in {elapsed:.2f}s "
+                  f"({len(todo) / elapsed:.1f}/s)\n")
+
+    if timings_path and rows:
+        fields = ["file", "status", "load_ms", "detect_ms", "save_ms", "total_ms"]
+        with open(timings_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        out.write(f"Timings written to {timings_path}\n")
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-run damage detection over saved captures.")
+    parser.add_argument("captures", nargs="?", default=str(CAPTURE_DIR), help="captures directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--force", action="store_true", help="reprocess up-to-date captures too")
+    parser.add_argument("--catalog", type=Path, default=CAPTURE_CATALOG_PATH,
+                        help="capture catalog to update (default: %(default)s)")
+    parser.add_argument("--timings", default=None,
+                        help="CSV file for per-file timings (default: <captures>/batch_timings.csv)")
+    for key, default in DETECTOR_SETTINGS.items():
+        parser.add_argument("--" + key.replace("_", "-"), dest=key, type=type(default), default=default)
+    args = parser.parse_args(argv)
+
+    settings = {key: getattr(args, key) for key in DETECTOR_SETTINGS}
+    timings = args.timings or str(Path(args.captures) / "batch_timings.csv")
+    catalog = CaptureCatalog(args.catalog) if args.catalog else None
+    try:
+        run_batch(args.captures, settings, args.workers, args.force, timings, catalog=catalog)
+    finally:
+        if catalog is not None:
+            catalog.close()
+
+
+if __name__ == "__main__":
+    main()
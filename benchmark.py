@@ -0,0 +1,253 @@
+"""Headless benchmarks for the rendering and capture hot paths.
+
+Usage:
+    python benchmark.py [--output bench.json] [--quick]
+    python benchmark.py --compare baseline.json [--threshold 0.15]
+
+No display is needed: only PIL/NumPy/OpenCV code paths are exercised. The
+real background image is used wherever the benchmark is run from. Results
+are written as JSON together with machine info. With --compare the run is
+checked against a stored baseline and the exit status is 1 if any case's
+median got slower than the threshold allows.
+"""
+import argparse
+import itertools
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from PIL import Image
+from config import (CANVAS_WIDTH, CANVAS_HEIGHT, DEFAULT_IPD, DEFAULT_LENS_W_RATIO,
+                    DEFAULT_LENS_H_RATIO, IPD_RANGE, LENS_W_RANGE, LENS_H_RANGE,
+                    CAPTURE_ENCODING_PROFILES, RESOLUTION_TIERS, IMAGE_PATH)
+from capture_pipeline import encode_image
+from compositor import FrameCompositor
+from lens_effect import LensEffect
+from offscreen_renderer import OffscreenRenderer, default_lens_params
+import image_processing
+from image_processing import load_background_image, detect_damage_edges, detection_engine
+from perf_stats import machine_info
+from ui_components import GlassesOverlay
+
+DETECT_SIZES = [(1000, 520), (1920, 1080), (3840, 2160)]
+DETECT_ENGINES = ["cv2", "numpy", "pil"]
+GRID_STRIDE = (8, 2, 2)     # combined slider grid: every 8th IPD value, every 2nd lens ratio
+BACKGROUND = Path(__file__).resolve().parent / IMAGE_PATH
+
+
+def time_call(fn, repeat=5, warmup=1):
+    """Run `fn` several times and return timing statistics in ms."""
+    for _ in range(warmup):
+        fn()
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+    return {
+        "runs": len(runs),
+        "min_ms": min(runs),
+        "median_ms": statistics.median(runs),
+        "mean_ms": statistics.fmean(runs)
+    }
+
+def slider_values(value_range):
+    lo, hi, res = value_range
+    n = int(round((hi - lo) / res))
+    return [round(lo + i * res, 2) for i in range(n + 1)]
+
+def bench_overlay(results, bg, quick=False):
+    """GlassesOverlay rendering (uncached): each slider swept across its full range with the
+    others at their defaults, and all sliders combined over a strided grid of their values."""
+    overlay = GlassesOverlay((CANVAS_WIDTH, CANVAS_HEIGHT), cache_size=0)
+    stride = [s * 2 for s in GRID_STRIDE] if quick else GRID_STRIDE
+    sweeps = {
+        "ipd": [(v, DEFAULT_LENS_W_RATIO, DEFAULT_LENS_H_RATIO) for v in slider_values(IPD_RANGE)],
+        "lens_w": [(DEFAULT_IPD, v, DEFAULT_LENS_H_RATIO) for v in slider_values(LENS_W_RANGE)],
+        "lens_h": [(DEFAULT_IPD, DEFAULT_LENS_W_RATIO, v) for v in slider_values(LENS_H_RANGE)],
+        "grid": list(itertools.product(*(slider_values(r)[::s] for r, s in
+                                          zip((IPD_RANGE, LENS_W_RANGE, LENS_H_RANGE), stride))))
+    }
+    for name, params in sweeps.items():
+        if quick and name != "grid":
+            params = params[::4]
+        per_call = []
+        for p in params:
+            t0 = time.perf_counter()
+            overlay.generate(*p)
+            per_call.append((time.perf_counter() - t0) * 1000)
+        results[f"overlay.generate[{name}]"] = {
+            "runs": len(per_call),
+            "min_ms": min(per_call),
+            "median_ms": statistics.median(per_call),
+            "mean_ms": statistics.fmean(per_call)
+        }
+
+    cached = GlassesOverlay((CANVAS_WIDTH, CANVAS_HEIGHT))
+    results["overlay.generate[cached]"] = time_call(
+        lambda: cached.generate(DEFAULT_IPD, DEFAULT_LENS_W_RATIO, DEFAULT_LENS_H_RATIO), repeat=50)
+
+def bench_composite(results, bg, quick=False):
+    """Full alpha composite versus the dirty-rectangle compositor, one slider step at a time."""
+    repeat = 5 if quick else 20
+    gen = GlassesOverlay((CANVAS_WIDTH, CANVAS_HEIGHT))
+    ov_a, _ = gen.generate(DEFAULT_IPD, DEFAULT_LENS_W_RATIO, DEFAULT_LENS_H_RATIO)
+
+    rgba = bg.convert("RGBA")
+    results["composite.full"] = time_call(lambda: Image.alpha_composite(rgba, ov_a), repeat=repeat)
+
+    steps = {
+        "lens_h": (DEFAULT_LENS_W_RATIO, DEFAULT_LENS_H_RATIO + 0.01),
+        "lens_w": (DEFAULT_LENS_W_RATIO + 0.01, DEFAULT_LENS_H_RATIO),
+    }
+    for name, (lens_w, lens_h) in steps.items():
+        toggle = [(DEFAULT_IPD, DEFAULT_LENS_W_RATIO, DEFAULT_LENS_H_RATIO), (DEFAULT_IPD, lens_w, lens_h)]
+        comp = FrameCompositor(bg)
+        comp.compose(gen.generate(*toggle[0])[0])
+        def step():
+            toggle.reverse()
+            comp.compose(gen.generate(*toggle[0])[0], gen.changed_boxes(toggle[1], toggle[0]))
+        results[f"composite.dirty[{name} step]"] = time_call(step, repeat=repeat)
+        results[f"composite.boxes[{name} step]"] = time_call(
+            lambda: gen.changed_boxes(*toggle), repeat=repeat)
+    results["composite.dirty[unchanged]"] = time_call(
+        lambda: comp.compose(gen.generate(*toggle[0])[0], []), repeat=repeat)
+
+def bench_render_scales(results, bg, quick=False):
+    """Base frame (glasses + composite, upscaled) at each dynamic resolution tier."""
+    repeat = 5 if quick else 20
+    heights = [DEFAULT_LENS_H_RATIO, DEFAULT_LENS_H_RATIO + 0.01]
+    backgrounds = [bg, bg.transpose(Image.FLIP_LEFT_RIGHT)]
+    for scale in RESOLUTION_TIERS:
+        renderer = OffscreenRenderer(bg)
+        def lens_step():
+            heights.reverse()
+            renderer.render_base(dict(default_lens_params(), lens_h_ratio=heights[0]), scale)
+        def new_frame():
+            backgrounds.reverse()
+            renderer.set_background(backgrounds[0])
+            renderer.render_base(default_lens_params(), scale)
+        results[f"render.base[x{scale} lens_h step]"] = time_call(lens_step, repeat=repeat)
+        results[f"render.base[x{scale} new frame]"] = time_call(new_frame, repeat=repeat)
+
+def bench_lens_effect(results, bg, quick=False):
+    """Lens effect for one lens: table build (per lens size) and applying cached tables."""
+    image_processing.load_optional_modules()
+    if image_processing.np is None:
+        return
+    np = image_processing.np
+    repeat = 5 if quick else 20
+    src = np.asarray(bg.convert("RGBA"))
+    out = src.copy()
+    lens, _ = OffscreenRenderer(bg).geometry(default_lens_params())
+    w, h = lens[2] - lens[0], lens[3] - lens[1]
+    effect = LensEffect()
+    results["lens.tables"] = time_call(lambda: LensEffect().tables(w, h), repeat=2 if quick else 5)
+    results["lens.apply"] = time_call(lambda: effect.apply(src, out, lens), repeat=repeat)
+
+def bench_offscreen(results, bg, quick=False):
+    """Complete frames (overlay, HUD and mode items) from the offscreen renderer."""
+    repeat = 5 if quick else 20
+    renderer = OffscreenRenderer(bg)
+    params = default_lens_params()
+    results["render.offscreen[carscan]"] = time_call(
+        lambda: renderer.render(params, "carscan", {"guide_step": 3}), repeat=repeat)
+    results["render.offscreen[navigation]"] = time_call(
+        lambda: renderer.render(params, "navigation",
+                                {"direction": "right", "distance": "600 ft", "eta": "23 mins"}),
+        repeat=repeat)
+
+def bench_detect(results, bg, quick=False):
+    """detect_damage_edges for every available engine and frame size."""
+    sizes = DETECT_SIZES[:2] if quick else DETECT_SIZES
+    for engine in DETECT_ENGINES:
+        if detection_engine({"engine": engine}) != engine:
+            continue
+        for size in sizes:
+            img = bg.resize(size)
+            results[f"detect[{engine} {size[0]}x{size[1]}]"] = time_call(
+                lambda: detect_damage_edges(img, {"engine": engine}), repeat=2 if quick else 5)
+
+def bench_capture_io(results, bg, quick=False):
+    """Per-profile image encodes and the JSON write performed for every capture."""
+    repeat = 3 if quick else 10
+    frame = bg.convert("RGB")
+    det = detect_damage_edges(frame).convert("RGB")
+    meta = {"timestamp": 0, "mode": "carscan", "guide_step": 3, "guide_center": [500, 260],
+            "lens_params": {"ipd": DEFAULT_IPD, "lens_w_ratio": DEFAULT_LENS_W_RATIO,
+                            "lens_h_ratio": DEFAULT_LENS_H_RATIO}}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for profile in CAPTURE_ENCODING_PROFILES:
+            for name, img, detection in (("frame", frame, False), ("det", det, True)):
+                key = f"encode[{profile} {name}]"
+                results[key] = time_call(lambda: encode_image(img, profile, detection), repeat=repeat)
+                results[key]["bytes"] = encode_image(img, profile, detection)[1]["bytes"]
+        def write_json():
+            with open(tmp / "capture.json", "w") as f:
+                json.dump(meta, f, separators=(",", ":"))
+        results["capture.json"] = time_call(write_json, repeat=repeat)
+
+def run(quick=False, out=sys.stdout):
+    if not BACKGROUND.exists():
+        # load_background_image would fall back to a flat placeholder and skew every number
+        raise SystemExit(f"Background image not found: {BACKGROUND}")
+    bg = load_background_image((CANVAS_WIDTH, CANVAS_HEIGHT), BACKGROUND)
+    results = {}
+    for bench in (bench_overlay, bench_composite, bench_render_scales, bench_lens_effect, bench_offscreen, bench_detect, bench_capture_io):
+        before = set(results)
+        bench(results, bg, quick)
+        for name in results:
+            if name not in before:
+                size = f"{results[name]['bytes'] / 1024:10.0f} KiB" if "bytes" in results[name] else ""
+                out.write(f"{name:<40}{results[name]['median_ms']:10.2f} ms{size}\n")
+                out.flush()
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "quick": quick,
+        "results": results
+    }
+
+def compare(current, baseline, threshold):
+    """Return (name, base_ms, current_ms, ratio) for cases slower than threshold."""
+    regressions = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            continue
+        ratio = cur["median_ms"] / max(base["median_ms"], 1e-9)
+        if ratio > 1.0 + threshold:
+            regressions.append((name, base["median_ms"], cur["median_ms"], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark iVision rendering and capture paths.")
+    parser.add_argument("--output", default="bench_results.json", help="where to write results")
+    parser.add_argument("--quick", action="store_true", help="fewer sizes and repetitions")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON to check against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown of the median before flagging (default 0.15)")
+    args = parser.parse_args(argv)
+
+    data = run(args.quick)
+    with open(args.output, "w") as f:
+        json.dump(data, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(data, baseline, args.threshold)
+        for name, base_ms, cur_ms, ratio in regressions:
+            print(f"REGRESSION {name}: {base_ms:.2f} ms -> {cur_ms:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Append-only capture bundles: many captures in a few chunk files plus an offset index.
+
+Layout of a bundle directory:
+    chunk_00000.ivb, chunk_00001.ivb, ...   records appended back to back
+    index.bin                               fixed-size entries, one per record
+
+A record is MAGIC + header + encoded frame + encoded detection image +
+metadata JSON. The index is appended only after its record is fully
+written, so an interrupted write leaves at most an unindexed tail that is
+ignored (and truncated away by `rebuild_index`). A torn index entry is
+ignored by readers and cut off by the next `append`. A corrupt record in the
+middle of a chunk is skipped by `rebuild_index`; the records after it are kept.
+
+Usage:
+    python capture_bundle.py list <bundle_dir>
+    python capture_bundle.py export <bundle_dir> <out_dir> [id ...]
+"""
+import argparse
+import io
+import json
+import mmap
+import struct
+import threading
+import time
+from pathlib import Path
+from PIL import Image
+from config import CAPTURE_BUNDLE_CHUNK_BYTES
+
+MAGIC = b"IVCB"
+RECORD_HEADER = struct.Struct("<4sQIII")      # magic, id, raw_len, det_len, meta_len
+INDEX_ENTRY = struct.Struct("<QIQIII")        # id, chunk, offset, raw_len, det_len, meta_len
+EXTENSIONS = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp"}   # loose-file suffix per encoded format
+
+_id_lock = threading.Lock()
+_last_id = 0
+
+
+def new_capture_id():
+    """Unique, strictly increasing capture id (microseconds since the epoch)."""
+    global _last_id
+    with _id_lock:
+        _last_id = max(time.time_ns() // 1000, _last_id + 1)
+        return _last_id
+
+
+class CaptureBundle:
+    """Append-only store of captures with random access by id."""
+
+    def __init__(self, root, chunk_bytes=CAPTURE_BUNDLE_CHUNK_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.chunk_bytes = chunk_bytes
+        self._lock = threading.Lock()
+        self._index = {}
+        self._index_path = self.root / "index.bin"
+        self._load_index()
+        self._chunk_no = max((e[0] for e in self._index.values()), default=0)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, capture_id):
+        return capture_id in self._index
+
+    def ids(self):
+        """All capture ids in the bundle, ascending."""
+        return sorted(self._index)
+
+    def _chunk_path(self, n):
+        return self.root / f"chunk_{n:05d}.ivb"
+
+    def _load_index(self):
+        if not self._index_path.exists():
+            return
+        data = self._index_path.read_bytes()
+        # Ignore a torn (or still being written) last entry; only `append` cuts it off
+        for fields in INDEX_ENTRY.iter_unpack(data[:len(data) - len(data) % INDEX_ENTRY.size]):
+            self._index[fields[0]] = fields[1:]
+
+    def append(self, raw_png, det_png, meta, capture_id=None):
+        """Append one capture (encoded image bytes + metadata dict) and return its id."""
+        capture_id = capture_id or meta.get("capture_id") or new_capture_id()
+        meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+        header = RECORD_HEADER.pack(MAGIC, capture_id, len(raw_png), len(det_png), len(meta_bytes))
+
+        with self._lock:
+            if capture_id in self._index:
+                raise ValueError(f"Capture {capture_id} already in bundle")
+            chunk = self._chunk_path(self._chunk_no)
+            if chunk.exists() and chunk.stat().st_size >= self.chunk_bytes:
+                self._chunk_no += 1
+                chunk = self._chunk_path(self._chunk_no)
+
+            with open(chunk, "ab") as f:
+                offset = f.tell()
+                f.write(header)
+                f.write(raw_png)
+                f.write(det_png)
+                f.write(meta_bytes)
+
+            entry = (self._chunk_no, offset, len(raw_png), len(det_png), len(meta_bytes))
+            with open(self._index_path, "ab") as f:
+                torn = f.tell() % INDEX_ENTRY.size
+                if torn:
+                    # Torn entry from an interrupted append: cut it off so this entry stays aligned
+                    f.truncate(f.tell() - torn)
+                f.write(INDEX_ENTRY.pack(capture_id, *entry))
+            self._index[capture_id] = entry
+        return capture_id
+
+    def read(self, capture_id):
+        """Return (raw_image_bytes, det_image_bytes, meta_dict) for a capture id."""
+        chunk_no, offset, raw_len, det_len, meta_len = self._index[capture_id]
+        with open(self._chunk_path(chunk_no), "rb") as f:
+            f.seek(offset)
+            magic, rec_id, *_ = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+            if magic != MAGIC or rec_id != capture_id:
+                raise IOError(f"Corrupt bundle record for capture {capture_id}")
+            raw = f.read(raw_len)
+            det = f.read(det_len)
+            meta = json.loads(f.read(meta_len))
+        return raw, det, meta
+
+    def open_images(self, capture_id):
+        """Return (raw_image, det_image, meta) with the images decoded by PIL."""
+        raw, det, meta = self.read(capture_id)
+        return Image.open(io.BytesIO(raw)), Image.open(io.BytesIO(det)), meta
+
+    def export(self, out_dir, ids=None):
+        """Write captures back out as loose capture_<id>.png / _det.png / .json files.
+
+        Images keep the format they were encoded in, so the suffix follows the
+        capture's encoding profile.
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for capture_id in ids or self.ids():
+            raw, det, meta = self.read(capture_id)
+            encoding = meta.get("encoding", {})
+            img_ext = EXTENSIONS[encoding.get("image", {}).get("format", "PNG")]
+            det_ext = EXTENSIONS[encoding.get("detection", {}).get("format", "PNG")]
+            (out_dir / f"capture_{capture_id}{img_ext}").write_bytes(raw)
+            (out_dir / f"capture_{capture_id}_det{det_ext}").write_bytes(det)
+            with open(out_dir / f"capture_{capture_id}.json", "w") as f:
+                json.dump(meta, f, separators=(",", ":"))
+            written.append(capture_id)
+        return written
+
+    def rebuild_index(self):
+        """Recreate index.bin by scanning the chunks; returns the number of corrupt regions skipped.
+
+        A corrupt record is skipped up to the next record that checks out, so
+        later records are kept. Only an incomplete record at the end of a chunk
+        (an interrupted append) is truncated away; other unreadable bytes are
+        left in place.
+        """
+        with self._lock:
+            self._index = {}
+            entries = []
+            skipped = 0
+            for chunk in sorted(self.root.glob("chunk_*.ivb")):
+                n = int(chunk.stem.split("_")[1])
+                size = chunk.stat().st_size
+                if size == 0:
+                    continue
+                torn = None
+                with open(chunk, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    offset = 0
+                    while offset < size:
+                        record = _record_at(mm, offset, size)
+                        if record is None:
+                            resync = _resync(mm, offset, size)
+                            if resync is None:
+                                if _is_torn_tail(mm, offset, size):
+                                    torn = offset
+                                else:
+                                    skipped += 1
+                                break
+                            skipped += 1
+                            offset = resync
+                            continue
+                        rec_id, raw_len, det_len, meta_len, end = record
+                        entry = (n, offset, raw_len, det_len, meta_len)
+                        self._index[rec_id] = entry
+                        entries.append(INDEX_ENTRY.pack(rec_id, *entry))
+                        offset = end
+                if torn is not None:
+                    with open(chunk, "r+b") as f:
+                        f.truncate(torn)
+            self._index_path.write_bytes(b"".join(entries))
+            self._chunk_no = max((e[0] for e in self._index.values()), default=0)
+            return skipped
+
+
+def _record_at(mm, offset, size):
+    """(id, raw_len, det_len, meta_len, end) if a complete record starts at `offset`, else None."""
+    if offset + RECORD_HEADER.size > size:
+        return None
+    magic, rec_id, raw_len, det_len, meta_len = RECORD_HEADER.unpack_from(mm, offset)
+    end = offset + RECORD_HEADER.size + raw_len + det_len + meta_len
+    if magic != MAGIC or end > size:
+        return None
+    return rec_id, raw_len, det_len, meta_len, end
+
+def _is_torn_tail(mm, offset, size):
+    """Whether the bytes from `offset` are the start of a record cut off by the end of the chunk."""
+    if size - offset < RECORD_HEADER.size:
+        return MAGIC.startswith(mm[offset:offset + len(MAGIC)])
+    magic, _, raw_len, det_len, meta_len = RECORD_HEADER.unpack_from(mm, offset)
+    return magic == MAGIC and offset + RECORD_HEADER.size + raw_len + det_len + meta_len > size
+
+def _resync(mm, offset, size):
+    """Offset of the first record after corrupt bytes at `offset`, or None if there is none.
+
+    A candidate must be complete and followed by another record header or the
+    end of the chunk, so MAGIC bytes inside image data are not mistaken for one.
+    """
+    pos = mm.find(MAGIC, offset + 1)
+    while pos != -1:
+        record = _record_at(mm, pos, size)
+        if record is not None and (record[-1] == size or mm[record[-1]:record[-1] + len(MAGIC)] == MAGIC):
+            return pos
+        pos = mm.find(MAGIC, pos + 1)
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and export capture bundles.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_list = sub.add_parser("list", help="list capture ids and metadata")
+    p_list.add_argument("bundle")
+    p_export = sub.add_parser("export", help="export captures as loose files")
+    p_export.add_argument("bundle")
+    p_export.add_argument("out_dir")
+    p_export.add_argument("ids", nargs="*", type=int)
+    p_rebuild = sub.add_parser("rebuild-index", help="rebuild index.bin from the chunk files")
+    p_rebuild.add_argument("bundle")
+    args = parser.parse_args(argv)
+
+    bundle = CaptureBundle(args.bundle)
+    if args.command == "list":
+        for capture_id in bundle.ids():
+            _, _, meta = bundle.read(capture_id)
+            print(capture_id, meta.get("mode"), meta.get("guide_step", ""))
+    elif args.command == "export":
+        written = bundle.export(args.out_dir, args.ids or None)
+        print(f"Exported {len(written)} captures to {args.out_dir}")
+    else:
+        skipped = bundle.rebuild_index()
+        print(f"Indexed {len(bundle)} captures" + (f", skipped {skipped} corrupt regions" if skipped else ""))
+
+
+if __name__ == "__main__":
+    main()
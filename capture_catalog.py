@@ -0,0 +1,300 @@
+"""SQLite catalog of capture metadata, so captures can be found without opening every JSON file.
+
+The catalog is updated by the capture pipeline as captures are written (and
+by batch_detect.py when it re-detects them), and `rescan` picks up anything
+written or deleted behind its back. Damage region polygons stay in the
+capture files; the catalog keeps only their count and total area. Rescans are
+incremental: a directory is only listed again when its mtime changed, and
+rows of directories that no longer exist are dropped.
+
+Usage:
+    python capture_catalog.py [--rescan] [--mode carscan] [--step 3] [--since 2025-09-01]
+                              [--min-damage 1] [--min-damage-area 500] [--limit 20]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from config import CAPTURE_DIR, CAPTURE_CATALOG_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    capture_id   INTEGER NOT NULL,
+    timestamp    INTEGER,
+    mode         TEXT,
+    guide_step   INTEGER,
+    ipd          INTEGER,
+    lens_w_ratio REAL,
+    lens_h_ratio REAL,
+    damage_count INTEGER,
+    damage_area  INTEGER,
+    location     TEXT NOT NULL,
+    meta         TEXT NOT NULL,
+    directory    TEXT NOT NULL,
+    PRIMARY KEY (directory, capture_id)     -- ids are only unique per directory (copied bundles)
+);
+CREATE INDEX IF NOT EXISTS captures_mode_step ON captures (mode, guide_step, capture_id);
+CREATE INDEX IF NOT EXISTS captures_time ON captures (timestamp);
+CREATE INDEX IF NOT EXISTS captures_lens ON captures (ipd, lens_w_ratio, lens_h_ratio);
+CREATE INDEX IF NOT EXISTS captures_damage ON captures (damage_count, damage_area);
+CREATE INDEX IF NOT EXISTS captures_location ON captures (location);
+CREATE INDEX IF NOT EXISTS captures_directory ON captures (directory);
+CREATE TABLE IF NOT EXISTS scanned (
+    path     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+INSERT = "INSERT OR REPLACE INTO captures VALUES (?,?,?,?,?,?,?,?,?,?,?,?)"
+
+COLUMNS = ("capture_id", "timestamp", "mode", "guide_step", "ipd", "lens_w_ratio", "lens_h_ratio",
+           "damage_count", "damage_area", "location")
+
+
+def capture_id_from_path(meta_path):
+    """Capture id encoded in a capture_<id>.json file name."""
+    return int(Path(meta_path).stem.split("_")[1])
+
+
+def location_directory(location):
+    """Directory a capture location belongs to: the bundle directory itself, or a JSON file's parent."""
+    location = Path(location)
+    return str(location.parent if location.suffix == ".json" else location)
+
+def walk_dirs(root):
+    """`root` and every directory below it; files are not stat'ed."""
+    yield root
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from walk_dirs(Path(entry.path))
+
+def _row(meta, location):
+    lens = meta.get("lens_params") or {}
+    damage = meta.get("damage")
+    if damage:
+        damage = {k: v for k, v in damage.items() if k != "regions"}
+        meta = dict(meta, damage=damage)
+    return (meta["capture_id"], meta.get("timestamp"), meta.get("mode"), meta.get("guide_step"),
+            lens.get("ipd"), lens.get("lens_w_ratio"), lens.get("lens_h_ratio"),
+            damage.get("count") if damage else None, damage.get("total_area") if damage else None,
+            str(location), json.dumps(meta, separators=(",", ":")), location_directory(location))
+
+
+class CaptureCatalog:
+    """Thread-safe SQLite index of capture metadata."""
+
+    def __init__(self, path=CAPTURE_CATALOG_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def add(self, meta, location):
+        """Insert or replace one capture; `meta` must carry a capture_id (unique within its directory)."""
+        row = _row(meta, Path(location).resolve())
+        with self._lock, self._db:
+            self._db.execute(INSERT, row)
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+
+    def query(self, mode=None, guide_step=None, since=None, until=None, ipd=None,
+              lens_w_ratio=None, lens_h_ratio=None, min_damage=None, min_damage_area=None,
+              limit=None, with_meta=False):
+        """Return captures matching all given filters, newest first, as dicts.
+
+        `since`/`until` are epoch seconds (inclusive/exclusive). Lens ratios
+        match to within half a slider step. `min_damage`/`min_damage_area` are
+        lower bounds on the damage region count and total area; captures
+        without detected regions never match them.
+        """
+        where, args = [], []
+        for column, value in (("mode", mode), ("guide_step", guide_step), ("ipd", ipd)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        for column, value in (("lens_w_ratio", lens_w_ratio), ("lens_h_ratio", lens_h_ratio)):
+            if value is not None:
+                where.append(f"{column} BETWEEN ? AND ?")
+                args.extend((value - 0.005, value + 0.005))
+        for column, value in (("damage_count", min_damage), ("damage_area", min_damage_area)):
+            if value is not None:
+                where.append(f"{column} >= ?")
+                args.append(value)
+        if since is not None:
+            where.append("timestamp >= ?")
+            args.append(since)
+        if until is not None:
+            where.append("timestamp < ?")
+            args.append(until)
+
+        columns = COLUMNS + ("meta",) if with_meta else COLUMNS
+        sql = f"SELECT {', '.join(columns)} FROM captures"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY capture_id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        results = [dict(zip(columns, row)) for row in rows]
+        if with_meta:
+            for r in results:
+                r["meta"] = json.loads(r["meta"])
+        return results
+
+    def _scanned_mtime(self, path):
+        row = self._db.execute("SELECT mtime_ns FROM scanned WHERE path = ?", (str(path),)).fetchone()
+        return row[0] if row else None
+
+    def rescan(self, root=CAPTURE_DIR):
+        """Bring the catalog in line with the files under `root`; returns (added, removed).
+
+        Paths are stored resolved, so relative and absolute roots share rows.
+        """
+        root = Path(root).resolve()
+        added = removed = 0
+        if root.exists():
+            for directory in walk_dirs(root):
+                if (directory / "index.bin").exists():
+                    a, r = self._rescan_bundle(directory)
+                else:
+                    a, r = self._rescan_dir(directory)
+                added += a
+                removed += r
+        return added, removed + self._purge_missing(root)
+
+    def _purge_missing(self, root):
+        """Drop rows and scan records of directories under `root` that no longer exist."""
+        with self._lock:
+            dirs = [d for (d,) in self._db.execute("SELECT DISTINCT directory FROM captures")]
+            scanned = [p for (p,) in self._db.execute("SELECT path FROM scanned")]
+        missing = {d for d in dirs if _under(d, root) and not Path(d).is_dir()}
+        stale = [(p,) for p in scanned if _under(p, root) and not Path(p).exists()]
+        if not missing and not stale:
+            return 0
+        with self._lock, self._db:
+            removed = sum(self._db.execute("DELETE FROM captures WHERE directory = ?", (d,)).rowcount
+                          for d in missing)
+            self._db.executemany("DELETE FROM scanned WHERE path = ?", stale)
+        return removed
+
+    def _rescan_dir(self, directory):
+        mtime = directory.stat().st_mtime_ns
+        with self._lock:
+            if self._scanned_mtime(directory) == mtime:
+                return 0, 0
+            known = {loc for (loc,) in self._db.execute(
+                "SELECT location FROM captures WHERE directory = ?", (str(directory),))}
+
+        on_disk = {str(p) for p in directory.glob("capture_*.json")}
+        entries = []
+        for loc in on_disk - known:
+            try:
+                with open(loc) as f:
+                    meta = json.load(f)
+                meta.setdefault("capture_id", capture_id_from_path(loc))
+            except (OSError, ValueError, IndexError):
+                continue
+            entries.append((meta, loc))
+        gone = [(loc,) for loc in known - on_disk]
+
+        with self._lock, self._db:
+            self._db.executemany(INSERT, (_row(meta, loc) for meta, loc in entries))
+            self._db.executemany("DELETE FROM captures WHERE location = ?", gone)
+            self._db.execute("INSERT OR REPLACE INTO scanned VALUES (?, ?)", (str(directory), mtime))
+        return len(entries), len(gone)
+
+    def _rescan_bundle(self, directory):
+        from capture_bundle import CaptureBundle
+        index = directory / "index.bin"
+        mtime = index.stat().st_mtime_ns
+        with self._lock:
+            if self._scanned_mtime(index) == mtime:
+                return 0, 0
+            known = {cid for (cid,) in self._db.execute(
+                "SELECT capture_id FROM captures WHERE directory = ?", (str(directory),))}
+
+        bundle = CaptureBundle(directory)
+        ids = set(bundle.ids())
+        entries = [(bundle.read(cid)[2], directory) for cid in sorted(ids - known)]
+        gone = [(str(directory), cid) for cid in known - ids]
+        with self._lock, self._db:
+            self._db.executemany(INSERT, (_row(meta, loc) for meta, loc in entries))
+            self._db.executemany("DELETE FROM captures WHERE directory = ? AND capture_id = ?", gone)
+            self._db.execute("INSERT OR REPLACE INTO scanned VALUES (?, ?)", (str(index), mtime))
+        return len(entries), len(gone)
+
+
+def _under(path, root):
+    """Whether `path` is `root` or lies below it."""
+    return Path(path) == root or root in Path(path).parents
+
+
+def parse_time(value):
+    """Epoch seconds from an integer string or an ISO date/datetime."""
+    try:
+        return int(value)
+    except ValueError:
+        return int(datetime.fromisoformat(value).timestamp())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the capture catalog.")
+    parser.add_argument("--catalog", type=Path, default=CAPTURE_CATALOG_PATH)
+    parser.add_argument("--root", type=Path, default=CAPTURE_DIR, help="captures directory to rescan")
+    parser.add_argument("--rescan", action="store_true", help="pick up new/deleted captures first")
+    parser.add_argument("--mode")
+    parser.add_argument("--step", type=int, dest="guide_step")
+    parser.add_argument("--ipd", type=int)
+    parser.add_argument("--lens-w", type=float, dest="lens_w_ratio")
+    parser.add_argument("--lens-h", type=float, dest="lens_h_ratio")
+    parser.add_argument("--since", type=parse_time)
+    parser.add_argument("--until", type=parse_time)
+    parser.add_argument("--min-damage", type=int, help="at least this many damage regions")
+    parser.add_argument("--min-damage-area", type=int, help="at least this much damaged area (px)")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--json", action="store_true", help="print full metadata as JSON lines")
+    args = parser.parse_args(argv)
+
+    catalog = CaptureCatalog(args.catalog)
+    if args.rescan:
+        t0 = time.perf_counter()
+        added, removed = catalog.rescan(args.root)
+        print(f"Rescan: +{added} -{removed} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    t0 = time.perf_counter()
+    rows = catalog.query(mode=args.mode, guide_step=args.guide_step, since=args.since,
+                         until=args.until, ipd=args.ipd, lens_w_ratio=args.lens_w_ratio,
+                         lens_h_ratio=args.lens_h_ratio, min_damage=args.min_damage,
+                         min_damage_area=args.min_damage_area, limit=args.limit, with_meta=args.json)
+    elapsed = (time.perf_counter() - t0) * 1000
+    for r in rows:
+        if args.json:
+            print(json.dumps(r["meta"]))
+        else:
+            print(f"{r['capture_id']}  {r['mode'] or '-':10s} step={r['guide_step']}  "
+                  f"ipd={r['ipd']}  damage={r['damage_count']}  {r['location']}")
+    print(f"{len(rows)} captures ({elapsed:.1f} ms)")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Asynchronous capture pipeline: encoding, damage detection and metadata writes off the Tk thread."""
+import io
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from config import (CAPTURE_DIR, CAPTURE_WORKERS, CAPTURE_MAX_IN_FLIGHT, CAPTURE_FORMAT,
+                    CAPTURE_BUNDLE_DIR, CAPTURE_CATALOG_PATH, CAPTURE_ENCODING_PROFILES,
+                    CAPTURE_PROFILE, CAPTURE_DET_PROFILE)
+from capture_bundle import CaptureBundle, EXTENSIONS, new_capture_id
+from capture_catalog import CaptureCatalog
+from image_processing import (detect_damage, detect_damage_roi, as_damage_result, detector_save_params,
+                              RoiDetectionCache)
+
+
+def encode_image(img, profile, detection=False):
+    """Encode an RGB image with a CAPTURE_ENCODING_PROFILES entry.
+
+    Returns (bytes, stats) where stats records the profile, format, encoded
+    size and encode time. Detection images carry the detector fingerprint.
+    """
+    params = dict(CAPTURE_ENCODING_PROFILES[profile])
+    fmt = params.pop("format")
+    if detection:
+        params.update(detector_save_params(fmt))
+    t0 = time.perf_counter()
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **params)
+    data = buf.getvalue()
+    return data, {
+        "profile": profile,
+        "format": fmt,
+        "bytes": len(data),
+        "encode_ms": round((time.perf_counter() - t0) * 1000, 2)
+    }
+
+
+def write_capture(comp, meta, capture_dir=CAPTURE_DIR, detector=detect_damage, bundle=None,
+                  catalog=None, profile=CAPTURE_PROFILE, det_profile=CAPTURE_DET_PROFILE, roi_cache=None,
+                  overlay=None):
+    """Encode the frame, run damage detection and store the capture. Returns a result dict.
+
+    Captures are named by a unique `capture_id` (assigned here if the metadata
+    has none). With a `bundle` they are appended to it instead of being written
+    as loose files; with a `catalog` their metadata is indexed as well. When the
+    metadata has an "roi" box, detection only runs inside it. The detected
+    damage regions are stored in the metadata under "damage".
+
+    `overlay` is an RGBA layer (HUD and mode items) drawn over both stored
+    images, so the capture matches the screen. Detection only sees `comp`,
+    so guide rings and labels are never detected as damage. Loose captures
+    with an overlay also keep `comp` itself as `capture_<id>_raw.*`, which
+    batch_detect.py re-detects on; bundles store the screen image only.
+    """
+    if "capture_id" not in meta:
+        meta["capture_id"] = new_capture_id()
+    capture_id = meta["capture_id"]
+    t0 = time.perf_counter()
+
+    rgb = comp.convert("RGB")
+    if meta.get("roi"):
+        damage, cached = detect_damage_roi(rgb, meta["roi"], detector, roi_cache, meta.get("guide_step"))
+    else:
+        damage, cached = as_damage_result(detector(rgb)), False
+    screen = rgb
+    det = damage.image
+    if overlay is not None:
+        screen = Image.alpha_composite(comp.convert("RGBA"), overlay).convert("RGB")
+        det = Image.alpha_composite(det.convert("RGBA"), overlay)
+    det = det.convert("RGB")
+    meta["detection"] = {"roi": meta.get("roi"), "cached": cached,
+                         "detect_ms": round((time.perf_counter() - t0) * 1000, 2)}
+    meta["damage"] = damage.to_meta()
+    img_bytes, img_stats = encode_image(screen, profile)
+    det_bytes, det_stats = encode_image(det, det_profile or profile, detection=True)
+    meta["encoding"] = {"image": img_stats, "detection": det_stats}
+
+    if bundle is not None:
+        bundle.append(img_bytes, det_bytes, meta, capture_id)
+        if catalog is not None:
+            catalog.add(meta, bundle.root)
+        return {
+            "capture_id": capture_id,
+            "location": f"capture {capture_id} in {bundle.root}",
+            "elapsed": time.perf_counter() - t0
+        }
+
+    capture_dir.mkdir(parents=True, exist_ok=True)
+    img_fn = capture_dir / f"capture_{capture_id}{EXTENSIONS[img_stats['format']]}"
+    img_fn.write_bytes(img_bytes)
+
+    raw_fn = None
+    if overlay is not None:
+        raw_bytes, raw_stats = encode_image(rgb, profile)
+        meta["encoding"]["raw"] = raw_stats
+        raw_fn = capture_dir / f"capture_{capture_id}_raw{EXTENSIONS[raw_stats['format']]}"
+        raw_fn.write_bytes(raw_bytes)
+
+    det_fn = capture_dir / f"capture_{capture_id}_det{EXTENSIONS[det_stats['format']]}"
+    det_fn.write_bytes(det_bytes)
+
+    meta_fn = capture_dir / f"capture_{capture_id}.json"
+    with open(meta_fn, "w") as f:
+        json.dump(meta, f, separators=(",", ":"))
+    if catalog is not None:
+        catalog.add(meta, meta_fn)
+
+    return {
+        "capture_id": capture_id,
+        "location": f"{img_fn.name}  |  Damage overlay: {det_fn.name}",
+        "image": img_fn,
+        "raw": raw_fn,
+        "detection": det_fn,
+        "meta_file": meta_fn,
+        "elapsed": time.perf_counter() - t0
+    }
+
+
+class CapturePipeline:
+    """Runs capture jobs on a worker pool and reports completions through a queue.
+
+    `submit` never blocks: when `max_in_flight` jobs are pending it refuses the
+    job and returns None. The UI thread calls `poll` to collect finished jobs.
+    """
+
+    def __init__(self, workers=CAPTURE_WORKERS, max_in_flight=CAPTURE_MAX_IN_FLIGHT,
+                 capture_dir=CAPTURE_DIR, detector=detect_damage, capture_format=CAPTURE_FORMAT,
+                 catalog_path=CAPTURE_CATALOG_PATH, profile=CAPTURE_PROFILE,
+                 det_profile=CAPTURE_DET_PROFILE):
+        self.capture_dir = capture_dir
+        self.detector = detector
+        self.profile = profile
+        self.det_profile = det_profile
+        self.roi_cache = RoiDetectionCache()
+        self.bundle = CaptureBundle(CAPTURE_BUNDLE_DIR) if capture_format == "bundle" else None
+        self.max_in_flight = max_in_flight
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="capture")
+        self.catalog = CaptureCatalog(catalog_path) if catalog_path else None
+        if self.catalog is not None:
+            # Pick up captures written or deleted while the app was not running
+            self._executor.submit(self.catalog.rescan, capture_dir)
+        self._done = queue.Queue()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._next_id = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def submit(self, comp, meta, overlay=None):
+        """Queue a snapshot (and its overlay layer) for processing. Returns a job id, or None if the pipeline is full."""
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self.rejected += 1
+                return None
+            self._in_flight += 1
+            self._next_id += 1
+            job_id = self._next_id
+
+        self._executor.submit(self._run, job_id, comp, meta, overlay)
+        return job_id
+
+    def _run(self, job_id, comp, meta, overlay):
+        """Worker body: process one capture and post the outcome."""
+        try:
+            result = write_capture(comp, meta, self.capture_dir, self.detector, self.bundle,
+                                   self.catalog, self.profile, self.det_profile, self.roi_cache, overlay)
+            result["error"] = None
+        except Exception as exc:
+            result = {"error": exc}
+        result["job_id"] = job_id
+        result["meta"] = meta
+        with self._lock:
+            self._in_flight -= 1
+        self._done.put(result)
+
+    def poll(self):
+        """Return all results completed since the last poll (never blocks)."""
+        results = []
+        while True:
+            try:
+                result = self._done.get_nowait()
+            except queue.Empty:
+                break
+            if result["error"] is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+            results.append(result)
+        return results
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs and optionally wait for pending ones."""
+        self._executor.shutdown(wait=wait)
+        if wait and self.catalog is not None:
+            self.catalog.close()
@@ -0,0 +1,140 @@
+"""Dirty-rectangle compositing of the glasses overlay onto the background."""
+from contextlib import nullcontext
+from PIL import Image, ImageTk
+
+
+def merge_boxes(boxes, waste=2048, window=4):
+    """Merge adjacent boxes where the union covers at most `waste` px that neither of them does.
+
+    Each box costs a few crops and pastes on top of its area, so nearby
+    slivers are cheaper as one box. Boxes are taken top to bottom and each is
+    only tried against the last `window` merged boxes, which keeps this cheap.
+    """
+    merged = []
+    for box in sorted(boxes, key=lambda b: (b[1], b[0])):
+        for i in range(max(len(merged) - window, 0), len(merged)):
+            a = merged[i]
+            u = (min(a[0], box[0]), min(a[1], box[1]), max(a[2], box[2]), max(a[3], box[3]))
+            overlap = (max(min(a[2], box[2]) - max(a[0], box[0]), 0)
+                       * max(min(a[3], box[3]) - max(a[1], box[1]), 0))
+            if _area(u) - _area(a) - _area(box) + overlap <= waste:
+                merged[i] = u
+                break
+        else:
+            merged.append(box)
+    return merged
+
+def _area(box):
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+class FrameCompositor:
+    """Keeps a composited frame up to date, recompositing only changed regions.
+
+    The background is converted to RGBA once. The caller says where a new
+    overlay differs from the previous one (GlassesOverlay.changed_boxes works
+    that out from the glasses geometry); no pixels are compared. `compose`
+    returns the rectangles that had to be recomposited.
+    """
+
+    def __init__(self, background, full_redraw_ratio=0.3):
+        self.full_redraw_ratio = full_redraw_ratio
+        self.frame = None
+        self._overlay = None
+        self._pending = []      # background boxes changed since the last compose
+        self.set_background(background)
+
+    @property
+    def size(self):
+        return self.background.size
+
+    def set_background(self, background, dirty=None):
+        """Replace the background; the next compose redraws the full frame.
+
+        If only some regions of the background changed, pass them as `dirty`
+        and the next compose repaints just those.
+        """
+        self.background = background if background.mode == "RGBA" else background.convert("RGBA")
+        if dirty is None or self.frame is None or background.size != self.frame.size:
+            self.frame = None
+            self._pending = []
+            return
+        w, h = self.size
+        for x1, y1, x2, y2 in dirty:
+            box = (max(x1, 0), max(y1, 0), min(x2, w), min(y2, h))
+            if box[0] < box[2] and box[1] < box[3]:
+                self._pending.append(box)
+
+    def compose(self, overlay, dirty=None):
+        """Composite `overlay` and return the list of dirty (x1, y1, x2, y2) boxes.
+
+        `dirty` are the boxes where `overlay` differs from the previous overlay;
+        a different overlay without them redraws the full frame.
+        """
+        if self.frame is None or overlay.size != self.size:
+            self.frame = Image.alpha_composite(self.background, overlay)
+            self._overlay = overlay
+            return [(0, 0) + self.size]
+
+        if overlay is self._overlay and not self._pending:
+            return []
+
+        rects = self._pending
+        self._pending = []
+        w, h = self.size
+        if overlay is not self._overlay:
+            if dirty is None:
+                rects = [(0, 0, w, h)]
+            else:
+                clipped = [(max(x1, 0), max(y1, 0), min(x2, w), min(y2, h)) for x1, y1, x2, y2 in dirty]
+                rects = rects + [b for b in clipped if b[0] < b[2] and b[1] < b[3]]
+        # Patching a box costs several passes over it, a full composite one pass over the
+        # frame: past about 30% of the frame one full composite is cheaper
+        if sum(_area(box) for box in rects) >= self.full_redraw_ratio * w * h:
+            self.frame = Image.alpha_composite(self.background, overlay)
+            self._overlay = overlay
+            return [(0, 0) + self.size]
+
+        rects = merge_boxes(rects)
+
+        for box in rects:
+            self.frame.paste(Image.alpha_composite(self.background.crop(box), overlay.crop(box)), box[:2])
+        self._overlay = overlay
+        return rects
+
+
+class CanvasFrame:
+    """A single long-lived PhotoImage on a canvas, patched in place."""
+
+    def __init__(self, canvas, full_redraw_ratio=0.6, stats=None):
+        self.canvas = canvas
+        self.full_redraw_ratio = full_redraw_ratio
+        self.stats = stats
+        self.photo = None
+        self.item_id = None
+
+    def _stage(self, name):
+        return self.stats.stage(name) if self.stats is not None else nullcontext()
+
+    def present(self, frame, dirty_rects):
+        """Push the dirty regions of `frame` into the canvas image."""
+        if self.photo is None or (self.photo.width(), self.photo.height()) != frame.size:
+            with self._stage("photoimage"):
+                self.photo = ImageTk.PhotoImage(frame)
+            with self._stage("itemconfigure"):
+                if self.item_id is None:
+                    self.item_id = self.canvas.create_image(0, 0, anchor="nw", image=self.photo)
+                else:
+                    self.canvas.itemconfigure(self.item_id, image=self.photo)
+            return
+
+        w, h = frame.size
+        area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in dirty_rects)
+        with self._stage("photoimage"):
+            if area >= self.full_redraw_ratio * w * h:
+                self.photo.paste(frame)
+                return
+
+            for box in dirty_rects:
+                patch = ImageTk.PhotoImage(frame.crop(box))
+                self.canvas.tk.call(str(self.photo), "copy", str(patch), "-to", box[0], box[1])
@@ -3,12 +3,102 @@ from pathlib import Path
 
 # Image paths
 IMAGE_PATH = "./background/anastasius-8DkDA67JAIs-unsplash.jpg"
-CAPTURE_DIR = Path("./captures")
-CAPTURE_DIR.mkdir(exist_ok=True)
+
+# Live frame source: None (static IMAGE_PATH), a directory (slideshow, e.g. "./background"),
+# a video file or an image-sequence glob such as "./frames/*.png"
+FRAME_SOURCE = None
+FRAME_SOURCE_FPS = 24          # decode rate for image sequences
+RENDER_FPS = 30                # rate at which the newest source frame is composited
+CAPTURE_DIR = Path("./captures")          # created on first capture
+CAPTURE_FORMAT = "files"       # "files" (loose PNG/JSON per capture) or "bundle" (append-only chunks)
+CAPTURE_BUNDLE_DIR = CAPTURE_DIR / "bundle"
+CAPTURE_CATALOG_PATH = CAPTURE_DIR / "catalog.sqlite"   # metadata index; None disables it
+CAPTURE_BUNDLE_CHUNK_BYTES = 256 * 1024 * 1024   # start a new chunk file past this size
+BACKGROUND_CACHE_DIR = Path("./.cache/backgrounds")   # pre-scaled backgrounds, keyed by source + size
+# Capture pipeline
+CAPTURE_WORKERS = 2            # background threads encoding/detecting captures
+CAPTURE_MAX_IN_FLIGHT = 4      # further captures are refused until one finishes
+CAPTURE_POLL_MS = 50           # how often the Tk loop collects finished captures
+TOAST_MS = 2500                # how long status toasts stay on screen
+
+# CarScan sessions (one capture per guide step, processed together)
+SESSION_WORKERS = None         # detection processes; None = one per CPU
+SESSION_MP_START = "spawn"     # the app has live threads, so don't fork
+SESSION_THUMB_SIZE = (256, 150)
+SESSION_SHEET_COLUMNS = 4
+
+# Capture encoding: Image.save() format and options per profile. Encode time and
+# size of each capture are recorded under "encoding" in its metadata.
+CAPTURE_ENCODING_PROFILES = {
+    'png_fast':      {'format': 'PNG', 'compress_level': 1},
+    'png_default':   {'format': 'PNG', 'compress_level': 6},
+    'png_small':     {'format': 'PNG', 'compress_level': 9, 'optimize': True},
+    'webp_lossless': {'format': 'WEBP', 'lossless': True, 'quality': 50, 'method': 2},
+    'webp_high':     {'format': 'WEBP', 'quality': 90, 'method': 4},
+    'webp_medium':   {'format': 'WEBP', 'quality': 75, 'method': 4},
+    'jpeg_high':     {'format': 'JPEG', 'quality': 92},
+    'jpeg_medium':   {'format': 'JPEG', 'quality': 80}
+}
+CAPTURE_PROFILE = 'png_fast'   # profile for the captured frame
+CAPTURE_DET_PROFILE = None     # profile for the detection image; None = same as CAPTURE_PROFILE
+
+# Damage detection
+DETECTOR_SETTINGS = {
+    'engine': 'auto',          # 'auto', 'cv2', 'numpy' (no OpenCV needed, ~2.4x slower) or 'pil'
+    'clahe_clip': 2.0,         # contrast equalization clip limit
+    'clahe_tiles': 8,          # CLAHE tile grid (tiles per side)
+    'canny_low': 60,
+    'canny_high': 150,
+    'dilate': 3,               # elliptical dilation kernel size (px)
+    'blend': 0.3,              # weight of the green edge layer
+    'min_region_area': 30      # damage regions smaller than this (px, after dilation) are dropped
+}
+DAMAGE_MAX_REGIONS = 500       # largest regions kept per detection (stored in capture metadata)
+DETECTION_ROI_MARGIN = 60      # CarScan captures detect only within guide ring radius + this (px)
+ROI_CACHE_SIZE = 16            # ROI results kept per (guide step, ROI content hash)
 
 # UI Constants
 CANVAS_WIDTH = 1000
 CANVAS_HEIGHT = 520
+FRAME_BUDGET_MS = 16          # slider-driven redraws are coalesced to one per frame
+
+# Dynamic resolution: the glasses overlay and composite render at a reduced internal
+# scale while frames are slow, then are upscaled to the canvas
+DYNAMIC_RESOLUTION = True
+RESOLUTION_TIERS = (1.0, 0.5)  # internal render scales, best first
+RESOLUTION_FILTER = "nearest"  # upscaling filter: "nearest" (cheapest) or "bilinear" (smoother; fast with OpenCV)
+TARGET_FRAME_MS = 33           # step down a tier when frames take longer than this
+RESOLUTION_HEADROOM = 0.7      # step up when the next tier is predicted to stay below this share of the target
+RESOLUTION_SAMPLES = 4         # frames averaged before changing tiers
+RESOLUTION_MIN_GAIN = 0.8      # a lower tier is only kept while it measures at most this share of the tier above
+RESOLUTION_IDLE_MS = 300       # re-render at full resolution after this long without frames
+
+# Stereo: side-by-side left/right eye views, each centred on its lens
+STEREO_VIEW = False            # show the eye views on the canvas at startup (toggle with F4)
+STEREO_CAPTURE = False         # captures store the side-by-side views instead of the mono frame
+STEREO_EYE_WIDTH = None        # px per eye; None = half the canvas, so both views fit it
+
+# Startup
+FAST_START = True              # OpenCV/NumPy loaded in the background after first paint
+STARTUP_TIMING = False         # print import/decode/overlay/first-paint times on startup (always in the perf stats dump)
+
+# Performance instrumentation (toggle the on-lens HUD with F3)
+PERF_STATS_ENABLED = False
+PERF_HUD_REFRESH_MS = 500
+PERF_IDLE_GAP_MS = 250         # longer gaps between frames count as idle, not as slow frames
+PERF_STATS_PATH = Path("./perf_stats.json")   # written on exit when stats are enabled
+
+# Periodic work and HUD data providers (aligned on the monotonic clock, the HUD clock on the wall clock)
+TICK_SLACK_MS = 10             # periodic tasks due this close together run in one wakeup
+HUD_CLOCK_FORMAT = "%H:%M"
+HUD_CLOCK_REFRESH_MS = 60000   # fires on the minute
+HUD_BATTERY_REFRESH_MS = 30000
+HUD_NAV_REFRESH_MS = 1000
+
+# Navigation route playback
+NAV_ROUTE_PATH = Path("./routes/demo_route.json")   # None (or a missing file) shows a static card
+NAV_PLAYBACK_SPEED_KMH = 40    # simulated driving speed
+NAV_PLAYBACK_HZ = 10           # navigation card refresh rate during playback
 
 # Lens defaults
 DEFAULT_IPD = 240
@@ -16,6 +106,26 @@ DEFAULT_LENS_W_RATIO = 0.30
 DEFAULT_LENS_H_RATIO = 0.56
 DEFAULT_BRIDGE_MIN = 18
 
+# Lens effect on the background inside each lens (applied once NumPy is loaded)
+LENS_EFFECT = True
+LENS_DISTORTION = 0.12         # barrel magnification at the lens centre (0 = none)
+LENS_CHROMATIC = 0.012         # red/blue fringe offset at the rim, relative to the radius
+LENS_VIGNETTE = 0.35           # darkening at the rim (0 = none, 1 = black)
+LENS_TABLE_CACHE_SIZE = 16     # remap tables kept, one per lens size (~2 MB each at the default size)
+
+# Settings slider ranges: (from, to, resolution)
+IPD_RANGE = (160, 320, 1)
+LENS_W_RANGE = (0.22, 0.36, 0.01)
+LENS_H_RANGE = (0.45, 0.65, 0.01)
+
+# Overlay cache
+OVERLAY_CACHE_SIZE = 48        # generated overlays kept in memory (~2 MB each at 1000x520)
+OVERLAY_PREWARM_STEPS = {      # slider steps warmed on each side of the current value
+    'ipd': 12,
+    'lens_w': 3,
+    'lens_h': 3
+}
+
 # Colors
 COLORS = {
     'rim': (18, 18, 18, 255),
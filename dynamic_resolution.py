@@ -0,0 +1,74 @@
+"""Dynamic resolution: picks the internal render scale from measured frame times.
+
+While frames take longer than the target, rendering steps down through the
+configured scale tiers; it steps back up once the next better tier is
+predicted (by pixel count) to fit comfortably within the target. A lower
+tier has to earn its keep: if its measured frame time is not clearly below
+that of the tier above, rendering steps back up and does not step down to it
+again until the tier above gets slower than that. The app returns to full
+resolution whenever rendering goes idle.
+"""
+from collections import deque
+from config import (RESOLUTION_TIERS, TARGET_FRAME_MS, RESOLUTION_HEADROOM, RESOLUTION_SAMPLES,
+                    RESOLUTION_MIN_GAIN)
+
+
+class ResolutionController:
+    """Chooses a scale from `tiers` (best first) to keep frames under `target_ms`."""
+
+    def __init__(self, tiers=RESOLUTION_TIERS, target_ms=TARGET_FRAME_MS, headroom=RESOLUTION_HEADROOM,
+                 samples=RESOLUTION_SAMPLES, min_gain=RESOLUTION_MIN_GAIN):
+        self.tiers = tuple(tiers)
+        self.target_ms = target_ms
+        self.headroom = headroom
+        self.min_gain = min_gain
+        self.tier = 0
+        self._samples = deque(maxlen=samples)
+        self._measured = {}     # tier -> mean frame time when last rendered at it
+        self.frames = 0
+        self.changes = 0
+
+    @property
+    def scale(self):
+        return self.tiers[self.tier]
+
+    def record(self, frame_ms):
+        """Add a frame time; returns True if the scale changed."""
+        self.frames += 1
+        self._samples.append(frame_ms)
+        if len(self._samples) < self._samples.maxlen:
+            return False
+        mean = sum(self._samples) / len(self._samples)
+        self._measured[self.tier] = mean
+        if mean > self.target_ms and self.tier < len(self.tiers) - 1:
+            lower = self._measured.get(self.tier + 1)
+            if lower is None or lower < mean * self.min_gain:
+                return self._set_tier(self.tier + 1)
+        if self.tier > 0:
+            upper = self._measured.get(self.tier - 1)
+            if upper is not None and mean >= upper * self.min_gain:
+                return self._set_tier(self.tier - 1)      # lower quality without a speed-up
+            # Frame cost is roughly proportional to the number of pixels rendered
+            predicted = mean * (self.tiers[self.tier - 1] / self.scale) ** 2
+            if predicted < self.target_ms * self.headroom:
+                return self._set_tier(self.tier - 1)
+        return False
+
+    def reset(self):
+        """Back to full resolution (e.g. when idle); returns True if the scale changed."""
+        return self._set_tier(0)
+
+    def _set_tier(self, tier):
+        self._samples.clear()
+        if tier == self.tier:
+            return False
+        self.tier = tier
+        self.changes += 1
+        return True
+
+    def stats(self):
+        return {
+            "scale": self.scale,
+            "frames": self.frames,
+            "changes": self.changes
+        }
@@ -0,0 +1,223 @@
+"""Live frame sources for the AR view: video files, image sequences and slideshows.
+
+Each source decodes on its own thread into a small bounded queue. When the
+consumer falls behind, the oldest queued frame is dropped so `get_latest`
+always returns the newest decoded frame. A decoder error stops the thread
+and is kept in `error`.
+"""
+import glob
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from PIL import Image
+from image_processing import load_background_image, load_optional_modules
+from perf_stats import RingBuffer
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+
+
+class FrameSource(ABC):
+    """Base class: a decoder thread feeding a bounded, stale-dropping queue.
+
+    Subclasses implement `_read_next()`, returning an RGB PIL image of
+    `self.size` or None at the end of the stream.
+    """
+
+    def __init__(self, size, fps=24.0, queue_size=2, loop=True):
+        self.size = tuple(size)
+        self.fps = fps
+        self.loop = loop
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._stop = threading.Event()
+        self.decoded = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.latency_ms = RingBuffer(120)
+        self.error = None       # exception that stopped the decoder thread, if any
+
+    def start(self):
+        """Start the decoder thread."""
+        if self._thread is not None:
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the decoder thread and release resources."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self._close()
+
+    def _run(self):
+        interval = 1.0 / self.fps if self.fps > 0 else 0.0
+        next_due = time.perf_counter()
+        rewound = False
+        while not self._stop.is_set():
+            try:
+                frame = self._read_next()
+                if frame is None:
+                    # Nothing right after a rewind: the source is empty, looping would spin
+                    if self.loop and not rewound and self._rewind():
+                        rewound = True
+                        continue
+                    break
+            except Exception as exc:
+                self.error = exc
+                break
+            rewound = False
+            self.decoded += 1
+            self._push((frame, time.perf_counter()))
+
+            next_due += interval
+            delay = next_due - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_due = time.perf_counter()
+
+    def _push(self, item):
+        """Queue a frame, discarding the oldest one if the queue is full."""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get_latest(self):
+        """Return the newest decoded frame (older queued ones count as dropped), or None."""
+        item = None
+        while True:
+            try:
+                newer = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self.dropped += 1
+            item = newer
+        if item is None:
+            return None
+        frame, decoded_at = item
+        self.delivered += 1
+        self.latency_ms.append((time.perf_counter() - decoded_at) * 1000)
+        return frame
+
+    def stats(self):
+        """Decoded / delivered / dropped frame counts, decode-to-display latency and decoder error."""
+        return {
+            "decoded": self.decoded,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "latency_ms": self.latency_ms.summary(),
+            "error": repr(self.error) if self.error is not None else None
+        }
+
+    @abstractmethod
+    def _read_next(self):
+        """Decode and return the next frame, or None at the end of the source."""
+        pass
+
+    def _rewind(self):
+        """Restart from the beginning; returns False if the source cannot loop."""
+        return False
+
+    def _close(self):
+        pass
+
+
+class ImageSequenceSource(FrameSource):
+    """Plays a list of image files in order."""
+
+    def __init__(self, paths, size, fps=24.0, **kwargs):
+        super().__init__(size, fps, **kwargs)
+        self.paths = [Path(p) for p in paths]
+        self._index = 0
+
+    def _read_next(self):
+        if self._index >= len(self.paths):
+            return None
+        path = self.paths[self._index]
+        self._index += 1
+        with Image.open(path) as im:
+            im.draft("RGB", self.size)
+            frame = im.convert("RGB")
+        if frame.size != self.size:
+            frame = frame.resize(self.size, Image.BILINEAR)
+        return frame
+
+    def _rewind(self):
+        self._index = 0
+        return bool(self.paths)
+
+
+class SlideshowSource(ImageSequenceSource):
+    """Cycles through the images of a directory (e.g. background/) as a slideshow."""
+
+    def __init__(self, directory, size, seconds_per_slide=5.0, **kwargs):
+        paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        super().__init__(paths, size, fps=1.0 / seconds_per_slide, **kwargs)
+
+    def _read_next(self):
+        # Slides repeat, so use the pre-scaled background cache
+        if self._index >= len(self.paths):
+            return None
+        path = self.paths[self._index]
+        self._index += 1
+        return load_background_image(self.size, path)
+
+
+class VideoFileSource(FrameSource):
+    """Decodes a video file with OpenCV."""
+
+    def __init__(self, path, size, fps=None, **kwargs):
+        import image_processing
+        load_optional_modules()
+        if not image_processing.CV2_AVAILABLE:
+            raise RuntimeError("Video sources require opencv-python")
+        self._cv2 = image_processing.cv2
+        self.path = str(path)
+        self._cap = self._cv2.VideoCapture(self.path)
+        if not self._cap.isOpened():
+            raise RuntimeError(f"Cannot open video: {self.path}")
+        native_fps = self._cap.get(self._cv2.CAP_PROP_FPS) or 24.0
+        super().__init__(size, fps or native_fps, **kwargs)
+
+    def _read_next(self):
+        ok, bgr = self._cap.read()
+        if not ok:
+            return None
+        cv2 = self._cv2
+        if (bgr.shape[1], bgr.shape[0]) != self.size:
+            bgr = cv2.resize(bgr, self.size, interpolation=cv2.INTER_AREA)
+        return Image.fromarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+
+    def _rewind(self):
+        return self._cap.set(self._cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _close(self):
+        self._cap.release()
+
+
+def open_frame_source(spec, size, fps=24.0):
+    """Create a frame source from a directory, video file or glob pattern."""
+    path = Path(spec)
+    if path.is_dir():
+        return SlideshowSource(path, size)
+    if path.suffix.lower() in VIDEO_EXTENSIONS:
+        return VideoFileSource(path, size)
+    paths = sorted(glob.glob(str(spec)))
+    if not paths:
+        raise FileNotFoundError(f"No frames found for source: {spec}")
+    return ImageSequenceSource(paths, size, fps)
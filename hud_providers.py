@@ -0,0 +1,103 @@
+"""Data providers for the HUD text items.
+
+A provider names the HUD item it feeds, declares how often it should be
+refreshed (and whether on wall-clock boundaries) and returns the current
+text from `read()` (None keeps the text already shown). HUDManager registers
+providers with the TickScheduler, so all of them share the application's
+single periodic wakeup.
+"""
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from config import (HUD_CLOCK_FORMAT, HUD_CLOCK_REFRESH_MS, HUD_BATTERY_REFRESH_MS,
+                    HUD_NAV_REFRESH_MS, PERF_HUD_REFRESH_MS)
+from modes.navigation_mode import arrow_glyph
+
+POWER_SUPPLY_DIR = Path("/sys/class/power_supply")
+
+
+class HUDProvider(ABC):
+    """Base class: feeds HUD item `name` every `interval_ms` (aligned to the wall clock if `wall`)."""
+
+    name = None
+    interval_ms = 1000
+    wall = False
+
+    @abstractmethod
+    def read(self):
+        """Current text for the HUD item, or None to keep the text shown."""
+        pass
+
+
+class ClockProvider(HUDProvider):
+    """Wall-clock time; refreshed on the minute."""
+
+    name = 'time'
+    interval_ms = HUD_CLOCK_REFRESH_MS
+    wall = True
+
+    def __init__(self, fmt=HUD_CLOCK_FORMAT):
+        self.fmt = fmt
+
+    def read(self):
+        return time.strftime(self.fmt)
+
+
+class BatteryProvider(HUDProvider):
+    """Battery charge from psutil or Linux sysfs; keeps the default text if neither is available."""
+
+    name = 'battery'
+    interval_ms = HUD_BATTERY_REFRESH_MS
+
+    def __init__(self):
+        try:
+            import psutil
+            self._psutil = psutil
+        except ImportError:
+            self._psutil = None
+        self._sysfs = sorted(POWER_SUPPLY_DIR.glob("BAT*/capacity")) if POWER_SUPPLY_DIR.exists() else []
+
+    def percent(self):
+        if self._psutil is not None:
+            battery = self._psutil.sensors_battery()
+            if battery is not None:
+                return int(round(battery.percent))
+        for path in self._sysfs:
+            try:
+                return int(path.read_text().strip())
+            except (OSError, ValueError):
+                continue
+        return None
+
+    def read(self):
+        pct = self.percent()
+        return None if pct is None else f"{pct}% 🔋"
+
+
+class NavigationProvider(HUDProvider):
+    """ETA and maneuver arrow from the navigation mode's current state."""
+
+    name = 'navigation'
+    interval_ms = HUD_NAV_REFRESH_MS
+
+    def __init__(self, navigation_mode):
+        self.mode = navigation_mode
+
+    def read(self):
+        state = self.mode.overlay_state()
+        if not state:
+            return None
+        return f"{state['eta']} {arrow_glyph(state['direction'])}"
+
+
+class PerfProvider(HUDProvider):
+    """Frame-time summary from FrameStats; only scheduled while the perf HUD is visible."""
+
+    name = 'perf'
+    interval_ms = PERF_HUD_REFRESH_MS
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def read(self):
+        return self.stats.hud_text()
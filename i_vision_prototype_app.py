@@ -1,28 +1,51 @@
 # Requires: Pillow, opencv-python (optional), customtkinter (optional)
 #   pip install pillow opencv-python customtkinter
 
-import os, sys, json, time
-from pathlib import Path
-from PIL import Image, ImageTk, ImageDraw
-
-# --- UI framework: try customtkinter, fallback to tkinter ---
-try:
-    import customtkinter as ctk
-    TK_FRAME = "custom"
-    import tkinter as tk
-    from tkinter import messagebox
-except Exception:
-    TK_FRAME = "tk"
-    import tkinter as tk
-    from tkinter import ttk, messagebox
+import time
+_T0 = time.perf_counter()
+import importlib.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw
+import tkinter as tk
+
+# --- UI framework: customtkinter if installed (imported on first use), fallback to tkinter ---
+TK_FRAME = "custom" if importlib.util.find_spec("customtkinter") else "tk"
+ctk = None
+
+
+def load_ctk():
+    """Import customtkinter on first use."""
+    global ctk
+    if ctk is None:
+        import customtkinter
+        ctk = customtkinter
+    return ctk
+
 
 from config import *
 from settings_panel import SettingsPanel
-from image_processing import load_background_image, detect_damage_edges
-from ui_components import GlassesOverlay, HUDManager
+import image_processing
+from image_processing import load_background_image, load_optional_modules
+from ui_components import HUDManager, StatusToast, lens_geometry
+from capture_bundle import new_capture_id
+from capture_pipeline import CapturePipeline
+from scan_session import ScanSession
+from scheduler import RenderScheduler, TickScheduler
+from hud_providers import ClockProvider, BatteryProvider, NavigationProvider, PerfProvider
+from perf_stats import FrameStats, StartupTimer
+from compositor import CanvasFrame
+from scene_graph import SceneGraph, TOPMOST_TAG
+from offscreen_renderer import OffscreenRenderer
+from dynamic_resolution import ResolutionController
+from frame_sources import open_frame_source
+from stereo import StereoFrame
 from modes.navigation_mode import NavigationMode
 from modes.carscan_mode import CarScanMode
 
+STARTUP = StartupTimer(_T0)
+STARTUP.mark("import")
+
 
 class iVisionPrototypeApp:
     """Main application class for the iVision AR prototype."""
@@ -31,11 +54,25 @@ class iVisionPrototypeApp:
         self.using_custom = using_custom
         self.root = root
         self.root.title("iVision - Prototype")
+        if not FAST_START:
+            load_optional_modules()
         
         # Core components
+        self.perf = FrameStats(enabled=PERF_STATS_ENABLED)
         self.canvas_w, self.canvas_h = CANVAS_WIDTH, CANVAS_HEIGHT
-        self.bg_resized = load_background_image().resize((self.canvas_w, self.canvas_h), Image.LANCZOS)
-        self.glasses_overlay = GlassesOverlay((self.canvas_w, self.canvas_h))
+        self.bg_resized = load_background_image((self.canvas_w, self.canvas_h))
+        STARTUP.mark("decode")
+        self.renderer = OffscreenRenderer(self.bg_resized, (self.canvas_w, self.canvas_h), stats=self.perf)
+        self.glasses_overlay = self.renderer.overlay
+        self.compositor = self.renderer.compositor
+        self.resolution = ResolutionController() if DYNAMIC_RESOLUTION else None
+        self._presented_scale = None
+        self._idle_job = None
+        self.stereo = None          # StereoFrame while the canvas shows side-by-side eye views
+        self.stereo_frame = None
+        self._stereo_scene_version = None
+        self._stereo_source = None  # composite_img with the scene rasterized, kept up to date by box
+        self._stereo_nodes = {}
         
         # Lens parameters
         self.lens_params = {
@@ -48,26 +85,47 @@ class iVisionPrototypeApp:
         self.mode = "menu"
         self.captures = []
         self.knob_bbox = None
+        self.scan_session = None
+        self._session_future = None
+        self.session_runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session")
         
         # Initialize components
         self.settings_panel = SettingsPanel(self)
+        self.capture_pipeline = CapturePipeline()
+        self.render_scheduler = RenderScheduler(self.root, self.update_lens_params)
+        self.ticks = TickScheduler(self.root)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<F3>", lambda e: self.toggle_perf_hud())
+        self.root.bind("<F4>", lambda e: self.toggle_stereo_view())
 
         self.create_ui()
         self.update_overlay()
         
         # Position HUD items after overlay is ready
         self.hud_manager.position_items(self.get_lens_geometry())
+        STARTUP.mark("overlay")
         
         # Initialize modes
         self.modes = {
             'navigation': NavigationMode(self),
             'carscan': CarScanMode(self)
         }
+        self.hud_manager.add_provider(NavigationProvider(self.modes['navigation']))
+        
+        # Optional live background (video, image sequence or slideshow)
+        self.frame_source = None
+        if FRAME_SOURCE:
+            self.frame_source = open_frame_source(FRAME_SOURCE, (self.canvas_w, self.canvas_h),
+                                                  FRAME_SOURCE_FPS).start()
+            self.ticks.add("frame_source", 1000 / RENDER_FPS, self._pump_frames)
+        if STEREO_VIEW:
+            self.toggle_stereo_view()
 
     def create_ui(self):
         """Create the main UI components."""
         # Main frame
         if self.using_custom:
+            load_ctk()
             ctk.set_appearance_mode("dark")
             ctk.set_default_color_theme("blue")
             self.frame = ctk.CTkFrame(self.root, corner_radius=0)
@@ -105,13 +163,19 @@ class iVisionPrototypeApp:
                                bg="black", highlightthickness=0))
         self.canvas.pack(pady=10)
         self.canvas.bind("<Button-1>", self._on_canvas_click)
+        self._expose_binding = self.canvas.bind("<Expose>", self._on_first_expose, add="+")
         
         # Initialize HUD
-        self.hud_manager = HUDManager(self.canvas, self.canvas_w, self.canvas_h)
+        self.canvas_frame = CanvasFrame(self.canvas, stats=self.perf)
+        self.scene = SceneGraph(self.canvas)
+        self.hud_manager = HUDManager(self.canvas, self.canvas_w, self.canvas_h, self.scene, self.ticks)
         self.hud_manager.create_items()
+        self.hud_manager.add_provider(ClockProvider())
+        self.hud_manager.add_provider(BatteryProvider())
+        self.hud_manager.add_provider(PerfProvider(self.perf), active=False)
+        self.toast = StatusToast(self.canvas, self.canvas_w, self.canvas_h, TOAST_MS)
         
-        # Start HUD updates
-        self.root.after(1000, self._update_hud_timer)
+        self.ticks.add("captures", CAPTURE_POLL_MS, self._poll_captures)
 
     def _create_controls(self):
         """Create bottom control buttons."""
@@ -120,18 +184,27 @@ class iVisionPrototypeApp:
         
         tk.Button(ctrl, text="Menu", command=self.show_menu, width=12).pack(side="left", padx=6)
         tk.Button(ctrl, text="CarScan", command=self.open_carscan, width=14).pack(side="left", padx=6)
+        tk.Button(ctrl, text="Scan Session", command=self.start_scan_session, width=14).pack(side="left", padx=6)
         tk.Button(ctrl, text="Navigation", command=self.open_navigation, width=16).pack(side="left", padx=6)
         tk.Button(ctrl, text="Capture Frame", command=self.capture_frame, width=16).pack(side="right", padx=6)
         tk.Button(ctrl, text="Crown", command=self.settings_panel.toggle, width=10).pack(side="right", padx=6)
 
     def update_overlay(self):
         """Update the glasses overlay with current parameters."""
-        self.overlay_img, self.knob_bbox = self.glasses_overlay.generate(
-            ipd_px=self.lens_params['ipd'],
-            lens_w_ratio=self.lens_params['lens_w_ratio'],
-            lens_h_ratio=self.lens_params['lens_h_ratio']
-        )
         self._redraw_base()
+        if self._presented_scale != 1.0:
+            return
+        
+        # Warm neighbouring slider values so the next drag step is a cache hit
+        self.glasses_overlay.prewarm(
+            self.lens_params['ipd'],
+            self.lens_params['lens_w_ratio'],
+            self.lens_params['lens_h_ratio']
+        )
+
+    def request_lens_update(self):
+        """Schedule a lens update; slider ticks within one frame are coalesced."""
+        self.render_scheduler.request()
 
     def update_lens_params(self):
         """Update lens parameters from settings panel."""
@@ -140,52 +213,178 @@ class iVisionPrototypeApp:
             self.lens_params['lens_w_ratio'] = float(self.settings_panel.variables['lens_w'].get())
             self.lens_params['lens_h_ratio'] = float(self.settings_panel.variables['lens_h'].get())
             self.update_overlay()
-            self.hud_manager.position_items(self.get_lens_geometry())
+            with self.perf.stage("hud"):
+                self.hud_manager.position_items(self.get_lens_geometry())
 
     def get_lens_geometry(self):
         """Get current lens geometry for positioning calculations."""
-        w, h = self.canvas_w, self.canvas_h
-        cx = w // 2
-        cy = int(h * 0.53)
-        lw = int(w * self.lens_params['lens_w_ratio'])
-        lh = int(h * self.lens_params['lens_h_ratio'])
-        ipd_eff = max(self.lens_params['ipd'], lw + DEFAULT_BRIDGE_MIN)
-        
-        lx_c = (cx - ipd_eff // 2, cy)
-        rx_c = (cx + ipd_eff // 2, cy)
-        
-        def bbox(c):
-            x, y = c
-            return [x - lw//2, y - lh//2, x + lw//2, y + lh//2]
-            
-        return bbox(lx_c), bbox(rx_c)
+        return lens_geometry((self.canvas_w, self.canvas_h), self.lens_params['ipd'],
+                             self.lens_params['lens_w_ratio'], self.lens_params['lens_h_ratio'])
 
-    def _redraw_base(self):
-        """Redraw the base composite image."""
-        comp = Image.alpha_composite(self.bg_resized.convert("RGBA"), self.overlay_img)
-        self.composite_img = comp
-        self.tk_img = ImageTk.PhotoImage(self.composite_img)
-        
-        if hasattr(self, "canvas_img_id"):
-            self.canvas.itemconfigure(self.canvas_img_id, image=self.tk_img)
+    def _redraw_base(self, timed=True):
+        """Redraw the base composite image, touching only regions that changed.
+
+        With dynamic resolution the frame is rendered at the controller's
+        current scale, and its render time is fed back to the controller.
+        """
+        t0 = time.perf_counter()
+        scale = self.resolution.scale if self.resolution is not None else 1.0
+        self.composite_img, dirty = self.renderer.render_base(self.lens_params, scale)
+        self.knob_bbox = self.renderer.knob_bbox
+        if scale != self._presented_scale:
+            # Each scale has its own frame buffer; the canvas must show all of the new one
+            dirty = [(0, 0, self.canvas_w, self.canvas_h)]
+            self._presented_scale = scale
+        if self.stereo is not None:
+            self._present_stereo(dirty)
         else:
-            self.canvas_img_id = self.canvas.create_image(0, 0, anchor="nw", image=self.tk_img)
+            self.canvas_frame.present(self.composite_img, dirty)
+            self.canvas_img_id = self.canvas_frame.item_id
+        self.perf.frame()
+        if self.resolution is not None and timed and dirty:
+            self._frame_rendered((time.perf_counter() - t0) * 1000)
+
+    def _present_stereo(self, dirty=None):
+        """Show the side-by-side eye views of the current frame, HUD and mode items included.
+
+        The scene graph is rasterized into a copy of the frame (its canvas items
+        stay under the stereo image). That copy is kept and only the frame's
+        dirty boxes and the extents of changed nodes are redrawn in it.
+        """
+        if dirty is not None and not dirty and self.scene.version == self._stereo_scene_version:
+            return
+        with self.perf.stage("stereo"):
+            if dirty is None or self._stereo_source is None:
+                self._stereo_source = self.composite_img.copy()
+                self.scene.rasterize(ImageDraw.Draw(self._stereo_source))
+                dirty = None
+            else:
+                if self.scene.version != self._stereo_scene_version:
+                    dirty = list(dirty) + self.scene.changed_boxes(self._stereo_nodes)
+                w, h = self._stereo_source.size
+                dirty = [(max(x1, 0), max(y1, 0), min(x2, w), min(y2, h)) for x1, y1, x2, y2 in dirty]
+                dirty = [box for box in dirty if box[0] < box[2] and box[1] < box[3]]
+                for box in dirty:
+                    patch = self.composite_img.crop(box)
+                    self.scene.rasterize(ImageDraw.Draw(patch), box)
+                    self._stereo_source.paste(patch, box[:2])
+            self._stereo_scene_version = self.scene.version
+            self._stereo_nodes = dict(self.scene.nodes)
+            image, rects = self.stereo.render(self._stereo_source, self.get_lens_geometry(), dirty)
+        self.stereo_frame.present(image, rects)
+        self.canvas.tag_raise(self.stereo_frame.item_id)
+        self.canvas.tag_raise(TOPMOST_TAG)
+
+    def _poll_stereo(self):
+        """Refresh the eye views when HUD or mode items changed without a new frame."""
+        if self.scene.version != self._stereo_scene_version:
+            self._present_stereo([])
+
+    def toggle_stereo_view(self):
+        """Switch the canvas between the mono frame and side-by-side left/right eye views."""
+        if self.stereo is not None:
+            self.ticks.remove("stereo")
+            self.canvas.delete(self.stereo_frame.item_id)
+            self.stereo = self.stereo_frame = None
+            self._presented_scale = None    # the mono image was not updated meanwhile
+            self._redraw_base(timed=False)
+            return
+        load_optional_modules()
+        if image_processing.np is None:
+            self.toast.show("Stereo view needs NumPy")
+            return
+        self.stereo = StereoFrame((self.canvas_w, self.canvas_h))
+        self.stereo_frame = CanvasFrame(self.canvas, stats=self.perf)
+        self._stereo_source = None
+        self.ticks.add("stereo", 1000 / RENDER_FPS, self._poll_stereo)
+        self._present_stereo()
+
+    def _frame_rendered(self, frame_ms):
+        """Feed a frame time to the resolution controller; full resolution returns once idle."""
+        self.resolution.record(frame_ms)
+        if self._idle_job is not None:
+            self.root.after_cancel(self._idle_job)
+            self._idle_job = None
+        if self.resolution.scale < 1.0:
+            self._idle_job = self.root.after(RESOLUTION_IDLE_MS, self._restore_full_resolution)
+
+    def _restore_full_resolution(self):
+        self._idle_job = None
+        if self.resolution.reset():
+            self._redraw_base(timed=False)
+            self.glasses_overlay.prewarm(self.lens_params['ipd'], self.lens_params['lens_w_ratio'],
+                                         self.lens_params['lens_h_ratio'])
+
+    def _on_first_expose(self, event):
+        """Finish startup timing once the canvas has been painted for the first time."""
+        self.canvas.unbind("<Expose>", self._expose_binding)
+        # Canvas redraw runs as an idle handler queued by this expose; measure after it
+        self.root.after_idle(self._on_first_paint)
+
+    def _on_first_paint(self):
+        """Report time-to-first-frame and warm up deferred imports in fast-start mode."""
+        STARTUP.mark("first_paint")
+        if STARTUP_TIMING:
+            print(f"Startup: {STARTUP.report()}")
+        if FAST_START:
+            self._preload = threading.Thread(target=load_optional_modules, name="preload", daemon=True)
+            self._preload.start()
+            self.ticks.add("preload", CAPTURE_POLL_MS, self._poll_preload)
+
+    def _poll_preload(self):
+        """Redraw once NumPy/OpenCV are loaded, so the lens effect appears."""
+        if self._preload.is_alive():
+            return
+        self.ticks.remove("preload")
+        self._redraw_base(timed=False)
 
     def _on_canvas_click(self, event):
         """Handle canvas clicks for digital crown interaction."""
         if self.knob_bbox:
+            x, y = self.stereo.to_frame(event.x, event.y) if self.stereo is not None else (event.x, event.y)
             x1, y1, x2, y2 = self.knob_bbox
-            if x1 <= event.x <= x2 and y1 <= event.y <= y2:
+            if x1 <= x <= x2 and y1 <= y <= y2:
                 self.settings_panel.toggle()
 
-    def _update_hud_timer(self):
-        """Update HUD elements periodically."""
-        self.hud_manager.update_time()
-        self.root.after(1000, self._update_hud_timer)
+    def toggle_perf_hud(self):
+        """Toggle the on-lens performance HUD (enables stats collection)."""
+        visible = not self.hud_manager.perf_visible
+        if visible:
+            self.perf.enabled = True
+        self.hud_manager.set_perf_visible(visible)
+
+    def _pump_frames(self):
+        """Composite the newest frame from the live source under the cached overlay."""
+        frame = self.frame_source.get_latest()
+        if frame is not None:
+            self.bg_resized = frame
+            self.renderer.set_background(frame)
+            self._redraw_base()
+        elif self.frame_source.error is not None:
+            self.ticks.remove("frame_source")
+            self.toast.show(f"Frame source stopped: {self.frame_source.error}")
+
+    def on_close(self):
+        """Dump performance stats (if collected) and close the window."""
+        if self.perf.enabled:
+            counters = {"startup": STARTUP.report(), "scene": self.scene.stats(), "ticks": self.ticks.stats(),
+                        "render": self.render_scheduler.stats()}
+            if self.resolution is not None:
+                counters["resolution"] = self.resolution.stats()
+            if self.frame_source is not None:
+                counters["frame_source"] = self.frame_source.stats()
+            self.perf.dump(PERF_STATS_PATH, **counters)
+        if self.frame_source is not None:
+            self.frame_source.stop()
+        self.ticks.stop()
+        self.capture_pipeline.shutdown(wait=False)
+        self.session_runner.shutdown(wait=False)
+        self.root.destroy()
 
     # Mode switching methods
     def show_menu(self):
         """Show main menu."""
+        self.scan_session = None
         self._switch_mode("menu")
         # Clear any mode overlays when returning to menu
         for mode in self.modes.values():
@@ -194,12 +393,14 @@ class iVisionPrototypeApp:
     def open_navigation(self):
         """Open navigation mode."""
         self._switch_mode("navigation")
-        self.modes['navigation'].activate()
+        with self.perf.stage("mode_activate"):
+            self.modes['navigation'].activate()
 
     def open_carscan(self):
         """Open car scan mode."""
         self._switch_mode("carscan")
-        self.modes['carscan'].activate()
+        with self.perf.stage("mode_activate"):
+            self.modes['carscan'].activate()
 
     def _switch_mode(self, mode_name):
         """Switch to a different mode."""
@@ -212,15 +413,30 @@ class iVisionPrototypeApp:
 
     def capture_frame(self):
         """Capture current frame with metadata."""
-        comp = Image.alpha_composite(self.bg_resized.convert("RGBA"), self.overlay_img)
-        draw = ImageDraw.Draw(comp)
+        # The scene graph holds exactly what is on screen (HUD and mode overlays). It goes on
+        # a layer of its own so damage detection only sees the frame, not the guide items.
+        comp = self.renderer.render_base(self.lens_params)[0].copy()   # full resolution
+        overlay = Image.new("RGBA", comp.size, (0, 0, 0, 0))
+        self.scene.rasterize(ImageDraw.Draw(overlay))
+        stereo = None
+        if STEREO_CAPTURE:
+            load_optional_modules()
+            if image_processing.np is not None:
+                # StereoFrames of their own: the images share their buffers, nothing else writes to them
+                geometry = self.get_lens_geometry()
+                stereo = StereoFrame(comp.size)
+                comp, _ = stereo.render(comp, geometry)
+                overlay, _ = StereoFrame(overlay.size).render(overlay, geometry)
         ts = int(time.time())
         
         meta = {
+            "capture_id": new_capture_id(),
             "timestamp": ts,
             "mode": self.mode,
             "lens_params": self.lens_params.copy()
         }
+        if stereo is not None:
+            meta["stereo"] = stereo.meta()
 
         # Add mode-specific metadata
         if self.mode == "carscan" and 'carscan' in self.modes:
@@ -229,33 +445,95 @@ class iVisionPrototypeApp:
             target_pos = carscan_mode.get_current_target_position()
             if target_pos:
                 meta["guide_center"] = target_pos
-                # Draw highlight on capture
-                mx, my = target_pos
-                draw.ellipse([mx - 30, my - 30, mx + 30, my + 30], 
-                           outline=(0, 255, 0, 255), width=6)
-
-        # Save files
-        img_fn = CAPTURE_DIR / f"capture_{ts}.png"
-        comp.convert("RGB").save(img_fn)
-        
-        det = detect_damage_edges(comp.convert("RGB"))
-        det_fn = CAPTURE_DIR / f"capture_{ts}_det.png"
-        det.convert("RGB").save(det_fn)
-        
-        with open(CAPTURE_DIR / f"capture_{ts}.json", "w") as f:
-            json.dump(meta, f, indent=2)
+                meta["roi"] = carscan_mode.get_detection_roi()
+                if stereo is not None:
+                    # Both eyes show the guide; detect once, in the view of the eye that
+                    # sees the target (a target right of the left window is only in eye 1)
+                    eye = stereo.eye_at((meta["roi"][0] + meta["roi"][2]) / 2)
+                    meta["roi"] = stereo.to_view(meta["roi"], eye=eye)
+                    meta["guide_center"] = stereo.point_to_view(target_pos, eye=eye)
+            if self.scan_session is not None:
+                self._add_session_capture(comp, meta, overlay)
+                return
+
+        # Encoding, detection and writes happen on the capture pipeline
+        if self.capture_pipeline.submit(comp, meta, overlay) is None:
+            self.toast.show("Capture busy - try again in a moment")
+            return
+        self.toast.show("Capturing…")
 
-        messagebox.showinfo("Capture saved", f"Saved {img_fn.name}\nDamage overlay: {det_fn.name}")
-        self.refresh_canvas_view()
+    def _poll_captures(self):
+        """Collect finished captures from the pipeline and report them."""
+        for result in self.capture_pipeline.poll():
+            if result["error"] is not None:
+                self.toast.show(f"Capture failed: {result['error']}")
+            else:
+                self.refresh_canvas_view()
+                self.toast.show(f"Saved {result['location']}")
+
+    def start_scan_session(self):
+        """Start a CarScan session: one capture per guide step, processed together at the end."""
+        if self._session_future is not None:
+            self.toast.show("Previous scan session is still processing")
+            return
+        self.open_carscan()
+        self.scan_session = ScanSession()
+        self.toast.show(f"Scan session: capture step 1/{self.scan_session.steps}")
+
+    def _add_session_capture(self, comp, meta, overlay):
+        """Record a session step, then move the guide on or start processing the session."""
+        session = self.scan_session
+        session.add(comp, meta, overlay)
+        if not session.complete:
+            step = session.next_step()
+            self.modes['carscan'].show_step(step)
+            self.toast.show(f"Scan session: capture step {step + 1}/{session.steps}")
+            return
+
+        self.scan_session = None
+        self._session_future = self.session_runner.submit(session.run,
+                                                          catalog=self.capture_pipeline.catalog)
+        self.ticks.add("session", CAPTURE_POLL_MS, self._poll_session)
+        self.toast.show(f"Processing {session.steps} captures…")
+
+    def _poll_session(self):
+        """Report the scan session once its processing has finished."""
+        if not self._session_future.done():
+            return
+        future, self._session_future = self._session_future, None
+        self.ticks.remove("session")
+        try:
+            summary = future.result()
+        except Exception as exc:
+            self.toast.show(f"Scan session failed: {exc}")
+            return
+        timings = summary["timings"]
+        self.toast.show(f"Session {summary['session_id']}: {len(summary['steps'])} steps in "
+                        f"{timings['total_ms'] / 1000:.1f}s (serial {timings['sum_step_ms'] / 1000:.1f}s)")
 
     def refresh_canvas_view(self):
         """Refresh the canvas view maintaining overlays."""
         self._redraw_base()
-        self.hud_manager.position_items(self.get_lens_geometry())
+        with self.perf.stage("hud"):
+            self.hud_manager.position_items(self.get_lens_geometry())
         
         # Refresh active mode overlays
         if self.mode in self.modes:
-            self.modes[self.mode].activate()
+            with self.perf.stage("mode_refresh"):
+                self.modes[self.mode].refresh()
             
         if self.settings_panel.panel and self.settings_panel.panel.winfo_exists():
-            self.settings_panel.panel.lift()
\ No newline at end of file
+            self.settings_panel.panel.lift()
+
+
+def run_app():
+    """Create the Tk root and run the application."""
+    using_custom = TK_FRAME == "custom"
+    root = load_ctk().CTk() if using_custom else tk.Tk()
+    iVisionPrototypeApp(root, using_custom=using_custom)
+    root.geometry("1040x780")
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    run_app()
@@ -1,42 +1,309 @@
 """Image processing utilities for the iVision application"""
-from PIL import Image, ImageDraw, ImageFilter, ImageOps
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from PIL import Image, ImageDraw, ImageFilter, ImageOps, PngImagePlugin
 from pathlib import Path
-from config import IMAGE_PATH
+from config import (IMAGE_PATH, DETECTOR_SETTINGS, BACKGROUND_CACHE_DIR, ROI_CACHE_SIZE,
+                    DAMAGE_MAX_REGIONS)
 
-try:
-    import cv2
-    import numpy as np
-    CV2_AVAILABLE = True
-except:
-    CV2_AVAILABLE = False
-    cv2 = None
-    np = None
+# OpenCV and NumPy are imported on first detection (see load_optional_modules)
+# so they do not slow down application startup.
+cv2 = None
+np = None
+numpy_detector = None
+CV2_AVAILABLE = False
+_optional_loaded = False
+_optional_lock = threading.Lock()
 
+EXIF_IMAGE_DESCRIPTION = 0x010E   # carries the detector fingerprint in JPEG/WebP detection images
 
-def load_background_image():
-    """Load and return the background iamge"""
-    if not Path(IMAGE_PATH).exists():
+
+def load_optional_modules():
+    """Import OpenCV and NumPy if available. Cheap after the first call; thread-safe."""
+    global cv2, np, numpy_detector, CV2_AVAILABLE, _optional_loaded
+    if _optional_loaded:
+        return
+    with _optional_lock:
+        if _optional_loaded:
+            return
+        cv = None
+        try:
+            import numpy as numpy_mod
+            import numpy_detector as nd
+        except Exception:
+            numpy_mod = nd = None
+        try:
+            import cv2 as cv
+        except Exception:
+            pass
+        # Publish only once both imports are done, OpenCV first: code that sees NumPy
+        # (e.g. LensTables choosing its path) must already see whether OpenCV is there
+        cv2, CV2_AVAILABLE = cv, cv is not None
+        np, numpy_detector = numpy_mod, nd
+        _optional_loaded = True
+
+
+def _background_cache_path(path, size):
+    """Cache file for `path` scaled to `size`; the key includes the source mtime."""
+    src = Path(path).resolve()
+    key = f"{src}|{src.stat().st_mtime_ns}|{size[0]}x{size[1]}"
+    return BACKGROUND_CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.ppm"
+
+def load_background_image(size=None, path=IMAGE_PATH):
+    """Load and return the background iamge, scaled to `size` if given.
+
+    Scaled backgrounds are cached on disk. On a cache miss JPEGs are decoded in
+    draft mode (DCT-domain downscaling) before the final LANCZOS resize, so the
+    full-resolution image is never held in memory.
+    """
+    if not Path(path).exists():
         bg = Image.new("RGB", (1200, 600), (100, 120, 130))
         d = ImageDraw.Draw(bg)
-        d.text((20,20), "Background image not found at:\n" + IMAGE_PATH, fill=(255,255,255))
-        return bg
-    return Image.open(IMAGE_PATH).convert("RGB")
+        d.text((20,20), "Background image not found at:\n" + str(path), fill=(255,255,255))
+        return bg.resize(size, Image.LANCZOS) if size else bg
+    if size is None:
+        return Image.open(path).convert("RGB")
 
-def detect_damage_edges(pil_img):
-    """Apply edge detection to highlight potential damage areas."""
-    if not CV2_AVAILABLE or np is None:
+    size = tuple(size)
+    cache_fn = _background_cache_path(path, size)
+    if cache_fn.exists():
+        try:
+            with Image.open(cache_fn) as im:
+                return im.convert("RGB")
+        except OSError:
+            pass
+
+    with Image.open(path) as im:
+        im.draft("RGB", size)
+        bg = im.convert("RGB")
+    if bg.size != size:
+        bg = bg.resize(size, Image.LANCZOS)
+
+    try:
+        cache_fn.parent.mkdir(parents=True, exist_ok=True)
+        tmp_fn = cache_fn.with_suffix(".tmp")
+        bg.save(tmp_fn, format="PPM")
+        tmp_fn.replace(cache_fn)
+    except OSError:
+        pass
+    return bg
+
+def detector_settings(overrides=None):
+    """Return DETECTOR_SETTINGS with any overrides applied."""
+    settings = dict(DETECTOR_SETTINGS)
+    if overrides:
+        settings.update(overrides)
+    return settings
+
+def detection_engine(settings=None):
+    """Resolve the 'engine' setting ('auto', 'cv2', 'numpy' or 'pil') to an available engine."""
+    load_optional_modules()
+    engine = detector_settings(settings)['engine']
+    if engine == "cv2" and CV2_AVAILABLE and np is not None:
+        return "cv2"
+    if engine in ("cv2", "numpy") and np is not None:
+        return "numpy"
+    if engine == "auto":
+        if CV2_AVAILABLE and np is not None:
+            return "cv2"
+        if np is not None:
+            return "numpy"
+    return "pil"
+
+def detector_fingerprint(settings=None):
+    """Short stable hash identifying the detector implementation and settings."""
+    s = detector_settings(settings)
+    s['engine'] = detection_engine(s)
+    payload = json.dumps(s, sort_keys=True)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+def detector_pnginfo(settings=None):
+    """PNG text chunk recording which detector settings produced an image."""
+    info = PngImagePlugin.PngInfo()
+    info.add_text("ivision_detector", detector_fingerprint(settings))
+    return info
+
+def detector_save_params(fmt, settings=None):
+    """Image.save() keyword arguments embedding the detector fingerprint in `fmt` images.
+
+    PNG gets a text chunk; JPEG and WebP, which have no text chunks, get an
+    EXIF ImageDescription instead.
+    """
+    if fmt == "PNG":
+        return {"pnginfo": detector_pnginfo(settings)}
+    exif = Image.Exif()
+    exif[EXIF_IMAGE_DESCRIPTION] = f"ivision_detector={detector_fingerprint(settings)}"
+    return {"exif": exif}
+
+def read_detector_fingerprint(path):
+    """Return the detector fingerprint stored in a detection image, or None."""
+    try:
+        with Image.open(path) as im:
+            fingerprint = getattr(im, "text", {}).get("ivision_detector")
+            if fingerprint is None:
+                description = im.getexif().get(EXIF_IMAGE_DESCRIPTION, "")
+                if description.startswith("ivision_detector="):
+                    fingerprint = description.split("=", 1)[1]
+            return fingerprint
+    except (OSError, AttributeError):
+        return None
+
+class DamageResult:
+    """Detection output: the overlay image plus the connected damage regions it highlights.
+
+    `regions` is a list of JSON-ready dicts (bbox, area, edge_density, contour)
+    in image coordinates, largest first; None when the engine cannot label
+    regions (the PIL fallback).
+    """
+
+    def __init__(self, image, regions=None):
+        self.image = image
+        self.regions = regions
+
+    @classmethod
+    def from_stats(cls, image, stats):
+        """Build from numpy_detector.region_stats arrays."""
+        regions = [
+            {"bbox": bbox, "area": area, "edge_density": round(density, 4), "contour": contour}
+            for bbox, area, density, contour in zip(
+                stats['bbox'].tolist(), stats['area'].tolist(),
+                stats['edge_density'].tolist(), stats['contour'].tolist())
+        ]
+        return cls(image, regions)
+
+    @property
+    def summary(self):
+        """Region count and total damaged area, or None without regions."""
+        if self.regions is None:
+            return None
+        return {"count": len(self.regions), "total_area": sum(r["area"] for r in self.regions)}
+
+    def offset(self, dx, dy):
+        """Copy with region coordinates shifted by (dx, dy), e.g. from ROI to frame coordinates."""
+        if self.regions is None or not (dx or dy):
+            return DamageResult(self.image, self.regions)
+        regions = [dict(r, bbox=[r["bbox"][0] + dx, r["bbox"][1] + dy, r["bbox"][2] + dx, r["bbox"][3] + dy],
+                        contour=[[x + dx, y + dy] for x, y in r["contour"]])
+                   for r in self.regions]
+        return DamageResult(self.image, regions)
+
+    def to_meta(self):
+        """The "damage" entry stored in capture metadata."""
+        if self.regions is None:
+            return None
+        return dict(self.summary, regions=self.regions)
+
+
+def as_damage_result(result):
+    """Wrap a plain overlay image returned by a custom detector."""
+    return result if isinstance(result, DamageResult) else DamageResult(result)
+
+def detect_damage(pil_img, settings=None):
+    """Detect damage edges, group them into connected regions and render the overlay from those regions.
+
+    Regions smaller than 'min_region_area' pixels are dropped and at most
+    DAMAGE_MAX_REGIONS (the largest) are kept; only kept regions are highlighted.
+    """
+    s = detector_settings(settings)
+    engine = detection_engine(s)
+    if engine == "pil":
         img = pil_img.convert("L").filter(ImageFilter.FIND_EDGES)
         colored = ImageOps.colorize(img, black="black", white="lime")
-        return Image.blend(pil_img.convert("RGBA"), colored.convert("RGBA"), alpha=0.35)
-    
-    arr = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-    gray = cv2.cvtColor(arr, cv2.COLOR_BGR2GRAY)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    g = clahe.apply(gray)
-    edges = cv2.Canny(g, 60, 150)
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-    edges = cv2.dilate(edges, kernel, iterations=1)
-    overlay = arr.copy()
-    overlay[edges > 0] = (0, 255, 0)
-    blended = cv2.addWeighted(arr, 0.7, overlay, 0.3, 0)
-    return Image.fromarray(cv2.cvtColor(blended, cv2.COLOR_BGR2RGB)).convert("RGBA")
\ No newline at end of file
+        return DamageResult(Image.blend(pil_img.convert("RGBA"), colored.convert("RGBA"), alpha=0.35))
+
+    rgb = np.array(pil_img.convert("RGB"))
+    if engine == "numpy":
+        g = numpy_detector.clahe(numpy_detector.to_gray(rgb), s['clahe_clip'], s['clahe_tiles'])
+        edges = numpy_detector.canny(g, s['canny_low'], s['canny_high'])
+        labels, _ = numpy_detector.component_image(numpy_detector.dilate(edges, s['dilate']))
+    else:
+        gray = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+        clahe = cv2.createCLAHE(clipLimit=s['clahe_clip'], tileGridSize=(s['clahe_tiles'], s['clahe_tiles']))
+        edges = cv2.Canny(clahe.apply(gray), s['canny_low'], s['canny_high'])
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (s['dilate'], s['dilate']))
+        _, labels = cv2.connectedComponents(cv2.dilate(edges, kernel, iterations=1), connectivity=8)
+        edges = edges > 0
+
+    stats = numpy_detector.region_stats(labels, edges, s['min_region_area'], DAMAGE_MAX_REGIONS)
+    keep = np.zeros(labels.max() + 1, dtype=bool)
+    keep[stats['id']] = True
+    numpy_detector.blend(rgb, keep[labels], s['blend'])
+    return DamageResult.from_stats(Image.fromarray(rgb).convert("RGBA"), stats)
+
+def detect_damage_edges(pil_img, settings=None):
+    """Apply edge detection to highlight potential damage areas."""
+    return detect_damage(pil_img, settings).image
+
+
+def roi_box(center, radius, size):
+    """Square (x1, y1, x2, y2) of half-size `radius` around `center`, clamped to `size`."""
+    (cx, cy), (w, h) = center, size
+    return (max(0, int(cx - radius)), max(0, int(cy - radius)),
+            min(w, int(cx + radius)), min(h, int(cy + radius)))
+
+
+class RoiDetectionCache:
+    """Thread-safe LRU of ROI detection results keyed by (key, box, ROI content hash, settings)."""
+
+    def __init__(self, size=ROI_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+def detector_cache_key(detector):
+    """Identifies `detector` in ROI cache keys.
+
+    A detector may carry a `fingerprint` attribute describing its settings;
+    detect_damage uses the current DETECTOR_SETTINGS fingerprint, and any
+    other callable only matches itself.
+    """
+    fingerprint = getattr(detector, "fingerprint", None)
+    if fingerprint is not None:
+        return fingerprint
+    if detector is detect_damage:
+        return detector_fingerprint()
+    return detector
+
+def detect_damage_roi(pil_img, box, detector=detect_damage, cache=None, key=None):
+    """Run `detector` on `box` only and paste the result into a copy of the full frame.
+
+    Returns (DamageResult, cached) with regions in frame coordinates. With a
+    `cache`, results are reused when the ROI pixels, box, detector and `key`
+    (e.g. the guide step) match.
+    """
+    crop = pil_img.convert("RGB").crop(box)
+    result = None
+    if cache is not None:
+        digest = hashlib.blake2b(crop.tobytes(), digest_size=16).hexdigest()
+        cache_key = (key, tuple(box), digest, detector_cache_key(detector))
+        result = cache.get(cache_key)
+    cached = result is not None
+    if not cached:
+        result = as_damage_result(detector(crop))
+        if cache is not None:
+            cache.put(cache_key, result)
+    out = pil_img.convert("RGBA")
+    out.paste(result.image.convert("RGBA"), box[:2])
+    return DamageResult(out, result.offset(*box[:2]).regions), cached
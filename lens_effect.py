@@ -0,0 +1,159 @@
+"""Lens effect applied to the background inside each lens: barrel distortion,
+chromatic fringe and vignette.
+
+Remap and weight tables depend only on the lens size, so they are computed
+once per size and cached; moving the lenses (IPD slider) only offsets them.
+Remapping uses OpenCV when it is loaded and NumPy nearest-neighbour gathers
+otherwise; only the tables for the path in use are kept. Nothing is applied
+until NumPy is available (see image_processing.load_optional_modules), so
+startup is not slowed down.
+"""
+import threading
+from collections import OrderedDict
+from PIL import Image
+import image_processing
+from config import LENS_DISTORTION, LENS_CHROMATIC, LENS_VIGNETTE, LENS_TABLE_CACHE_SIZE
+
+
+class LensTables:
+    """Per-size remap tables: source coordinates per RGB channel and vignette weights.
+
+    Coordinates are relative to the lens box. Outside the lens ellipse the
+    maps are the identity and the weight is 255, so the whole box can be
+    remapped without a mask. With OpenCV loaded the maps are kept in its
+    fixed-point format (`fixed`), otherwise as clipped int32 indices
+    (`index`); about 2 MB per table for a 300 px lens either way.
+    """
+
+    def __init__(self, w, h, distortion, chromatic, vignette):
+        np = image_processing.np
+        ys, xs = np.mgrid[0:h, 0:w].astype(np.float32)
+        cx, cy = (w - 1) / 2, (h - 1) / 2
+        dx, dy = xs - cx, ys - cy
+        r2 = (dx / (w / 2)) ** 2 + (dy / (h / 2)) ** 2
+        outside = r2 > 1.0
+        # Barrel: sample closer to the centre (magnified) in the middle, unchanged at the rim
+        scale = 1.0 - distortion * (1.0 - r2)
+        self.fixed = []         # (map1, map2) in OpenCV's fixed-point format for R, G, B
+        self.index = []         # (ix, iy) rounded and clipped to the box, for the NumPy path
+        for fringe in (1.0 + chromatic * r2, 1.0, 1.0 - chromatic * r2):
+            mx = np.where(outside, xs, cx + dx * scale * fringe).astype(np.float32)
+            my = np.where(outside, ys, cy + dy * scale * fringe).astype(np.float32)
+            if image_processing.CV2_AVAILABLE:
+                cv2 = image_processing.cv2
+                self.fixed.append(cv2.convertMaps(mx, my, cv2.CV_16SC2))
+            else:
+                self.index.append((np.clip(np.rint(mx), 0, w - 1).astype(np.int32),
+                                   np.clip(np.rint(my), 0, h - 1).astype(np.int32)))
+        weight = np.where(outside, 1.0, np.clip(1.0 - vignette * r2 * r2, 0.0, 1.0))
+        self.weight = np.repeat((weight * 255).round().astype(np.uint8)[..., None], 3, axis=2)
+
+
+class LensEffect:
+    """Applies the lens effect to lens boxes of an RGBA background array."""
+
+    def __init__(self, distortion=LENS_DISTORTION, chromatic=LENS_CHROMATIC, vignette=LENS_VIGNETTE,
+                 cache_size=LENS_TABLE_CACHE_SIZE):
+        self.params = (distortion, chromatic, vignette)
+        self.cache_size = cache_size
+        self._tables = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self):
+        # Not before load_optional_modules has finished: the tables' path depends on OpenCV too
+        return image_processing._optional_loaded and image_processing.np is not None
+
+    def tables(self, w, h):
+        """LensTables for a w x h lens, from the LRU cache when possible."""
+        key = (w, h)
+        with self._lock:
+            tables = self._tables.get(key)
+            if tables is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return tables
+            self.misses += 1
+        tables = LensTables(w, h, *self.params)
+        with self._lock:
+            self._tables[key] = tables
+            while len(self._tables) > self.cache_size:
+                self._tables.popitem(last=False)
+        return tables
+
+    def apply(self, src, out, box):
+        """Write the lensed pixels of `box` (x1, y1, x2, y2) from `src` into `out` (both H x W x 4)."""
+        np = image_processing.np
+        x1, y1, x2, y2 = box
+        H, W = src.shape[:2]
+        vx1, vy1, vx2, vy2 = max(x1, 0), max(y1, 0), min(x2, W), min(y2, H)
+        if vx1 >= vx2 or vy1 >= vy2:
+            return
+        t = self.tables(x2 - x1, y2 - y1)
+        region = src[vy1:vy2, vx1:vx2, :3]
+        # Lens partly off the frame: remap the whole box over the crop padded with its edge
+        # pixels (what BORDER_REPLICATE would sample), then keep the visible part
+        pad = (vy1 - y1, y2 - vy2, vx1 - x1, x2 - vx2)
+        sl = (slice(pad[0], pad[0] + vy2 - vy1), slice(pad[2], pad[2] + vx2 - vx1))
+
+        if t.fixed:
+            cv2 = image_processing.cv2
+            channels = [region[..., c] for c in range(3)]
+            if any(pad):
+                channels = [cv2.copyMakeBorder(ch, *pad, cv2.BORDER_REPLICATE) for ch in channels]
+            lensed = cv2.merge([cv2.remap(ch, m1, m2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+                                for ch, (m1, m2) in zip(channels, t.fixed)])
+            out[vy1:vy2, vx1:vx2, :3] = cv2.multiply(lensed[sl], t.weight[sl], scale=1 / 255)
+            return
+
+        if any(pad):
+            region = np.pad(region, (pad[:2], pad[2:], (0, 0)), mode="edge")
+        lensed = np.empty(region.shape, dtype=np.uint16)
+        for c, (ix, iy) in enumerate(t.index):
+            lensed[..., c] = region[iy, ix, c]
+        lensed = lensed[sl]
+        lensed *= t.weight[sl]
+        lensed += 127
+        lensed //= 255
+        out[vy1:vy2, vx1:vx2, :3] = lensed
+
+
+class LensedBackground:
+    """A background with the lens effect applied inside the current lens boxes.
+
+    `update` returns the new background and the boxes that changed (around
+    the old and new lens positions), so a FrameCompositor only repaints those.
+    """
+
+    def __init__(self, effect):
+        self.effect = effect
+        self._base = None
+        self.boxes = ()
+
+    def set_base(self, background):
+        """New plain background; the next update redraws the lenses."""
+        self._base = background.convert("RGBA") if background.mode != "RGBA" else background
+        self._array = None
+        self.boxes = ()
+
+    def update(self, boxes):
+        """Returns (background, dirty_boxes), or None if nothing changed or NumPy is not loaded yet."""
+        boxes = tuple(tuple(box) for box in boxes)
+        if boxes == self.boxes or not self.effect.available:
+            return None
+        np = image_processing.np
+        if self._array is None:
+            self._array = np.asarray(self._base)
+        out = self._array.copy()
+        for box in boxes:
+            self.effect.apply(self._array, out, box)
+        if len(self.boxes) == len(boxes):
+            # Lenses moved or resized: one box per lens covering its old and new position
+            dirty = [(min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                     for a, b in zip(self.boxes, boxes)]
+        else:
+            dirty = list(self.boxes) + list(boxes)
+        self.boxes = boxes
+        return Image.fromarray(out), dirty
@@ -3,31 +3,27 @@
 # Requires: Pillow, opencv-python (optional), customtkinter (optional)
 #   pip install pillow opencv-python customtkinter
 
-import os, sys, json, time
+import os, sys, time
+import importlib.util
 from pathlib import Path
-from PIL import Image, ImageTk, ImageDraw, ImageFilter, ImageOps
-
-# --- UI framework: try customtkinter, fallback to tkinter ---
-try:
-    import customtkinter as ctk
-    TK_FRAME = "custom"
-    import tkinter as tk
-    from tkinter import messagebox
-except Exception:
-    TK_FRAME = "tk"
-    import tkinter as tk
-    from tkinter import ttk, messagebox
-
-# --- Optional OpenCV / NumPy ---
-try:
-    import cv2
-    CV2_AVAILABLE = True
-except Exception:
-    CV2_AVAILABLE = False
-try:
-    import numpy as np
-except Exception:
-    np = None
+from PIL import Image, ImageTk, ImageDraw
+from capture_pipeline import CapturePipeline
+from ui_components import StatusToast
+# OpenCV / NumPy φορτώνονται στην πρώτη ανίχνευση (lazy) μέσα στο image_processing
+from image_processing import load_background_image, detect_damage
+
+# --- UI framework: customtkinter αν υπάρχει (import μόνο όταν χρειαστεί), αλλιώς tkinter ---
+import tkinter as tk
+from tkinter import messagebox
+TK_FRAME = "custom" if importlib.util.find_spec("customtkinter") else "tk"
+ctk = None
+
+def load_ctk():
+    global ctk
+    if ctk is None:
+        import customtkinter
+        ctk = customtkinter
+    return ctk
 
 # --- Config / assets ---
 #IMAGE_PATH = "./background/josh-hild-cvi752mY6eA-unsplash.jpg" # dark city
@@ -35,35 +31,9 @@ except Exception:
 IMAGE_PATH = "./background/anastasius-8DkDA67JAIs-unsplash.jpg"
 
 CAPTURE_DIR = Path("./captures")
-CAPTURE_DIR.mkdir(exist_ok=True)
-
-# Load background
-if not Path(IMAGE_PATH).exists():
-    bg = Image.new("RGB", (1200, 600), (100, 120, 130))
-    d = ImageDraw.Draw(bg)
-    d.text((20, 20), "Background image not found at:\n" + IMAGE_PATH, fill=(255, 255, 255))
-else:
-    bg = Image.open(IMAGE_PATH).convert("RGB")
 
 # ---------- Helpers ----------
 
-def detect_damage_edges(pil_img):
-    if not CV2_AVAILABLE or np is None:
-        img = pil_img.convert("L").filter(ImageFilter.FIND_EDGES)
-        colored = ImageOps.colorize(img, black="black", white="lime")
-        return Image.blend(pil_img.convert("RGBA"), colored.convert("RGBA"), alpha=0.35)
-    arr = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-    gray = cv2.cvtColor(arr, cv2.COLOR_BGR2GRAY)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-    g = clahe.apply(gray)
-    edges = cv2.Canny(g, 60, 150)
-    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-    edges = cv2.dilate(edges, kernel, iterations=1)
-    overlay = arr.copy()
-    overlay[edges > 0] = (0, 255, 0)
-    blended = cv2.addWeighted(arr, 0.7, overlay, 0.3, 0)
-    return Image.fromarray(cv2.cvtColor(blended, cv2.COLOR_BGR2RGB)).convert("RGBA")
-
 def make_glasses_overlay_binocular_realistic(
     size=(1200, 600),
     rim_color=(18, 18, 18, 255),
@@ -198,7 +168,8 @@ class iVisionPrototypeApp:
         self.frame.pack(fill="both", expand=True)
 
         self.canvas_w, self.canvas_h = 1000, 520
-        self.bg_resized = bg.copy().resize((self.canvas_w, self.canvas_h), Image.LANCZOS)
+        # scaled (και cached) background - δεν κρατάμε την πλήρη ανάλυση στη μνήμη
+        self.bg_resized = load_background_image((self.canvas_w, self.canvas_h), IMAGE_PATH)
 
         # φακοί – αρχικές παράμετροι
         self._ipd = 240
@@ -211,8 +182,10 @@ class iVisionPrototypeApp:
 
         self.mode = "menu"
         self.captures = []
+        self.capture_pipeline = CapturePipeline(capture_dir=CAPTURE_DIR, detector=detect_damage)
 
         self.create_ui()
+        self.root.after(50, self._poll_captures)
 
     def create_ui(self):
         # Top status
@@ -237,6 +210,7 @@ class iVisionPrototypeApp:
 
         # HUD
         self.create_hud_items()
+        self.toast = StatusToast(self.canvas, self.canvas_w, self.canvas_h)
         
         # Capture click στο crown
         self.canvas.bind("<Button-1>", self._on_canvas_click)
@@ -448,16 +422,20 @@ class iVisionPrototypeApp:
             mx = int((x1 + x2) / 2); my = int((y1 + y2) / 2)
             draw.ellipse([mx - 30, my - 30, mx + 30, my + 30], outline=(0, 255, 0, 255), width=6)
             meta["guide_center"] = [mx, my]
-        img_fn = CAPTURE_DIR / f"capture_{ts}.png"
-        comp.convert("RGB").save(img_fn)
-        det = detect_damage_edges(comp.convert("RGB"))
-        det_fn = CAPTURE_DIR / f"capture_{ts}_det.png"
-        det.convert("RGB").save(det_fn)
-        with open(CAPTURE_DIR / f"capture_{ts}.json", "w") as f:
-            json.dump(meta, f, indent=2)
+        # κωδικοποίηση/ανίχνευση σε background workers
+        if self.capture_pipeline.submit(comp, meta) is None:
+            self.toast.show("Capture busy - try again in a moment")
+            return
+        self.toast.show("Capturing…")
 
-        messagebox.showinfo("Capture saved", f"Saved {img_fn.name}\nDamage overlay: {det_fn.name}")
-        self.refresh_canvas_view()
+    def _poll_captures(self):
+        for result in self.capture_pipeline.poll():
+            if result["error"] is not None:
+                self.toast.show(f"Capture failed: {result['error']}")
+            else:
+                self.refresh_canvas_view()
+                self.toast.show(f"Saved {result['location']}")
+        self.root.after(50, self._poll_captures)
 
     def refresh_canvas_view(self):
         self._redraw_base()
@@ -517,7 +495,7 @@ class iVisionPrototypeApp:
 # --- Main loop ---
 def run_app():
     if TK_FRAME == "custom":
-        root = ctk.CTk()
+        root = load_ctk().CTk()
     else:
         root = tk.Tk()
     app = iVisionPrototypeApp(root, using_custom=(TK_FRAME == "custom"))
@@ -1,5 +1,6 @@
 """Base class for application modes."""
 from abc import ABC, abstractmethod
+from scene_graph import SceneGraph
 
 
 class BaseMode(ABC):
@@ -8,7 +9,8 @@ class BaseMode(ABC):
     def __init__(self, app):
         self.app = app
         self.canvas = app.canvas
-        self.items = []
+        self.scene = app.scene
+        self.items = []     # keys of this mode's nodes in the scene graph
         
     @abstractmethod
     def activate(self):
@@ -20,8 +22,42 @@ class BaseMode(ABC):
         """Deactivate this mode."""
         pass
         
+    def refresh(self):
+        """Redraw this mode's overlay (e.g. after a lens change) without resetting its state."""
+        self.activate()
+        
+    def overlay_state(self):
+        """Return the Tk-independent state needed to rasterize this mode's overlay."""
+        return None
+        
+    @staticmethod
+    def scene_nodes(state, size, lens_geometry):
+        """Return {key: SceneNode} for the overlay described by `state`."""
+        return {}
+        
+    @classmethod
+    def rasterize(cls, draw, state, size, lens_geometry):
+        """Draw the mode overlay described by `state` with a PIL ImageDraw."""
+        scene = SceneGraph()
+        for key, node in cls.scene_nodes(state, size, lens_geometry).items():
+            scene.put(key, node)
+        scene.rasterize(draw)
+        
+    def show_nodes(self, nodes):
+        """Make `nodes` this mode's overlay, dropping any of its nodes no longer present.
+
+        The scene graph keeps the canvas items of dropped nodes hidden in a pool
+        and reuses them for later nodes of the same kind.
+        """
+        for key in self.items:
+            if key not in nodes:
+                self.scene.remove(key)
+        for key, node in nodes.items():
+            self.scene.put(key, node)
+        self.items = list(nodes)
+        
     def clear_items(self):
-        """Clear all mode-specific canvas items."""
-        for item in self.items:
-            self.canvas.delete(item)
+        """Remove all mode-specific nodes from the scene."""
+        for key in self.items:
+            self.scene.remove(key)
         self.items = []
\ No newline at end of file
@@ -1,6 +1,22 @@
 """CarScan mode implementation."""
 from .base_mode import BaseMode
-from config import COLORS
+from config import COLORS, DETECTION_ROI_MARGIN
+from image_processing import roi_box
+from scene_graph import SceneNode
+
+GUIDE_STEPS = [
+    (0.35, 0.35), (0.65, 0.35),
+    (0.20, 0.60), (0.50, 0.60),
+    (0.80, 0.60), (0.35, 0.80),
+    (0.65, 0.80), (0.50, 0.50)
+]
+RING_RADIUS = 40
+
+
+def guide_target(step, canvas_w, canvas_h):
+    """Canvas position of the target for a guide step."""
+    x_rel, y_rel = GUIDE_STEPS[step % len(GUIDE_STEPS)]
+    return int(canvas_w * x_rel), int(canvas_h * y_rel)
 
 
 class CarScanMode(BaseMode):
@@ -20,40 +36,54 @@ class CarScanMode(BaseMode):
         """Deactivate car scan mode."""
         self.clear_items()
         
+    def refresh(self):
+        """Redraw the current guide step."""
+        self.show_guidance_overlay(self.guide_step)
+        
     def show_guidance_overlay(self, step=0):
         """Show guidance overlay for car scanning."""
-        self.clear_items()
-        
-        steps = [
-            (0.35, 0.35), (0.65, 0.35),
-            (0.20, 0.60), (0.50, 0.60),
-            (0.80, 0.60), (0.35, 0.80),
-            (0.65, 0.80), (0.50, 0.50)
-        ]
-        
-        x_rel, y_rel = steps[step % len(steps)]
-        x = int(self.app.canvas_w * x_rel)
-        y = int(self.app.canvas_h * y_rel)
-        
-        ring = self.canvas.create_oval(x - 40, y - 40, x + 40, y + 40, 
-                                      outline=COLORS['hud_text'], width=3)
-        arrow = self.canvas.create_polygon(x, y - 70, x - 10, y - 35, x + 10, y - 35, 
-                                         fill=COLORS['hud_text'])
-        txt = self.canvas.create_text(x, y + 60, text=f"Target {step + 1}", 
-                                     fill=COLORS['hud_text'], font=("Helvetica", 12, "bold"))
-        
-        self.items.extend([ring, arrow, txt])
+        self.show_nodes(self.scene_nodes({"guide_step": step}, (self.app.canvas_w, self.app.canvas_h),
+                                         self.app.get_lens_geometry()))
         
     def next_step(self):
         """Move to next guidance step."""
-        self.guide_step += 1
-        self.show_guidance_overlay(self.guide_step)
+        self.show_step(self.guide_step + 1)
+        
+    def show_step(self, step):
+        """Jump to a guidance step."""
+        self.guide_step = step
+        self.show_guidance_overlay(step)
         
     def get_current_target_position(self):
         """Get the current target position for capture metadata."""
         if self.items:
-            coords = self.canvas.coords(self.items[0])  # Ring coordinates
-            mx = int((coords[0] + coords[2]) / 2)
-            my = int((coords[1] + coords[3]) / 2)
-            return [mx, my]
-        return None
\ No newline at end of file
+            return list(guide_target(self.guide_step, self.app.canvas_w, self.app.canvas_h))
+        return None
+        
+    def get_detection_roi(self):
+        """Box around the current target (ring plus margin) that damage detection is limited to."""
+        target = self.get_current_target_position()
+        if target is None:
+            return None
+        return list(roi_box(target, RING_RADIUS + DETECTION_ROI_MARGIN,
+                            (self.app.canvas_w, self.app.canvas_h)))
+        
+    def overlay_state(self):
+        """Current guide step, or None when no guide is shown."""
+        if not self.items:
+            return None
+        return {"guide_step": self.guide_step}
+        
+    @staticmethod
+    def scene_nodes(state, size, lens_geometry):
+        """Guide ring, arrow and label for `state['guide_step']`."""
+        step = state["guide_step"]
+        x, y = guide_target(step, *size)
+        r = RING_RADIUS
+        color = COLORS['hud_text']
+        return {
+            'carscan.ring': SceneNode('oval', (x - r, y - r, x + r, y + r), outline=color, width=3),
+            'carscan.arrow': SceneNode('polygon', (x, y - 70, x - 10, y - 35, x + 10, y - 35), fill=color),
+            'carscan.label': SceneNode('text', (x, y + 60), text=f"Target {step + 1}", fill=color,
+                                       font=("Helvetica", 12, "bold"))
+        }
@@ -1,42 +1,117 @@
 """Navigation mode implementation."""
 from .base_mode import BaseMode
-from config import COLORS
+from config import COLORS, NAV_ROUTE_PATH, NAV_PLAYBACK_HZ
+from route_playback import Route, RoutePlayback
+from scene_graph import SceneNode
+
+CARD_W, CARD_H = 320, 140
+
+
+def arrow_glyph(direction):
+    """Arrow character for a maneuver direction."""
+    return "→" if direction == "right" else "←" if direction == "left" else "↑"
+
+
+def card_center(lens_geometry):
+    """Center of the navigation card: the gap between the lenses."""
+    lx, rx = lens_geometry
+    cx = (lx[2] + rx[0]) // 2  # middle gap between lenses
+    cy = int((lx[1] + lx[3]) / 2)  # vertical center of lenses
+    return cx, cy
 
 
 class NavigationMode(BaseMode):
     """Handles navigation display and routing."""
     
+    def __init__(self, app):
+        super().__init__(app)
+        self.state = None
+        self.route = None
+        self.playback = None
+        
     def activate(self):
-        """Activate navigation mode."""
+        """Activate navigation mode; plays back the configured route if there is one."""
         self.clear_items()
-        self.draw_navigation_overlay(direction="right", distance="600 ft", eta="23 mins")
+        route = self.load_route()
+        if route is None:
+            self.draw_navigation_overlay(direction="right", distance="600 ft", eta="23 mins")
+            return
+        self.playback = RoutePlayback(route)
+        state = self.playback.state()
+        self.draw_navigation_overlay(state["direction"], state["distance"], state["eta"])
+        self.app.ticks.add("nav.playback", 1000 / NAV_PLAYBACK_HZ, self._advance)
         
     def deactivate(self):
         """Deactivate navigation mode."""
+        self.app.ticks.remove("nav.playback")
+        self.playback = None
         self.clear_items()
         
+    def refresh(self):
+        """Re-lay out the card for the current lenses; a running playback continues."""
+        if not self.items:
+            self.activate()
+            return
+        self.draw_navigation_overlay(self.state["direction"], self.state["distance"], self.state["eta"])
+        
+    def load_route(self, path=NAV_ROUTE_PATH):
+        """The playback route, loaded once; None if none is configured or it cannot be read."""
+        if self.route is None and path is not None and path.exists():
+            try:
+                self.route = Route.load(path)
+            except (OSError, ValueError, KeyError, IndexError) as exc:
+                self.app.toast.show(f"Could not load route: {exc}")
+        return self.route
+        
+    def _advance(self):
+        """Playback tick: move the card to the current simulated position."""
+        state = self.playback.state()
+        self.update_navigation_overlay(state["direction"], state["distance"], state["eta"])
+        if self.playback.finished:
+            self.app.ticks.remove("nav.playback")
+        
+    def update_navigation_overlay(self, direction, distance, eta):
+        """Change the card's texts in place (only the nodes whose text changed)."""
+        if not self.items:
+            self.draw_navigation_overlay(direction, distance, eta)
+            return
+        new = {"direction": direction, "distance": distance, "eta": eta}
+        if new == self.state:
+            return
+        if direction != self.state["direction"]:
+            self.scene.update('nav.arrow', text=arrow_glyph(direction))
+        if distance != self.state["distance"]:
+            self.scene.update('nav.distance', text=distance)
+        if eta != self.state["eta"]:
+            self.scene.update('nav.eta', text=eta)
+        self.state = new
+        self.app.hud_manager.update_navigation(f"{eta} {arrow_glyph(direction)}")
+        
     def draw_navigation_overlay(self, direction="right", distance="600 ft", eta="23 mins"):
         """Draw navigation overlay on the canvas."""
-        lx, rx = self.app.get_lens_geometry()
-        cx = (lx[2] + rx[0]) // 2  # middle gap between lenses
-        cy = int((lx[1] + lx[3]) / 2)  # vertical center of lenses
-        
-        card_w, card_h = 320, 140
-        card = self.canvas.create_rectangle(cx-card_w//2, cy-card_h//2,
-                                           cx+card_w//2, cy+card_h//2,
-                                           outline=COLORS['hud_text'], width=2)
-        self.items.append(card)
-
-        arrow_txt = "→" if direction == "right" else "←" if direction == "left" else "↑"
-        arrow = self.canvas.create_text(cx-80, cy, text=arrow_txt, fill=COLORS['hud_text'],
-                                       font=("Helvetica", 48, "bold"))
-        self.items.append(arrow)
-
-        t1 = self.canvas.create_text(cx+40, cy-18, text=distance, fill=COLORS['hud_text'],
-                                    font=("Helvetica", 22, "bold"))
-        t2 = self.canvas.create_text(cx+40, cy+18, text=eta, fill=COLORS['hud_text'],
-                                    font=("Helvetica", 16))
-        self.items.extend([t1, t2])
+        self.state = {"direction": direction, "distance": distance, "eta": eta}
+        self.show_nodes(self.scene_nodes(self.state, (self.app.canvas_w, self.app.canvas_h),
+                                         self.app.get_lens_geometry()))
 
         # Update HUD navigation text
-        self.app.hud_manager.update_navigation(f"{eta} {arrow_txt}")
\ No newline at end of file
+        self.app.hud_manager.update_navigation(f"{eta} {arrow_glyph(direction)}")
+        
+    def overlay_state(self):
+        """Direction, distance and ETA currently shown, or None."""
+        return self.state if self.items else None
+        
+    @staticmethod
+    def scene_nodes(state, size, lens_geometry):
+        """Navigation card with maneuver arrow, distance and ETA."""
+        cx, cy = card_center(lens_geometry)
+        color = COLORS['hud_text']
+        return {
+            'nav.card': SceneNode('rectangle', (cx - CARD_W//2, cy - CARD_H//2, cx + CARD_W//2, cy + CARD_H//2),
+                                  outline=color, width=2),
+            'nav.arrow': SceneNode('text', (cx - 80, cy), text=arrow_glyph(state["direction"]), fill=color,
+                                   font=("Helvetica", 48, "bold")),
+            'nav.distance': SceneNode('text', (cx + 40, cy - 18), text=state["distance"], fill=color,
+                                      font=("Helvetica", 22, "bold")),
+            'nav.eta': SceneNode('text', (cx + 40, cy + 18), text=state["eta"], fill=color,
+                                 font=("Helvetica", 16))
+        }
@@ -0,0 +1,243 @@
+"""Display-independent rendering of complete AR frames.
+
+OffscreenRenderer owns the background, the glasses overlay generator and the
+compositor, and can draw the HUD and mode overlays with PIL, so frames can be
+produced without a Tk root (servers, batch jobs, worker processes). The Tk app
+uses it for the base frame and draws HUD/mode items as canvas items on top.
+"""
+import math
+import time
+from contextlib import nullcontext
+from PIL import Image, ImageDraw
+from config import (CANVAS_WIDTH, CANVAS_HEIGHT, DEFAULT_IPD, DEFAULT_LENS_W_RATIO,
+                    DEFAULT_LENS_H_RATIO, DEFAULT_BRIDGE_MIN, RESOLUTION_FILTER, LENS_EFFECT)
+from compositor import FrameCompositor
+import image_processing
+from image_processing import load_background_image
+from lens_effect import LensEffect, LensedBackground
+from modes.carscan_mode import CarScanMode
+from modes.navigation_mode import NavigationMode
+from scene_graph import SceneGraph
+from ui_components import GlassesOverlay, lens_geometry, hud_nodes, HUD_DEFAULT_TEXT
+
+RESAMPLE = {'nearest': Image.NEAREST, 'bilinear': Image.BILINEAR}
+
+MODE_RASTERIZERS = {
+    'carscan': CarScanMode.rasterize,
+    'navigation': NavigationMode.rasterize
+}
+
+
+def default_lens_params():
+    return {
+        'ipd': DEFAULT_IPD,
+        'lens_w_ratio': DEFAULT_LENS_W_RATIO,
+        'lens_h_ratio': DEFAULT_LENS_H_RATIO
+    }
+
+
+def apply_lens_effect(compositor, lensed, geometry):
+    """Give `compositor` the lensed background for `geometry`, marking only the lens regions dirty."""
+    update = lensed.update(geometry)
+    if update is not None:
+        compositor.set_background(*update)
+
+
+def overlay_dirty(generator, old_args, new_args):
+    """Boxes where the glasses overlay changed between two `generate` calls (None before the first)."""
+    return generator.changed_boxes(old_args, new_args) if old_args is not None else None
+
+
+class ScaledBase:
+    """Background + glasses composite rendered at `scale` and upscaled to the full frame size.
+
+    The low-resolution composite uses the dirty-rectangle compositor; only
+    the region that changed is upscaled into the full-size frame.
+    """
+
+    def __init__(self, background, size, scale, resample=RESOLUTION_FILTER, lens_effect=None, stats=None):
+        self.size = size
+        self.scale = scale
+        self.resample = resample
+        self.stats = stats
+        self.small_size = (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+        self.overlay = GlassesOverlay(self.small_size, scale=scale)
+        small = self._reduce(background)
+        self.compositor = FrameCompositor(small)
+        self.lensed = LensedBackground(lens_effect) if lens_effect else None
+        if self.lensed:
+            self.lensed.set_base(small)
+        self.frame = Image.new("RGBA", size)
+        self._overlay_args = None   # GlassesOverlay.generate arguments of the composited overlay
+        self.version = None     # OffscreenRenderer background version this tier was built from
+
+    def _stage(self, name):
+        return self.stats.stage(name) if self.stats is not None else nullcontext()
+
+    def _reduce(self, background):
+        factor = background.width / self.small_size[0]
+        if factor == int(factor) and background.height == self.small_size[1] * factor:
+            return background.reduce(int(factor))      # box filter, much cheaper than resize
+        return background.resize(self.small_size, RESAMPLE[self.resample])
+
+    def set_background(self, background):
+        small = self._reduce(background)
+        self.compositor.set_background(small)
+        if self.lensed:
+            self.lensed.set_base(small)
+
+    def _upscale(self, box, src_box):
+        """Full-size pixels of `box`, upscaled from the changed region `src_box`."""
+        s = self.scale
+        small = self.compositor.frame
+        if self.resample == 'bilinear' and image_processing.CV2_AVAILABLE:
+            # Much faster than PIL; only used once OpenCV has been loaded elsewhere
+            cv2, np = image_processing.cv2, image_processing.np
+            full = cv2.resize(np.asarray(small), self.size, interpolation=cv2.INTER_LINEAR)
+            return Image.fromarray(full[box[1]:box[3], box[0]:box[2]])
+        # Resize a crop (with room for the filter support), not the whole frame: PIL
+        # premultiplies the entire RGBA source on every resize
+        x1, y1, x2, y2 = src_box
+        cx, cy = max(x1 - 2, 0), max(y1 - 2, 0)
+        src = small.crop((cx, cy, min(x2 + 2, small.width), min(y2 + 2, small.height)))
+        return src.resize((box[2] - box[0], box[3] - box[1]), RESAMPLE[self.resample],
+                          box=(box[0] * s - cx, box[1] * s - cy, box[2] * s - cx, box[3] * s - cy))
+
+    def render(self, lens_params):
+        """Returns (frame, dirty_rects, knob_bbox), all in full-size coordinates."""
+        s = self.scale
+        ipd_px, bridge_min = int(round(lens_params['ipd'] * s)), max(1, int(round(DEFAULT_BRIDGE_MIN * s)))
+        args = (ipd_px, lens_params['lens_w_ratio'], lens_params['lens_h_ratio'], bridge_min)
+        with self._stage("overlay"):
+            overlay, knob = self.overlay.generate(*args)
+        knob = tuple(int(round(v / s)) for v in knob)
+        with self._stage("composite"):
+            if self.lensed:
+                apply_lens_effect(self.compositor, self.lensed, lens_geometry(self.small_size, *args))
+            small = self.compositor.compose(overlay, overlay_dirty(self.overlay, self._overlay_args, args))
+            self._overlay_args = args
+            if not small:
+                return self.frame, [], knob
+
+            # Upscale the union of the changed regions in one go; per-rect resizes cost more in
+            # call overhead than they save. One source pixel of margin: upscaled pixels next
+            # to a change blend with it.
+            w, h = self.size
+            sw, sh = self.small_size
+            x1, y1 = max(min(r[0] for r in small) - 1, 0), max(min(r[1] for r in small) - 1, 0)
+            x2, y2 = min(max(r[2] for r in small) + 1, sw), min(max(r[3] for r in small) + 1, sh)
+            box = (int(x1 / s), int(y1 / s), min(math.ceil(x2 / s), w), min(math.ceil(y2 / s), h))
+            self.frame.paste(self._upscale(box, (x1, y1, x2, y2)), box[:2])
+        return self.frame, [box], knob
+
+
+class OffscreenRenderer:
+    """Renders background + glasses overlay + HUD + mode items to RGBA images.
+
+    With `stats` (a FrameStats), `render_base` times glasses overlay
+    generation and compositing as the "overlay" and "composite" stages.
+    """
+
+    def __init__(self, background=None, size=(CANVAS_WIDTH, CANVAS_HEIGHT), stats=None):
+        self.size = size
+        self.stats = stats
+        if background is None:
+            background = load_background_image(size)
+        if background.size != size:
+            background = background.resize(size, Image.LANCZOS)
+        self.background = background
+        self.overlay = GlassesOverlay(size)
+        self.compositor = FrameCompositor(background)
+        self.lens_effect = LensEffect() if LENS_EFFECT else None
+        self.lensed = LensedBackground(self.lens_effect) if LENS_EFFECT else None
+        if self.lensed:
+            self.lensed.set_base(background)
+        self.knob_bbox = None
+        self._overlay_args = None
+        self._scaled = {}       # scale -> ScaledBase, created on first use
+        self._source = background
+        self._version = 0       # bumped per set_background; each target catches up when rendered
+        self._full_version = 0
+
+    def set_background(self, background):
+        """Replace the background image (resized to the frame size if needed).
+
+        Only the resolution that is actually rendered next picks it up, so live
+        frames are not resized for scales that are not in use.
+        """
+        self._source = background
+        self._version += 1
+
+    def _sync_full(self):
+        if self._full_version == self._version:
+            return
+        background = self._source
+        if background.size != self.size:
+            background = background.resize(self.size, Image.LANCZOS)
+        self.background = background
+        self.compositor.set_background(background)
+        if self.lensed:
+            self.lensed.set_base(background)
+        self._full_version = self._version
+
+    def _stage(self, name):
+        return self.stats.stage(name) if self.stats is not None else nullcontext()
+
+    def geometry(self, lens_params):
+        return lens_geometry(self.size, lens_params['ipd'], lens_params['lens_w_ratio'],
+                             lens_params['lens_h_ratio'])
+
+    def render_base(self, lens_params, scale=1.0):
+        """Composite background and glasses; returns (frame, dirty_rects).
+
+        The frame is owned by the renderer and updated in place on the next
+        call; copy it if it must outlive that. With `scale` < 1 the composite is
+        rendered at that internal resolution and upscaled to the frame size.
+        """
+        if scale != 1.0:
+            scaled = self._scaled.get(scale)
+            if scaled is None:
+                scaled = self._scaled[scale] = ScaledBase(self._source, self.size, scale,
+                                                          lens_effect=self.lens_effect, stats=self.stats)
+                scaled.version = self._version
+            elif scaled.version != self._version:
+                scaled.set_background(self._source)
+                scaled.version = self._version
+            frame, dirty, self.knob_bbox = scaled.render(lens_params)
+            return frame, dirty
+        args = (lens_params['ipd'], lens_params['lens_w_ratio'], lens_params['lens_h_ratio'])
+        with self._stage("overlay"):
+            overlay, self.knob_bbox = self.overlay.generate(*args)
+        with self._stage("composite"):
+            self._sync_full()
+            if self.lensed:
+                apply_lens_effect(self.compositor, self.lensed, self.geometry(lens_params))
+            dirty = self.compositor.compose(overlay, overlay_dirty(self.overlay, self._overlay_args, args))
+        self._overlay_args = args
+        return self.compositor.frame, dirty
+
+    def render(self, lens_params=None, mode=None, mode_state=None, hud=None):
+        """Return a new RGBA frame including HUD text and the active mode's items.
+
+        `hud` maps HUD item names ('time', 'battery', 'navigation') to text;
+        missing items use the HUD defaults, and hud=False leaves the HUD out.
+        """
+        lens_params = lens_params or default_lens_params()
+        base, _ = self.render_base(lens_params)
+        frame = base.copy()
+        draw = ImageDraw.Draw(frame)
+        geometry = self.geometry(lens_params)
+
+        if mode in MODE_RASTERIZERS and mode_state:
+            MODE_RASTERIZERS[mode](draw, mode_state, self.size, geometry)
+        if hud is not False:
+            self.draw_hud(draw, geometry, hud or {})
+        return frame
+
+    def draw_hud(self, draw, geometry, hud):
+        """Draw the same HUD nodes HUDManager puts on the canvas."""
+        texts = {'time': time.strftime("%H:%M"), **HUD_DEFAULT_TEXT, **hud}
+        scene = SceneGraph()
+        for key, node in hud_nodes(geometry, texts, perf_visible=bool(texts.get('perf'))).items():
+            scene.put(key, node)
+        scene.rasterize(draw)
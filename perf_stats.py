@@ -0,0 +1,173 @@
+"""Opt-in per-stage frame timing with fixed-size ring buffers."""
+import json
+import os
+import platform
+import time
+from contextlib import contextmanager, nullcontext
+from config import PERF_IDLE_GAP_MS
+
+
+def machine_info():
+    """Basic description of the machine and interpreter for stats dumps."""
+    info = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count()
+    }
+    try:
+        import PIL
+        info["pillow"] = PIL.__version__
+    except ImportError:
+        pass
+    try:
+        import numpy
+        info["numpy"] = numpy.__version__
+    except ImportError:
+        pass
+    try:
+        import cv2
+        info["opencv"] = cv2.__version__
+    except ImportError:
+        pass
+    return info
+
+
+class RingBuffer:
+    """Fixed-size buffer of the most recent samples."""
+
+    def __init__(self, size=240):
+        self.size = size
+        self.samples = [0.0] * size
+        self.count = 0
+
+    def append(self, value):
+        self.samples[self.count % self.size] = value
+        self.count += 1
+
+    def values(self):
+        return self.samples[:min(self.count, self.size)]
+
+    def summary(self):
+        """Return count, last, p50, p95 and max over the buffered samples."""
+        vals = sorted(self.values())
+        if not vals:
+            return {"count": 0}
+        n = len(vals)
+        return {
+            "count": self.count,
+            "last": self.samples[(self.count - 1) % self.size],
+            "p50": vals[n // 2],
+            "p95": vals[min(n - 1, int(n * 0.95))],
+            "max": vals[-1]
+        }
+
+
+class StartupTimer:
+    """Records elapsed time at named startup phases (import, decode, overlay, first paint)."""
+
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._last = self.t0
+        self.phases = []
+
+    def mark(self, phase):
+        """Close the current phase; records its duration and the total so far (ms)."""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000, (now - self.t0) * 1000))
+        self._last = now
+
+    def total_ms(self):
+        return self.phases[-1][2] if self.phases else 0.0
+
+    def report(self):
+        """One-line summary, e.g. 'import 120.0 ms | decode 2.1 ms | ... | total 180.3 ms'."""
+        parts = [f"{phase} {ms:.1f} ms" for phase, ms, _ in self.phases]
+        parts.append(f"total {self.total_ms():.1f} ms")
+        return " | ".join(parts)
+
+
+class FrameStats:
+    """Collects stage timings (ms) and frame times for the performance HUD.
+
+    When disabled, `stage` returns a shared no-op context so instrumented code
+    costs next to nothing. Frame intervals longer than `idle_gap_ms` are idle
+    time between bursts of redraws and are not counted, so the FPS reflects
+    the rate while the canvas is actually redrawing.
+    """
+
+    _NULL = nullcontext()
+
+    def __init__(self, enabled=False, size=240, idle_gap_ms=PERF_IDLE_GAP_MS):
+        self.enabled = enabled
+        self.size = size
+        self.idle_gap_ms = idle_gap_ms
+        self.stages = {}
+        self.frames = RingBuffer(size)
+        self._last_frame = None
+
+    def stage(self, name):
+        """Context manager timing one stage, e.g. `with stats.stage("composite"):`."""
+        if not self.enabled:
+            return self._NULL
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - t0) * 1000)
+
+    def record(self, name, ms):
+        """Add one sample for a stage."""
+        buf = self.stages.get(name)
+        if buf is None:
+            buf = self.stages[name] = RingBuffer(self.size)
+        buf.append(ms)
+
+    def frame(self):
+        """Mark that a frame has been presented."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            interval = (now - self._last_frame) * 1000
+            if interval <= self.idle_gap_ms:
+                self.frames.append(interval)
+        self._last_frame = now
+
+    def fps(self):
+        """Frames per second while redrawing (over the buffered non-idle frame intervals)."""
+        vals = self.frames.values()
+        if not vals:
+            return 0.0
+        return 1000.0 * len(vals) / max(sum(vals), 1e-6)
+
+    def summary(self):
+        return {
+            "fps": self.fps(),
+            "frame_ms": self.frames.summary(),
+            "stages": {name: buf.summary() for name, buf in self.stages.items()}
+        }
+
+    def hud_text(self):
+        """Compact multi-line text for the on-lens performance HUD."""
+        lines = [f"{self.fps():5.1f} fps"]
+        for name, buf in self.stages.items():
+            s = buf.summary()
+            if s["count"]:
+                lines.append(f"{name:<13}{s['p50']:6.2f} / {s['p95']:6.2f} ms")
+        return "\n".join(lines)
+
+    def dump(self, path, **counters):
+        """Write the summary plus machine info (and any extra counter dicts) as JSON."""
+        data = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "machine": machine_info(),
+            **self.summary(),
+            **counters
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
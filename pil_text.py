@@ -0,0 +1,30 @@
+"""PIL font lookup matching the Tk fonts used on the canvas."""
+from functools import lru_cache
+from PIL import ImageFont
+
+# Tk font sizes are in points; rasterized at 96 dpi
+POINTS_TO_PX = 96 / 72
+
+FONT_FILES = {
+    False: ["DejaVuSans.ttf", "Arial.ttf", "Helvetica.ttc", "LiberationSans-Regular.ttf"],
+    True: ["DejaVuSans-Bold.ttf", "Arial Bold.ttf", "Helvetica.ttc", "LiberationSans-Bold.ttf"]
+}
+
+
+@lru_cache(maxsize=64)
+def pil_font(points, bold=False):
+    """Return a PIL font approximating Tk's ("Helvetica", points[, "bold"])."""
+    size = round(points * POINTS_TO_PX)
+    for name in FONT_FILES[bold]:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def tk_font_to_pil(font):
+    """Convert a Tk font tuple such as ("Helvetica", 18, "bold") to a PIL font."""
+    return pil_font(font[1], bold="bold" in font[2:])
@@ -0,0 +1,119 @@
+"""Route playback for navigation mode.
+
+A route file is JSON with a polyline and the maneuvers along it:
+
+    {"name": "...",
+     "points": [[lat, lon], ...],
+     "maneuvers": [{"point": 120, "direction": "right", "text": "Turn right"}, ...]}
+
+`Route` precomputes the cumulative distance at every point and at every
+maneuver, so a position along the route (and the next maneuver) is resolved
+by binary search. `RoutePlayback` walks a route at a simulated speed and
+returns the card state (direction, distance to the maneuver, ETA).
+"""
+import json
+import math
+import time
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from config import NAV_PLAYBACK_SPEED_KMH
+
+EARTH_RADIUS_M = 6371000.0
+FEET_PER_M = 3.28084
+METERS_PER_MILE = 1609.344
+
+
+def segment_lengths(points):
+    """Haversine length in meters of each segment of a [[lat, lon], ...] polyline."""
+    rad = [(math.radians(lat), math.radians(lon)) for lat, lon in points]
+    lengths = []
+    for (la1, lo1), (la2, lo2) in zip(rad, rad[1:]):
+        h = math.sin((la2 - la1) / 2) ** 2 + math.cos(la1) * math.cos(la2) * math.sin((lo2 - lo1) / 2) ** 2
+        lengths.append(2 * EARTH_RADIUS_M * math.asin(math.sqrt(h)))
+    return lengths
+
+def format_distance(meters):
+    """Card distance in US units: feet up to a tenth of a mile, then miles."""
+    if meters < METERS_PER_MILE / 10:
+        return f"{int(round(meters * FEET_PER_M, -1))} ft"
+    return f"{meters / METERS_PER_MILE:.1f} mi"
+
+def format_eta(seconds):
+    """Card ETA in whole minutes ("<1 min", "1 min", "12 mins")."""
+    minutes = int(round(seconds / 60))
+    if minutes < 1:
+        return "<1 min"
+    return f"{minutes} min" if minutes == 1 else f"{minutes} mins"
+
+
+class Route:
+    """A polyline with maneuvers and precomputed cumulative distances (meters)."""
+
+    def __init__(self, points, maneuvers, name=""):
+        if len(points) < 2:
+            raise ValueError("a route needs at least two points")
+        self.name = name
+        self.points = [tuple(p) for p in points]
+        self.cumulative = list(accumulate(segment_lengths(self.points), initial=0.0))
+        for m in maneuvers:
+            if not 0 <= m["point"] < len(self.points):
+                raise ValueError(f"maneuver point {m['point']} is outside the route's {len(self.points)} points")
+        self.maneuvers = sorted(maneuvers, key=lambda m: m["point"])
+        self.maneuver_dist = [self.cumulative[m["point"]] for m in self.maneuvers]
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data["points"], data.get("maneuvers", []), data.get("name", ""))
+
+    @property
+    def length(self):
+        return self.cumulative[-1]
+
+    def locate(self, distance):
+        """(lat, lon) at `distance` meters along the route."""
+        i = min(max(bisect_right(self.cumulative, distance) - 1, 0), len(self.points) - 2)
+        start, end = self.cumulative[i], self.cumulative[i + 1]
+        t = 0.0 if end == start else min(max((distance - start) / (end - start), 0.0), 1.0)
+        (la1, lo1), (la2, lo2) = self.points[i], self.points[i + 1]
+        return la1 + (la2 - la1) * t, lo1 + (lo2 - lo1) * t
+
+    def next_maneuver(self, distance):
+        """(maneuver, meters to it) for the next maneuver at or after `distance`.
+
+        Past the last maneuver returns (None, meters to the end of the route).
+        """
+        k = bisect_left(self.maneuver_dist, distance)
+        if k == len(self.maneuvers):
+            return None, self.length - distance
+        return self.maneuvers[k], self.maneuver_dist[k] - distance
+
+
+class RoutePlayback:
+    """Simulated drive along a route at constant speed, starting when created."""
+
+    def __init__(self, route, speed_kmh=NAV_PLAYBACK_SPEED_KMH, clock=time.monotonic):
+        self.route = route
+        self.speed = speed_kmh / 3.6
+        self.clock = clock
+        self.start = clock()
+
+    @property
+    def distance(self):
+        return min((self.clock() - self.start) * self.speed, self.route.length)
+
+    @property
+    def finished(self):
+        return self.distance >= self.route.length
+
+    def state(self):
+        """Navigation card state at the current simulated position."""
+        d = self.distance
+        maneuver, to_next = self.route.next_maneuver(d)
+        return {
+            "direction": maneuver["direction"] if maneuver else "straight",
+            "distance": format_distance(to_next),
+            "eta": format_eta((self.route.length - d) / self.speed),
+            "position": self.route.locate(d)
+        }
@@ -0,0 +1,121 @@
+"""CarScan sessions: one capture per guide step, processed together on a process pool.
+
+Frames are collected in memory while the user walks through the guide steps.
+`ScanSession.run` then detects, encodes and writes all steps concurrently and
+produces a session summary (session.json) with per-step results and timings,
+plus a contact sheet of the detection images.
+"""
+import json
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from PIL import Image, ImageDraw
+from config import (CAPTURE_DIR, COLORS, SESSION_WORKERS, SESSION_MP_START, SESSION_THUMB_SIZE,
+                    SESSION_SHEET_COLUMNS)
+from capture_bundle import new_capture_id
+from capture_pipeline import write_capture
+from modes.carscan_mode import GUIDE_STEPS
+from pil_text import pil_font
+
+LABEL_H = 18
+
+
+def process_step(frame, meta, session_dir, overlay=None, thumb_size=SESSION_THUMB_SIZE):
+    """Worker: write one step's capture and return its result with a detection thumbnail."""
+    t0 = time.perf_counter()
+    result = write_capture(frame, meta, session_dir, overlay=overlay)
+    with Image.open(result["detection"]) as det:
+        det.draft("RGB", thumb_size)
+        thumb = det.convert("RGB")
+        thumb.thumbnail(thumb_size)
+    return {
+        "step": meta["guide_step"],
+        "capture_id": result["capture_id"],
+        "image": result["image"].name,
+        "detection": result["detection"].name,
+        "meta": meta,
+        "detect_ms": meta["detection"]["detect_ms"],
+        "damage_regions": meta["damage"]["count"] if meta["damage"] else None,
+        "encode_ms": sum(e["encode_ms"] for e in meta["encoding"].values()),
+        "bytes": sum(e["bytes"] for e in meta["encoding"].values()),
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+        "thumb": thumb
+    }
+
+
+def contact_sheet(results, thumb_size=SESSION_THUMB_SIZE, columns=SESSION_SHEET_COLUMNS):
+    """Tile the step thumbnails with labels into one preallocated image."""
+    tw, th = thumb_size
+    rows = max(1, math.ceil(len(results) / columns))
+    sheet = Image.new("RGB", (columns * tw, rows * (th + LABEL_H)), COLORS['background'])
+    draw = ImageDraw.Draw(sheet)
+    font = pil_font(11)
+    for i, r in enumerate(results):
+        x, y = (i % columns) * tw, (i // columns) * (th + LABEL_H)
+        thumb = r["thumb"]
+        sheet.paste(thumb, (x + (tw - thumb.width) // 2, y))
+        draw.text((x + 4, y + th + 2), f"Step {r['step'] + 1}  {r['elapsed_ms']:.0f} ms",
+                  fill=COLORS['hud_text'], font=font)
+    return sheet
+
+
+class ScanSession:
+    """Collects one capture per guide step and processes them as a batch."""
+
+    def __init__(self, capture_dir=CAPTURE_DIR, steps=len(GUIDE_STEPS)):
+        self.session_id = new_capture_id()
+        self.session_dir = Path(capture_dir) / f"session_{self.session_id}"
+        self.steps = steps
+        self.frames = {}
+
+    @property
+    def complete(self):
+        return len(self.frames) >= self.steps
+
+    def next_step(self):
+        """The first guide step that has no capture yet."""
+        return next(step for step in range(self.steps) if step not in self.frames)
+
+    def add(self, frame, meta, overlay=None):
+        """Record the frame (and its overlay layer) for `meta['guide_step']`, replacing an earlier one."""
+        meta = dict(meta, session_id=self.session_id)
+        if "capture_id" not in meta:
+            meta["capture_id"] = new_capture_id()
+        self.frames[meta["guide_step"]] = (frame, meta, overlay)
+
+    def run(self, workers=SESSION_WORKERS, catalog=None, mp_start=SESSION_MP_START):
+        """Process all steps concurrently; writes and returns the session summary."""
+        t0 = time.perf_counter()
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        context = multiprocessing.get_context(mp_start)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = [pool.submit(process_step, frame, meta, self.session_dir, overlay)
+                       for _, (frame, meta, overlay) in sorted(self.frames.items())]
+            results = [f.result() for f in futures]
+        t1 = time.perf_counter()
+
+        sheet_path = self.session_dir / "contact_sheet.png"
+        contact_sheet(results).save(sheet_path, compress_level=1)
+        t2 = time.perf_counter()
+
+        if catalog is not None:
+            for r in results:
+                catalog.add(r["meta"], self.session_dir / f"capture_{r['capture_id']}.json")
+
+        summary = {
+            "session_id": self.session_id,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "steps": [{k: v for k, v in r.items() if k not in ("thumb", "meta")} for r in results],
+            "contact_sheet": sheet_path.name,
+            "timings": {
+                "total_ms": round((t2 - t0) * 1000, 2),
+                "process_ms": round((t1 - t0) * 1000, 2),
+                "contact_sheet_ms": round((t2 - t1) * 1000, 2),
+                "sum_step_ms": round(sum(r["elapsed_ms"] for r in results), 2)
+            }
+        }
+        with open(self.session_dir / "session.json", "w") as f:
+            json.dump(summary, f, indent=2)
+        return summary
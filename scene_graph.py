@@ -0,0 +1,338 @@
+"""Retained scene graph for the overlay items drawn over the AR frame.
+
+HUD text, CarScan guides and the navigation card are described as keyed
+SceneNodes. `SceneGraph.sync` diffs the graph against what it last pushed to
+the Tk canvas and issues only the coords/itemconfigure calls needed. Items of
+removed nodes are hidden and pooled by kind rather than deleted, so a later
+node of the same kind reuses one instead of creating a new Tk item.
+`SceneGraph.rasterize` draws the same nodes with PIL, so captures and
+offscreen frames show exactly what is on screen without reading the canvas.
+"""
+from bisect import bisect_left
+from PIL import Image, ImageDraw
+from pil_text import tk_font_to_pil
+
+MODE_LAYER = 0
+HUD_LAYER = 10
+TOPMOST_TAG = "topmost"    # canvas items (e.g. toasts) kept above the scene
+SCENE_TAG = "scene"
+
+# Tk item defaults that matter when rasterizing
+TK_DEFAULTS = {
+    'oval': {'outline': "black", 'fill': None, 'width': 1},
+    'rectangle': {'outline': "black", 'fill': None, 'width': 1},
+    'polygon': {'outline': None, 'fill': "black", 'width': 1},
+    'text': {'fill': "black", 'anchor': "center", 'text': ""}
+}
+
+# Values restoring options an item had but its new node does not set
+TK_RESET = {'state': "normal", 'font': "TkDefaultFont", 'dash': "", 'smooth': 0}
+
+# Tk text anchors -> PIL text anchors
+PIL_ANCHORS = {
+    'center': "mm", 'n': "ma", 's': "md", 'w': "lm", 'e': "rm",
+    'nw': "la", 'ne': "ra", 'sw': "ld", 'se': "rd"
+}
+
+
+class SceneNode:
+    """One canvas item: its kind ('oval', 'rectangle', 'polygon', 'text'), coords and options."""
+
+    __slots__ = ("kind", "coords", "options", "layer")
+
+    def __init__(self, kind, coords, layer=MODE_LAYER, **options):
+        self.kind = kind
+        self.coords = tuple(coords)
+        self.options = options
+        self.layer = layer
+
+    @property
+    def visible(self):
+        return self.options.get('state') != "hidden"
+
+    def same_as(self, other):
+        """Whether `other` would draw exactly like this node."""
+        return (self.kind == other.kind and self.coords == other.coords and self.layer == other.layer
+                and self.options == other.options)
+
+    def replace(self, coords=None, **options):
+        """Copy of this node with new coords and/or updated options."""
+        return SceneNode(self.kind, self.coords if coords is None else coords, self.layer,
+                         **{**self.options, **options})
+
+
+class SceneGraph:
+    """Keyed overlay nodes, synced to a Tk canvas and rasterizable with PIL.
+
+    With a canvas, changes schedule one idle-time `sync`; without one (offscreen
+    rendering) the graph is only rasterized.
+    """
+
+    def __init__(self, canvas=None):
+        self.canvas = canvas
+        self.nodes = {}
+        self._synced = {}      # key -> (item_id, node) as last pushed to the canvas
+        self._pool = {}        # kind -> [(item_id, last node)] of hidden, reusable items
+        self._stack = []       # scene item ids bottom to top, as last stacked on the canvas
+        self._sync_job = None
+        self._restack = False
+        self._raise_topmost = False
+        self.version = 0       # bumped when a node changes, for consumers that rasterize the graph
+        self.created = 0
+        self.reused = 0
+        self.pooled = 0
+        self.coords_calls = 0
+        self.configure_calls = 0
+        self.raise_calls = 0
+
+    def __contains__(self, key):
+        return key in self.nodes
+
+    def get(self, key):
+        return self.nodes.get(key)
+
+    def put(self, key, node):
+        """Add or replace a node; a node equal to the current one changes nothing."""
+        old = self.nodes.get(key)
+        if old is None:
+            self._restack = True       # (re)added keys go to the top of their layer
+        elif old.same_as(node):
+            return
+        self.nodes[key] = node
+        self.version += 1
+        self._schedule()
+
+    def update(self, key, coords=None, **options):
+        """Change coords and/or options of an existing node."""
+        self.put(key, self.nodes[key].replace(coords, **options))
+
+    def remove(self, key):
+        if self.nodes.pop(key, None) is not None:
+            self.version += 1
+            self._schedule()
+
+    def ordered(self):
+        """(key, node) pairs bottom to top: by layer, then insertion order."""
+        return sorted(self.nodes.items(), key=lambda kv: kv[1].layer)
+
+    def _schedule(self):
+        if self.canvas is not None and self._sync_job is None:
+            self._sync_job = self.canvas.after_idle(self.sync)
+
+    def sync(self):
+        """Push the differences since the last sync to the canvas."""
+        self._sync_job = None
+        for key in [k for k in self._synced if k not in self.nodes]:
+            self._release(*self._synced.pop(key))
+
+        for key, node in self.nodes.items():
+            synced = self._synced.get(key)
+            if synced is not None and not self._resettable(synced[1], node):
+                self._release(*synced)
+                synced = None
+            if synced is None:
+                self._synced[key] = (self._acquire(node), node)
+                self._restack = True
+                continue
+
+            item, old = synced
+            if old is node:
+                continue
+            self._apply(item, old, node)
+            if node.layer != old.layer:
+                self._restack = True
+            self._synced[key] = (item, node)
+
+        if self._restack:
+            self._restack_items()
+            self._restack = False
+
+    def _apply(self, item, old, node):
+        """Bring canvas item `item`, last configured as `old`, up to date with `node`.
+
+        Options `old` set but `node` does not go back to their Tk defaults, so
+        the item draws like `rasterize` draws `node` (a pooled, hidden item is
+        shown again unless `node` hides it).
+        """
+        canvas = self.canvas
+        if node.coords != old.coords:
+            canvas.coords(item, *node.coords)
+            self.coords_calls += 1
+        changed = {k: v for k, v in node.options.items() if old.options.get(k) != v}
+        for k in old.options.keys() - node.options.keys():
+            default = TK_DEFAULTS[node.kind].get(k, TK_RESET.get(k))
+            changed[k] = "" if default is None else default
+        if changed:
+            canvas.itemconfigure(item, **changed)
+            self.configure_calls += 1
+
+    def _resettable(self, old, node):
+        """Whether an item configured as `old` can be turned into `node` by `_apply`."""
+        return old.kind == node.kind and all(k in TK_DEFAULTS[node.kind] or k in TK_RESET
+                   for k in old.options.keys() - node.options.keys())
+
+    def _acquire(self, node):
+        """A canvas item for `node`: a pooled item of the same kind if possible, else a new one."""
+        pool = self._pool.get(node.kind)
+        for i in range(len(pool) - 1, -1, -1) if pool else ():
+            item, old = pool[i]
+            if self._resettable(old, node):
+                del pool[i]
+                self._apply(item, old, node)
+                self.reused += 1
+                return item
+        create = getattr(self.canvas, f"create_{node.kind}")
+        item = create(*node.coords, tags=(SCENE_TAG,), **node.options)
+        self._stack.append(item)
+        self._raise_topmost = True
+        self.created += 1
+        return item
+
+    def _release(self, item, node):
+        """Hide `item` and keep it for reuse by a later node of the same kind."""
+        if node.visible:
+            self.canvas.itemconfigure(item, state="hidden")
+            self.configure_calls += 1
+            node = node.replace(state="hidden")
+        self._pool.setdefault(node.kind, []).append((item, node))
+        self.pooled += 1
+
+    def _restack_items(self):
+        """Restore layer order with as few moves as possible.
+
+        The longest run of items already in the right relative order stays
+        put; every other item is placed directly above its predecessor (the
+        bottom item below the first one that stays). Toasts etc. are raised
+        again if new items were created on top of them.
+        """
+        wanted = [self._synced[key][0] for key, _ in self.ordered()]
+        position = {item: i for i, item in enumerate(self._stack)}
+        run = _increasing_run([position[item] for item in wanted], wanted)
+        keep = set(run)
+        for i, item in enumerate(wanted):
+            if item in keep:
+                continue
+            self._stack.remove(item)
+            if i == 0:
+                self.canvas.tag_lower(item, run[0])
+                self._stack.insert(self._stack.index(run[0]), item)
+            else:
+                self.canvas.tag_raise(item, wanted[i - 1])
+                self._stack.insert(self._stack.index(wanted[i - 1]) + 1, item)
+            self.raise_calls += 1
+        if self._raise_topmost:
+            self.canvas.tag_raise(TOPMOST_TAG)
+            self.raise_calls += 1
+            self._raise_topmost = False
+
+    def stats(self):
+        """Canvas call counters; `created` vs `reused` shows how well the item pool works."""
+        return {
+            "nodes": len(self.nodes),
+            "items": len(self._stack),
+            "created": self.created,
+            "reused": self.reused,
+            "pooled": self.pooled,
+            "coords_calls": self.coords_calls,
+            "configure_calls": self.configure_calls,
+            "raise_calls": self.raise_calls
+        }
+
+    def changed_boxes(self, previous):
+        """Boxes covering what differs from `previous`, an earlier copy of `nodes`.
+
+        Each changed, added, removed or restacked node contributes its old and
+        new extent, so redrawing these boxes brings a rasterized frame up to date.
+        """
+        before = [key for key, _ in sorted(previous.items(), key=lambda kv: kv[1].layer)]
+        after = [key for key, _ in self.ordered()]
+        moved = {a for a, b in zip(before, after) if a != b} if before != after else set()
+        boxes = []
+        for key in previous.keys() | self.nodes.keys():
+            old, new = previous.get(key), self.nodes.get(key)
+            if old is new and key not in moved:
+                continue
+            for node in (old, new):
+                box = node_bbox(node) if node is not None else None
+                if box is not None:
+                    boxes.append(box)
+        return boxes
+
+    def rasterize(self, draw, box=None):
+        """Draw all visible nodes onto a PIL ImageDraw, bottom to top.
+
+        With a `box`, the drawing is a crop of the frame at that box: only
+        nodes overlapping it are drawn, shifted into its coordinates.
+        """
+        for _, node in self.ordered():
+            if not node.visible:
+                continue
+            if box is not None:
+                extent = node_bbox(node)
+                if extent is None or not _overlaps(extent, box):
+                    continue
+                node = node.replace([c - box[i % 2] for i, c in enumerate(node.coords)])
+            rasterize_node(draw, node)
+
+
+def _increasing_run(keys, values):
+    """`values` at a longest strictly increasing subsequence of `keys`."""
+    tails, tail_index, parent = [], [], [None] * len(keys)
+    for i, key in enumerate(keys):
+        j = bisect_left(tails, key)
+        if j == len(tails):
+            tails.append(key)
+            tail_index.append(i)
+        else:
+            tails[j] = key
+            tail_index[j] = i
+        parent[i] = tail_index[j - 1] if j else None
+    run, i = [], tail_index[-1] if tail_index else None
+    while i is not None:
+        run.append(values[i])
+        i = parent[i]
+    return run[::-1]
+
+
+def _overlaps(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+_MEASURE = ImageDraw.Draw(Image.new("L", (1, 1)))
+
+
+def node_bbox(node):
+    """Integer (x1, y1, x2, y2) covering everything `rasterize_node` draws for `node`, or None."""
+    if not node.visible:
+        return None
+    opts = {**TK_DEFAULTS[node.kind], **node.options}
+    if node.kind == 'text':
+        if not opts['text']:
+            return None
+        font = tk_font_to_pil(opts['font']) if 'font' in opts else None
+        x1, y1, x2, y2 = _MEASURE.textbbox(node.coords, opts['text'], font=font,
+                                           anchor=PIL_ANCHORS[opts['anchor']])
+        pad = 2
+    else:
+        xs, ys = node.coords[::2], node.coords[1::2]
+        x1, y1, x2, y2 = min(xs), min(ys), max(xs), max(ys)
+        pad = opts['width'] + 2      # Tk centres outlines on the coords, PIL draws them inside
+    return (int(x1) - pad, int(y1) - pad, int(x2) + pad + 1, int(y2) + pad + 1)
+
+def rasterize_node(draw, node):
+    """Draw one SceneNode the way Tk would render it."""
+    opts = {**TK_DEFAULTS[node.kind], **node.options}
+    if node.kind == 'text':
+        if opts['text']:
+            font = tk_font_to_pil(opts['font']) if 'font' in opts else None
+            draw.text(node.coords, opts['text'], fill=opts['fill'], font=font,
+                      anchor=PIL_ANCHORS[opts['anchor']])
+        return
+
+    outline, fill = opts['outline'] or None, opts['fill'] or None
+    if node.kind == 'oval':
+        draw.ellipse(node.coords, outline=outline, fill=fill, width=opts['width'])
+    elif node.kind == 'rectangle':
+        draw.rectangle(node.coords, outline=outline, fill=fill, width=opts['width'])
+    elif node.kind == 'polygon':
+        draw.polygon(list(zip(node.coords[::2], node.coords[1::2])), outline=outline, fill=fill,
+                     width=opts['width'])
@@ -0,0 +1,174 @@
+"""Main-loop scheduling helpers for the iVision application."""
+import math
+import time
+from config import FRAME_BUDGET_MS, TICK_SLACK_MS
+
+
+class RenderScheduler:
+    """Coalesces render requests so at most one render runs per frame budget.
+
+    Callers may request as often as they like (e.g. on every slider tick); the
+    render callback runs once per frame and reads the latest values itself, so
+    the final state is always rendered.
+    """
+
+    def __init__(self, root, render, frame_ms=FRAME_BUDGET_MS):
+        self.root = root
+        self.render = render
+        self.frame_ms = frame_ms
+        self._job = None
+        self._last_render = 0.0
+        self.requested = 0
+        self.rendered = 0
+        self.dropped = 0
+
+    @property
+    def pending(self):
+        return self._job is not None
+
+    def request(self):
+        """Ask for a render; coalesced with any render already scheduled."""
+        self.requested += 1
+        if self._job is not None:
+            self.dropped += 1
+            return
+
+        wait_ms = self.frame_ms - (time.perf_counter() - self._last_render) * 1000
+        if wait_ms <= 0:
+            self._job = self.root.after_idle(self._run)
+        else:
+            self._job = self.root.after(int(wait_ms) + 1, self._run)
+
+    def flush(self):
+        """Run a pending render immediately."""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._run()
+
+    def _run(self):
+        self._job = None
+        self._last_render = time.perf_counter()
+        self.rendered += 1
+        self.render()
+
+    def stats(self):
+        """Counters of requested, rendered and dropped (coalesced) updates."""
+        return {
+            "requested": self.requested,
+            "rendered": self.rendered,
+            "dropped": self.dropped
+        }
+
+
+class _Tick:
+    __slots__ = ("interval", "callback", "slot", "wall")
+
+    def __init__(self, interval, callback, wall):
+        self.interval = interval
+        self.callback = callback
+        self.wall = wall          # slots count on the wall clock instead of the monotonic one
+        self.slot = 0             # due at slot * interval; an integer, so rounding never repeats a slot
+
+
+class TickScheduler:
+    """Runs all periodic main-loop work from a single Tk timer.
+
+    Each task declares an interval. Due times are aligned to multiples of that
+    interval on the monotonic `clock`, so tasks with related intervals fall on
+    the same tick and wall-clock steps (NTP, DST) never stall them. Tasks added
+    with `wall=True` are aligned on the wall clock instead (a 60 s task fires on
+    the minute). Tasks due within `slack_ms` of each other are coalesced into
+    one wakeup, taken at the latest of their due times so that no task runs
+    early. A task due more than one interval ahead (the wall clock was set
+    back) is moved to its next slot from now.
+    """
+
+    def __init__(self, root, slack_ms=TICK_SLACK_MS, clock=time.monotonic, wall_clock=time.time):
+        self.root = root
+        self.slack = slack_ms / 1000
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self._offset = 0.0      # wall clock minus `clock`, sampled by _now
+        self._tasks = {}
+        self._job = None
+        self._job_due = None
+        self.wakeups = 0
+        self.runs = 0
+
+    def __contains__(self, name):
+        return name in self._tasks
+
+    def _now(self):
+        now = self.clock()
+        self._offset = self.wall_clock() - now
+        return now
+
+    def _due(self, task):
+        """Due time of `task` on `clock`."""
+        return task.slot * task.interval - (self._offset if task.wall else 0.0)
+
+    def _next_slot(self, task, now):
+        """The first slot of `task` after `now` (a `clock` time)."""
+        return math.floor((now + self._offset if task.wall else now) / task.interval) + 1
+
+    def add(self, name, interval_ms, callback, wall=False):
+        """Run `callback` every `interval_ms`, replacing any task of the same name.
+
+        With `wall`, runs are aligned to the wall clock rather than the monotonic one.
+        """
+        task = _Tick(interval_ms / 1000, callback, wall)
+        task.slot = self._next_slot(task, self._now())
+        self._tasks[name] = task
+        self._reschedule()
+
+    def remove(self, name):
+        self._tasks.pop(name, None)
+        if not self._tasks:
+            self.stop()
+
+    def stop(self):
+        """Cancel the pending wakeup (tasks stay registered until removed)."""
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = self._job_due = None
+
+    def _reschedule(self):
+        if not self._tasks:
+            return
+        now = self._now()
+        dues = []
+        for task in self._tasks.values():
+            if self._due(task) - now > task.interval:
+                task.slot = self._next_slot(task, now)
+            dues.append(self._due(task))
+        first = min(dues)
+        due = max(d for d in dues if d <= first + self.slack)
+        if self._job is not None:
+            if self._job_due == due:
+                return
+            self.root.after_cancel(self._job)     # a task added since may widen or move the group
+        delay_ms = max(0, math.ceil((due - now) * 1000))
+        self._job = self.root.after(delay_ms, self._tick)
+        self._job_due = due
+
+    def _tick(self):
+        self._job = self._job_due = None
+        self.wakeups += 1
+        now = self._now()
+        try:
+            for name, task in list(self._tasks.items()):
+                if self._due(task) > now + 1e-6 or self._tasks.get(name) is not task:
+                    continue
+                task.slot = max(task.slot + 1, self._next_slot(task, now))
+                self.runs += 1
+                task.callback()
+        finally:
+            self._reschedule()
+
+    def stats(self):
+        """Registered tasks, timer wakeups and task runs so far."""
+        return {
+            "tasks": len(self._tasks),
+            "wakeups": self.wakeups,
+            "runs": self.runs
+        }
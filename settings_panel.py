@@ -1,6 +1,6 @@
 """Settings panel component for the iVision application."""
 import tkinter as tk
-from config import COLORS
+from config import COLORS, IPD_RANGE, LENS_W_RANGE, LENS_H_RANGE
 
 
 class SettingsPanel:
@@ -44,8 +44,8 @@ class SettingsPanel:
         row.pack(fill="x", padx=10, pady=4)
         tk.Label(row, text="IPD", fg="white", bg=COLORS['panel_bg'], width=8).pack(side="left")
         self.variables['ipd'] = tk.IntVar(value=self.app.lens_params['ipd'])
-        tk.Scale(row, from_=160, to=320, orient="horizontal", showvalue=True,
-                variable=self.variables['ipd'], command=lambda v: self.app.update_lens_params(),
+        tk.Scale(row, from_=IPD_RANGE[0], to=IPD_RANGE[1], orient="horizontal", showvalue=True,
+                variable=self.variables['ipd'], command=lambda v: self.app.request_lens_update(),
                 length=220).pack(side="left")
 
         # Lens width control
@@ -53,8 +53,8 @@ class SettingsPanel:
         row2.pack(fill="x", padx=10, pady=4)
         tk.Label(row2, text="Lens W", fg="white", bg=COLORS['panel_bg'], width=8).pack(side="left")
         self.variables['lens_w'] = tk.DoubleVar(value=self.app.lens_params['lens_w_ratio'])
-        tk.Scale(row2, from_=0.22, to=0.36, resolution=0.01, orient="horizontal",
-                variable=self.variables['lens_w'], command=lambda v: self.app.update_lens_params(),
+        tk.Scale(row2, from_=LENS_W_RANGE[0], to=LENS_W_RANGE[1], resolution=LENS_W_RANGE[2], orient="horizontal",
+                variable=self.variables['lens_w'], command=lambda v: self.app.request_lens_update(),
                 length=220).pack(side="left")
 
         # Lens height control
@@ -62,6 +62,6 @@ class SettingsPanel:
         row3.pack(fill="x", padx=10, pady=4)
         tk.Label(row3, text="Lens H", fg="white", bg=COLORS['panel_bg'], width=8).pack(side="left")
         self.variables['lens_h'] = tk.DoubleVar(value=self.app.lens_params['lens_h_ratio'])
-        tk.Scale(row3, from_=0.45, to=0.65, resolution=0.01, orient="horizontal",
-                variable=self.variables['lens_h'], command=lambda v: self.app.update_lens_params(),
+        tk.Scale(row3, from_=LENS_H_RANGE[0], to=LENS_H_RANGE[1], resolution=LENS_H_RANGE[2], orient="horizontal",
+                variable=self.variables['lens_h'], command=lambda v: self.app.request_lens_update(),
                 length=220).pack(side="left")
\ No newline at end of file
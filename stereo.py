@@ -0,0 +1,86 @@
+"""Stereo side-by-side rendering: one view per eye in a shared frame buffer.
+
+The mono composite (background, lens effect, glasses and HUD) is rendered
+once; each eye's view is a window of it centred on that eye's lens, so the
+two views are offset by the effective IPD (the stereo disparity). Both views
+are NumPy views into one preallocated side-by-side buffer, and `image` is a
+PIL image over the same memory, so presenting or capturing it copies nothing
+more. Only regions that changed in the mono frame are copied into the views.
+"""
+from PIL import Image
+import image_processing
+from config import STEREO_EYE_WIDTH
+
+
+class StereoFrame:
+    """Left and right eye views of a mono frame, side by side in one buffer."""
+
+    def __init__(self, size, eye_width=STEREO_EYE_WIDTH):
+        np = image_processing.np
+        w, h = size
+        self.frame_size = size
+        self.eye_width = eye_width or w // 2
+        self.size = (2 * self.eye_width, h)
+        self.buffer = np.zeros((h, 2 * self.eye_width, 4), dtype=np.uint8)
+        self.views = (self.buffer[:, :self.eye_width], self.buffer[:, self.eye_width:])
+        self.image = Image.frombuffer("RGBA", self.size, self.buffer, "raw", "RGBA", 0, 1)
+        self.windows = None     # x offset of each eye's window in the mono frame
+
+    @property
+    def disparity(self):
+        """Horizontal offset in px between the eye windows."""
+        return self.windows[1] - self.windows[0] if self.windows else 0
+
+    def eye_windows(self, geometry):
+        """x offsets of the left and right eye windows: centred on each lens."""
+        return tuple((x1 + x2) // 2 - self.eye_width // 2 for x1, _, x2, _ in geometry)
+
+    def render(self, frame, geometry, dirty=None):
+        """Copy `frame` (mono, frame_size) into the eye views; returns dirty boxes of `image`.
+
+        `dirty` are the boxes of `frame` that changed since the last call (None
+        for all of it). If the lenses moved, both views are copied in full.
+        """
+        np = image_processing.np
+        windows = self.eye_windows(geometry)
+        if windows != self.windows or dirty is None:
+            self.buffer[...] = 0        # parts of a window outside the frame stay black
+            self.windows = windows
+            dirty = [(0, 0) + self.frame_size]
+
+        out = []
+        ew, h = self.eye_width, self.size[1]
+        for eye, (view, x0) in enumerate(zip(self.views, windows)):
+            for x1, y1, x2, y2 in dirty:
+                x1, x2 = max(x1, x0, 0), min(x2, x0 + ew, self.frame_size[0])
+                y1, y2 = max(y1, 0), min(y2, h)
+                if x1 >= x2 or y1 >= y2:
+                    continue
+                view[y1:y2, x1 - x0:x2 - x0] = np.asarray(frame.crop((x1, y1, x2, y2)))
+                out.append((eye * ew + x1 - x0, y1, eye * ew + x2 - x0, y2))
+        return self.image, out
+
+    def to_frame(self, x, y):
+        """Mono frame coordinates of a point in the side-by-side image."""
+        eye = 0 if x < self.eye_width else 1
+        return x - eye * self.eye_width + self.windows[eye], y
+
+    def eye_at(self, x):
+        """The eye whose window holds mono frame column `x` (the nearer window centre if both or neither)."""
+        return min((0, 1), key=lambda eye: abs(x - self.windows[eye] - self.eye_width / 2))
+
+    def point_to_view(self, point, eye=0):
+        """A mono frame point mapped into one eye's view of `image` (not clipped)."""
+        return [point[0] - self.windows[eye] + eye * self.eye_width, point[1]]
+
+    def to_view(self, box, eye=0):
+        """A mono frame box mapped into one eye's view of `image`, clipped to it (None if outside)."""
+        x0 = self.windows[eye]
+        x1, x2 = max(box[0] - x0, 0), min(box[2] - x0, self.eye_width)
+        if x1 >= x2:
+            return None
+        return [x1 + eye * self.eye_width, box[1], x2 + eye * self.eye_width, box[3]]
+
+    def meta(self):
+        """Stereo layout for capture metadata."""
+        return {"eye_width": self.eye_width, "windows": list(self.windows), "disparity_px": self.disparity}
@@ -0,0 +1,139 @@
+import json
+import pytest
+from capture_bundle import CaptureBundle, MAGIC, RECORD_HEADER
+
+
+def make_record(i, payload=b""):
+    return b"raw%d" % i + payload, b"det%d" % i, {"capture_id": 1000 + i, "mode": "carscan", "n": i}
+
+
+def fill(bundle, count, payload=b""):
+    for i in range(count):
+        bundle.append(*make_record(i, payload))
+
+
+def chunk_file(root, n=0):
+    return root / f"chunk_{n:05d}.ivb"
+
+
+def record_offsets(path):
+    """Offsets of the records in a chunk written without corruption."""
+    data, offsets, offset = path.read_bytes(), [], 0
+    while offset < len(data):
+        offsets.append(offset)
+        _, _, raw_len, det_len, meta_len = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size + raw_len + det_len + meta_len
+    return offsets
+
+
+def test_round_trip_survives_reopen(tmp_path):
+    fill(CaptureBundle(tmp_path), 3)
+    bundle = CaptureBundle(tmp_path)
+    assert bundle.ids() == [1000, 1001, 1002]
+    for i in range(3):
+        assert bundle.read(1000 + i) == make_record(i)
+
+
+def test_round_trip_across_chunks(tmp_path):
+    bundle = CaptureBundle(tmp_path, chunk_bytes=1)
+    fill(bundle, 3)
+    assert sorted(p.name for p in tmp_path.glob("chunk_*.ivb")) == [
+        "chunk_00000.ivb", "chunk_00001.ivb", "chunk_00002.ivb"]
+    assert CaptureBundle(tmp_path).read(1002) == make_record(2)
+
+
+def test_append_after_torn_index_entry(tmp_path):
+    fill(CaptureBundle(tmp_path), 2)
+    index = tmp_path / "index.bin"
+    index.write_bytes(index.read_bytes() + b"\x01" * 10)     # append interrupted mid-entry
+    size = index.stat().st_size
+    bundle = CaptureBundle(tmp_path)
+    assert bundle.ids() == [1000, 1001]
+    assert index.stat().st_size == size         # readers never write
+    bundle.append(*make_record(5))
+    reopened = CaptureBundle(tmp_path)
+    assert reopened.ids() == [1000, 1001, 1005]
+    assert reopened.read(1005) == make_record(5)
+
+
+def test_duplicate_id_is_refused(tmp_path):
+    bundle = CaptureBundle(tmp_path)
+    fill(bundle, 1)
+    with pytest.raises(ValueError):
+        bundle.append(*make_record(0))
+
+
+def test_export_writes_loose_files(tmp_path):
+    bundle = CaptureBundle(tmp_path / "bundle")
+    fill(bundle, 2)
+    assert bundle.export(tmp_path / "out") == [1000, 1001]
+    assert (tmp_path / "out" / "capture_1001.png").read_bytes() == b"raw1"
+    assert (tmp_path / "out" / "capture_1001_det.png").read_bytes() == b"det1"
+    assert json.loads((tmp_path / "out" / "capture_1001.json").read_text())["n"] == 1
+
+
+def test_rebuild_index_matches_appended_index(tmp_path):
+    bundle = CaptureBundle(tmp_path)
+    fill(bundle, 3)
+    index = (tmp_path / "index.bin").read_bytes()
+    assert bundle.rebuild_index() == 0
+    assert (tmp_path / "index.bin").read_bytes() == index
+
+
+@pytest.mark.parametrize("torn_bytes", [2, RECORD_HEADER.size, RECORD_HEADER.size + 3])
+def test_rebuild_index_truncates_torn_tail(tmp_path, torn_bytes):
+    bundle = CaptureBundle(tmp_path)
+    fill(bundle, 2)
+    chunk = chunk_file(tmp_path)
+    size = chunk.stat().st_size
+    header = RECORD_HEADER.pack(MAGIC, 2000, 100, 100, 100)
+    with open(chunk, "ab") as f:
+        f.write((header + b"x" * 10)[:torn_bytes])
+
+    assert bundle.rebuild_index() == 0
+    assert chunk.stat().st_size == size
+    assert bundle.ids() == [1000, 1001]
+    bundle.append(*make_record(5))
+    assert CaptureBundle(tmp_path).read(1005) == make_record(5)
+
+
+def test_rebuild_index_keeps_records_after_corrupt_one(tmp_path):
+    bundle = CaptureBundle(tmp_path)
+    fill(bundle, 3)
+    chunk = chunk_file(tmp_path)
+    size = chunk.stat().st_size
+    data = bytearray(chunk.read_bytes())
+    second = record_offsets(chunk)[1]
+    data[second:second + 4] = b"XXXX"
+    chunk.write_bytes(bytes(data))
+
+    assert bundle.rebuild_index() == 1
+    assert chunk.stat().st_size == size
+    assert bundle.ids() == [1000, 1002]
+    assert bundle.read(1002) == make_record(2)
+
+
+def test_resync_ignores_magic_inside_image_data(tmp_path):
+    bundle = CaptureBundle(tmp_path)
+    fill(bundle, 3, payload=MAGIC + b"\0" * RECORD_HEADER.size)
+    chunk = chunk_file(tmp_path)
+    data = bytearray(chunk.read_bytes())
+    data[0:4] = b"XXXX"
+    chunk.write_bytes(bytes(data))
+
+    assert bundle.rebuild_index() == 1
+    assert bundle.ids() == [1001, 1002]
+    assert bundle.read(1001) == make_record(1, MAGIC + b"\0" * RECORD_HEADER.size)
+
+
+def test_rebuild_index_leaves_unrecognised_tail_in_place(tmp_path):
+    bundle = CaptureBundle(tmp_path)
+    fill(bundle, 2)
+    chunk = chunk_file(tmp_path)
+    with open(chunk, "ab") as f:
+        f.write(b"garbage that is not a record header at all")
+    size = chunk.stat().st_size
+
+    assert bundle.rebuild_index() == 1
+    assert chunk.stat().st_size == size
+    assert bundle.ids() == [1000, 1001]
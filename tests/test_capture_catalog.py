@@ -0,0 +1,110 @@
+import json
+import shutil
+from capture_bundle import CaptureBundle
+from capture_catalog import CaptureCatalog
+
+
+def write_captures(directory, ids):
+    directory.mkdir(parents=True, exist_ok=True)
+    for capture_id in ids:
+        with open(directory / f"capture_{capture_id}.json", "w") as f:
+            json.dump({"capture_id": capture_id, "mode": "carscan"}, f)
+
+
+def ids(catalog):
+    return sorted(r["capture_id"] for r in catalog.query())
+
+
+def test_rescan_adds_and_removes_loose_captures(tmp_path):
+    root = tmp_path / "captures"
+    write_captures(root, [1, 2])
+    write_captures(root / "session_a", [3])
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+    assert catalog.rescan(root) == (3, 0)
+    assert catalog.rescan(root) == (0, 0)
+
+    (root / "capture_1.json").unlink()
+    assert catalog.rescan(root) == (0, 1)
+    assert ids(catalog) == [2, 3]
+
+
+def test_rescan_purges_deleted_directory(tmp_path):
+    root = tmp_path / "captures"
+    write_captures(root / "session_a", [1, 2])
+    write_captures(root / "session_b", [3])
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+    catalog.rescan(root)
+
+    shutil.rmtree(root / "session_a")
+    assert catalog.rescan(root) == (0, 2)
+    assert ids(catalog) == [3]
+
+
+def test_rescan_handles_glob_characters_in_paths(tmp_path):
+    root = tmp_path / "captures"
+    write_captures(root / "b[1]", [1, 2])
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+    assert catalog.rescan(root) == (2, 0)
+
+    write_captures(root / "b[1]", [3])
+    assert catalog.rescan(root) == (1, 0)
+    (root / "b[1]" / "capture_1.json").unlink()
+    assert catalog.rescan(root) == (0, 1)
+    assert ids(catalog) == [2, 3]
+
+
+def test_rescan_reconciles_bundles(tmp_path):
+    root = tmp_path / "captures"
+    bundle = CaptureBundle(root / "bundle")
+    for capture_id in (1, 2):
+        bundle.append(b"raw", b"det", {"capture_id": capture_id, "mode": "navigation"})
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+    assert catalog.rescan(root) == (2, 0)
+
+    # Drop the second record from the index, as a rebuild after corruption would
+    index = root / "bundle" / "index.bin"
+    index.write_bytes(index.read_bytes()[:len(index.read_bytes()) // 2])
+    assert catalog.rescan(root) == (0, 1)
+
+    shutil.rmtree(root / "bundle")
+    assert catalog.rescan(root) == (0, 1)
+    assert ids(catalog) == []
+
+
+def test_same_capture_id_in_two_bundles(tmp_path):
+    root = tmp_path / "captures"
+    for name in ("a", "b"):
+        bundle = CaptureBundle(root / name)
+        for capture_id in (1, 2):
+            bundle.append(b"raw", b"det", {"capture_id": capture_id, "mode": "carscan"})
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+    assert catalog.rescan(root) == (4, 0)
+
+    index = root / "a" / "index.bin"
+    index.write_bytes(index.read_bytes()[:len(index.read_bytes()) // 2])
+    assert catalog.rescan(root) == (0, 1)
+    assert ids(catalog) == [1, 1, 2]
+
+
+def test_catalog_keeps_damage_summary_without_regions(tmp_path):
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+    regions = [{"bbox": [0, 0, 4, 4], "area": 12, "edge_density": 0.5, "contour": [[0, 0], [4, 4]]}]
+    catalog.add({"capture_id": 1, "damage": {"count": 1, "total_area": 12, "regions": regions}},
+                tmp_path / "capture_1.json")
+    catalog.add({"capture_id": 2, "damage": None}, tmp_path / "capture_2.json")
+
+    (row,) = catalog.query(min_damage=1, with_meta=True)
+    assert (row["capture_id"], row["damage_count"], row["damage_area"]) == (1, 1, 12)
+    assert row["meta"]["damage"] == {"count": 1, "total_area": 12}
+    assert catalog.query(min_damage_area=13) == []
+
+
+def test_relative_and_absolute_roots_share_rows(tmp_path, monkeypatch):
+    write_captures(tmp_path / "captures", [1, 2])
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+    monkeypatch.chdir(tmp_path)
+    assert catalog.rescan("captures") == (2, 0)
+    catalog.add({"capture_id": 2, "mode": "navigation"}, "captures/capture_2.json")
+    assert catalog.rescan(tmp_path / "captures") == (0, 0)
+    assert ids(catalog) == [1, 2]
+    assert {r["mode"] for r in catalog.query()} == {"carscan", "navigation"}
@@ -0,0 +1,65 @@
+import io
+import json
+from PIL import Image, ImageChops, ImageDraw
+from batch_detect import process_capture, run_batch
+from capture_catalog import CaptureCatalog
+from capture_pipeline import write_capture
+from config import DETECTOR_SETTINGS
+
+SIZE = (400, 300)
+
+
+def frame():
+    img = Image.effect_noise(SIZE, 20).convert("RGBA")
+    ImageDraw.Draw(img).rectangle((180, 120, 230, 160), outline=(250, 250, 250, 255), width=3)
+    return img
+
+
+def guide_layer():
+    layer = Image.new("RGBA", SIZE, (0, 0, 0, 0))
+    ImageDraw.Draw(layer).ellipse((150, 90, 260, 190), outline=(0, 255, 0, 255), width=3)
+    return layer
+
+
+def same(a, b):
+    return ImageChops.difference(a.convert("RGB"), b.convert("RGB")).getbbox() is None
+
+
+def test_capture_matches_screen_and_batch_detect_agrees(tmp_path):
+    comp = frame()
+    overlay = guide_layer()
+    meta = {"roi": [120, 60, 290, 220], "guide_step": 3}
+    result = write_capture(comp, meta, tmp_path, overlay=overlay)
+    with Image.open(result["image"]) as stored:
+        assert same(stored, Image.alpha_composite(comp, overlay))
+    with Image.open(result["raw"]) as raw:
+        assert same(raw, comp)
+    process_capture(result["image"], DETECTOR_SETTINGS)
+    with open(result["image"].with_suffix(".json")) as f:
+        assert json.load(f)["damage"] == meta["damage"]
+
+
+def test_batch_detect_updates_the_catalog(tmp_path):
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+    meta = {"roi": [120, 60, 290, 220], "guide_step": 3}
+    result = write_capture(frame(), meta, tmp_path / "captures", catalog=catalog, overlay=guide_layer())
+    with catalog._lock, catalog._db:
+        catalog._db.execute("UPDATE captures SET damage_count = NULL, meta = '{}'")
+
+    run_batch(tmp_path / "captures", workers=1, force=True, out=io.StringIO(), catalog=catalog)
+    (row,) = catalog.query(with_meta=True)
+    assert row["damage_count"] == meta["damage"]["count"]
+    assert row["meta"]["damage"] == {k: v for k, v in meta["damage"].items() if k != "regions"}
+    assert result["meta_file"].read_text().startswith('{"')
+
+
+def test_batch_detect_catalogs_legacy_capture_without_id(tmp_path):
+    root = tmp_path / "captures"
+    root.mkdir()
+    frame().convert("RGB").save(root / "capture_1758349814.png")
+    (root / "capture_1758349814.json").write_text('{"timestamp": 1758349814, "mode": "navigation"}')
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+
+    (row,) = run_batch(root, workers=1, out=io.StringIO(), catalog=catalog)
+    assert row["status"] == "ok"
+    assert [r["capture_id"] for r in catalog.query()] == [1758349814]
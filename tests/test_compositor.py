@@ -0,0 +1,68 @@
+import random
+from PIL import Image, ImageChops
+from compositor import FrameCompositor, merge_boxes
+from ui_components import GlassesOverlay
+
+SIZE = (1000, 520)
+
+
+def background():
+    return Image.effect_noise(SIZE, 60).convert("RGBA")
+
+
+def test_changed_boxes_cover_every_changed_pixel():
+    gen = GlassesOverlay(SIZE, cache_size=4)
+    rng = random.Random(1)
+    args = (240, 0.30, 0.56)
+    for _ in range(40):
+        new = (rng.randrange(160, 321), round(rng.uniform(0.22, 0.36), 2), round(rng.uniform(0.45, 0.65), 2))
+        new = tuple(rng.choice((a, b)) for a, b in zip(args, new))     # often only one slider moves
+        old_img, _ = gen.generate(*args)
+        new_img, _ = gen.generate(*new)
+        diff = ImageChops.difference(old_img, new_img)
+        for box in gen.changed_boxes(args, new):
+            diff.paste((0, 0, 0, 0), box)
+        assert diff.getbbox(alpha_only=False) is None, (args, new)
+        args = new
+
+
+def test_incremental_compose_matches_full_composite():
+    bg = background()
+    gen = GlassesOverlay(SIZE)
+    comp = FrameCompositor(bg)
+    args = (240, 0.30, 0.56)
+    comp.compose(gen.generate(*args)[0])
+    for new in [(240, 0.30, 0.57), (241, 0.30, 0.57), (241, 0.31, 0.57), (300, 0.22, 0.45), (300, 0.22, 0.45)]:
+        overlay, _ = gen.generate(*new)
+        dirty = comp.compose(overlay, gen.changed_boxes(args, new))
+        assert ImageChops.difference(comp.frame, Image.alpha_composite(bg, overlay)).getbbox() is None
+        if new == args:
+            assert dirty == []
+        args = new
+
+
+def test_small_change_stays_partial_and_unknown_change_is_full():
+    bg = background()
+    gen = GlassesOverlay(SIZE)
+    comp = FrameCompositor(bg)
+    comp.compose(gen.generate(240, 0.30, 0.56)[0])
+    dirty = comp.compose(gen.generate(240, 0.30, 0.57)[0], gen.changed_boxes((240, 0.30, 0.56), (240, 0.30, 0.57)))
+    assert dirty and dirty != [(0, 0) + SIZE]
+    assert comp.compose(gen.generate(240, 0.30, 0.56)[0]) == [(0, 0) + SIZE]
+
+
+def test_merge_boxes():
+    assert merge_boxes([(0, 0, 10, 10), (10, 0, 20, 10)]) == [(0, 0, 20, 10)]
+    assert merge_boxes([(0, 0, 10, 10), (5, 5, 15, 15)]) == [(0, 0, 15, 15)]
+    assert sorted(merge_boxes([(0, 0, 10, 10), (100, 100, 110, 110)])) == [(0, 0, 10, 10), (100, 100, 110, 110)]
+
+
+def test_renderer_times_overlay_separately_from_composite():
+    from offscreen_renderer import OffscreenRenderer, default_lens_params
+    from perf_stats import FrameStats
+    stats = FrameStats(enabled=True)
+    renderer = OffscreenRenderer(background(), SIZE, stats=stats)
+    for scale in (1.0, 0.5):
+        renderer.render_base(default_lens_params(), scale)
+    assert stats.stages["overlay"].count == 2
+    assert stats.stages["composite"].count == 2
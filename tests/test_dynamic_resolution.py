@@ -0,0 +1,74 @@
+import types
+from dynamic_resolution import ResolutionController
+
+
+def controller():
+    return ResolutionController(tiers=(1.0, 0.5), target_ms=30, headroom=0.7, samples=4, min_gain=0.8)
+
+
+def feed(ctrl, *frame_ms):
+    return [ctrl.record(ms) for ms in frame_ms]
+
+
+def test_steps_down_on_the_mean_of_a_full_sample_window():
+    ctrl = controller()
+    assert feed(ctrl, 50, 50, 50) == [False] * 3      # window not full yet
+    assert feed(ctrl, 50) == [True]
+    assert ctrl.scale == 0.5
+
+    ctrl = controller()
+    assert not any(feed(ctrl, 50, 10, 20, 30))         # one slow frame averages out (mean 27.5)
+    assert ctrl.scale == 1.0
+
+
+def test_steps_up_only_with_headroom():
+    ctrl = controller()
+    feed(ctrl, 50, 50, 50, 50)
+    assert not any(feed(ctrl, 6, 6, 6, 6))             # 6 ms * 4 = 24 ms predicted, above 0.7 * 30
+    assert ctrl.scale == 0.5
+    assert any(feed(ctrl, 4, 4, 4, 4))                 # down to 16 ms predicted
+    assert ctrl.scale == 1.0
+
+
+def test_lower_tier_without_a_measured_gain_is_dropped_and_not_retried():
+    ctrl = controller()
+    feed(ctrl, 40, 40, 40, 40)
+    assert ctrl.scale == 0.5
+    assert feed(ctrl, 38, 38, 38, 38)[-1]              # not below 0.8 * 40: back to full resolution
+    assert ctrl.scale == 1.0
+    assert not any(feed(ctrl, 40, 40, 40, 40))
+    assert ctrl.scale == 1.0
+    # Once full resolution gets slow enough for the measured tier to pay off, it is used again
+    assert any(feed(ctrl, 60, 60, 60, 60))
+    assert ctrl.scale == 0.5
+
+
+def test_idle_rerenders_at_full_resolution():
+    from i_vision_prototype_app import iVisionPrototypeApp
+
+    class Root:
+        def __init__(self):
+            self.jobs = {}
+
+        def after(self, ms, callback):
+            self.jobs[len(self.jobs) + 1] = callback
+            return len(self.jobs)
+
+        def after_cancel(self, job):
+            self.jobs.pop(job)
+
+    redraws = []
+    app = types.SimpleNamespace(root=Root(), resolution=controller(), _idle_job=None,
+                                lens_params={'ipd': 240, 'lens_w_ratio': 0.3, 'lens_h_ratio': 0.56},
+                                glasses_overlay=types.SimpleNamespace(prewarm=lambda *args: None),
+                                _redraw_base=lambda timed=True: redraws.append(timed))
+    for name in ("_frame_rendered", "_restore_full_resolution"):
+        setattr(app, name, types.MethodType(getattr(iVisionPrototypeApp, name), app))
+
+    for _ in range(4):
+        app._frame_rendered(50)
+    assert app.resolution.scale == 0.5
+    (job,) = app.root.jobs.values()                    # only the latest idle timer is pending
+    job()
+    assert app.resolution.scale == 1.0
+    assert redraws == [False]                          # the re-render is not fed back as a frame time
@@ -0,0 +1,39 @@
+from PIL import Image
+from frame_sources import FrameSource, ImageSequenceSource
+
+SIZE = (64, 48)
+
+
+class EmptyLoop(FrameSource):
+    """Rewinds successfully but never has a frame, like a video that cannot be decoded."""
+
+    def __init__(self):
+        super().__init__(SIZE, fps=0)
+        self.rewinds = 0
+
+    def _read_next(self):
+        return None
+
+    def _rewind(self):
+        self.rewinds += 1
+        return True
+
+
+def test_empty_looping_source_stops_instead_of_spinning():
+    source = EmptyLoop().start()
+    source._thread.join(timeout=1.0)
+    assert not source._thread.is_alive()
+    assert source.rewinds == 1
+    source.stop()
+
+
+def test_decoder_error_is_recorded(tmp_path):
+    good, bad = tmp_path / "a.png", tmp_path / "b.png"
+    Image.new("RGB", SIZE).save(good)
+    bad.write_bytes(b"not an image")
+    source = ImageSequenceSource([good, bad], SIZE, fps=0).start()
+    source._thread.join(timeout=1.0)
+    assert source.get_latest() is not None
+    assert source.error is not None
+    assert source.stats()["decoded"] == 1 and source.stats()["error"]
+    source.stop()
@@ -0,0 +1,82 @@
+import threading
+import time
+from config import DEFAULT_BRIDGE_MIN, OVERLAY_CACHE_SIZE
+from ui_components import GlassesOverlay
+
+SIZE = (500, 260)
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def cached(gen, params):
+    key = gen._cache_key(*params, DEFAULT_BRIDGE_MIN, 0.12)
+    with gen._cache_lock:
+        return key in gen._cache
+
+
+def test_lru_evicts_least_recently_used_at_cache_size():
+    gen = GlassesOverlay(SIZE)
+    assert gen.cache_size == OVERLAY_CACHE_SIZE
+    params = [(200 + i, 0.25, 0.55) for i in range(OVERLAY_CACHE_SIZE + 1)]
+    for p in params[:OVERLAY_CACHE_SIZE]:
+        gen.generate(*p)
+    assert len(gen._cache) == OVERLAY_CACHE_SIZE and gen.misses == OVERLAY_CACHE_SIZE
+
+    gen.generate(*params[0])                # touch the oldest entry: params[1] is now LRU
+    assert gen.hits == 1
+    gen.generate(*params[-1])               # one over the limit evicts it
+    assert len(gen._cache) == OVERLAY_CACHE_SIZE
+    assert cached(gen, params[0]) and cached(gen, params[-1])
+    assert not cached(gen, params[1])
+
+    gen.generate(*params[1])
+    assert (gen.hits, gen.misses) == (1, OVERLAY_CACHE_SIZE + 2)
+
+
+def test_prewarmed_steps_are_served_as_cache_hits():
+    gen = GlassesOverlay(SIZE)
+    current = (250, 0.25, 0.55)
+    neighbours = list(gen._prewarm_candidates(*current))
+    assert len(neighbours) < gen.cache_size
+
+    gen.prewarm(*current)
+    assert wait_for(lambda: all(cached(gen, p) for p in neighbours))
+    for p in neighbours:
+        gen.generate(*p)
+    assert gen.misses == 0
+    assert gen.hits == len(neighbours)
+
+
+def test_prewarm_is_superseded_when_the_slider_moves():
+    gen = GlassesOverlay(SIZE)
+    render = gen._render
+    started, release = threading.Event(), threading.Event()
+    rendered = []
+
+    def gated_render(*params):
+        rendered.append(params)
+        started.set()
+        release.wait()
+        return render(*params)
+
+    gen._render = gated_render
+    old, new = (200, 0.30, 0.50), (300, 0.24, 0.60)
+    new_neighbours = list(gen._prewarm_candidates(*new))
+
+    gen.prewarm(*old)
+    assert started.wait(10.0)               # the worker is busy with the old request
+    gen.prewarm(*new)
+    release.set()
+    assert wait_for(lambda: all(cached(gen, p) for p in new_neighbours))
+
+    # Only the render in flight was spent on the old request
+    assert rendered[0] in list(gen._prewarm_candidates(*old))
+    assert all(p in new_neighbours for p in rendered[1:])
+    assert len(rendered) == 1 + len(new_neighbours)
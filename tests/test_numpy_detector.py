@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+import numpy_detector
+
+# Tile-divisible, not divisible on one axis, not divisible on either, smaller than the grid
+SIZES = [(64, 64), (300, 400), (183, 171), (9, 9)]
+
+
+def sample(h, w):
+    rng = np.random.default_rng(h * w)
+    return cv2.GaussianBlur(rng.integers(0, 256, (h, w, 3), dtype=np.uint8), (5, 5), 0)
+
+
+@pytest.mark.parametrize("h, w", SIZES)
+def test_gray_matches_cv2(h, w):
+    rgb = sample(h, w)
+    assert np.array_equal(numpy_detector.to_gray(rgb), cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY))
+
+
+@pytest.mark.parametrize("h, w", SIZES)
+def test_clahe_matches_cv2(h, w):
+    gray = cv2.cvtColor(sample(h, w), cv2.COLOR_RGB2GRAY)
+    ref = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(gray).astype(int)
+    diff = np.abs(numpy_detector.clahe(gray, 2.0, 8) - ref)
+    # OpenCV's vectorized blend rounds a few pixels the other way
+    assert diff.max() <= 1
+    assert (diff > 0).mean() < 0.01
+
+
+@pytest.mark.parametrize("h, w", SIZES)
+def test_canny_matches_cv2(h, w):
+    gray = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8)).apply(cv2.cvtColor(sample(h, w), cv2.COLOR_RGB2GRAY))
+    assert np.array_equal(numpy_detector.canny(gray, 50, 150), cv2.Canny(gray, 50, 150) > 0)
+
+
+@pytest.mark.parametrize("h, w", SIZES)
+def test_component_labels_match_cv2(h, w):
+    mask = np.random.default_rng(h + w).random((h, w)) < 0.45
+    labels, n = numpy_detector.component_image(mask)
+    count, ref = cv2.connectedComponents(mask.astype(np.uint8), connectivity=8)
+    # Same components, whatever their numbering
+    assert n == count - 1 == len(set(zip(labels[mask].tolist(), ref[mask].tolist())))
+    assert (labels[~mask] == 0).all()
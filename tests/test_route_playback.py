@@ -0,0 +1,31 @@
+import pytest
+from route_playback import Route, RoutePlayback, format_eta
+
+POINTS = [[40.0, -74.0], [40.001, -74.0], [40.002, -74.0]]
+
+
+def test_maneuver_outside_route_is_rejected():
+    for point in (-1, len(POINTS)):
+        with pytest.raises(ValueError):
+            Route(POINTS, [{"point": point, "direction": "left", "text": "Turn left"}])
+
+
+def test_next_maneuver_and_playback_state():
+    route = Route(POINTS, [{"point": 1, "direction": "right", "text": "Turn right"}])
+    maneuver, to_next = route.next_maneuver(0.0)
+    assert maneuver["direction"] == "right"
+    assert to_next == pytest.approx(route.cumulative[1])
+    assert route.next_maneuver(route.cumulative[1] + 1)[0] is None
+
+    now = [0.0]
+    playback = RoutePlayback(route, speed_kmh=36, clock=lambda: now[0])
+    assert playback.state()["direction"] == "right"
+    now[0] = 1000.0
+    assert playback.finished
+    assert playback.state()["direction"] == "straight"
+
+
+def test_format_eta():
+    assert format_eta(20) == "<1 min"
+    assert format_eta(60) == "1 min"
+    assert format_eta(12 * 60) == "12 mins"
@@ -0,0 +1,47 @@
+import json
+from pathlib import Path
+from PIL import Image, ImageDraw
+from capture_catalog import CaptureCatalog
+from config import SESSION_SHEET_COLUMNS, SESSION_THUMB_SIZE
+from scan_session import LABEL_H, ScanSession
+
+SIZE = (400, 300)
+
+
+def frame(seed):
+    img = Image.effect_noise(SIZE, 20 + seed).convert("RGBA")
+    ImageDraw.Draw(img).rectangle((180, 120, 230, 160), outline=(250, 250, 250, 255), width=3)
+    return img
+
+
+def test_two_step_session(tmp_path):
+    catalog = CaptureCatalog(tmp_path / "catalog.sqlite")
+    session = ScanSession(capture_dir=tmp_path, steps=2)
+    for step in (1, 0):
+        assert not session.complete
+        assert session.next_step() == 0
+        session.add(frame(step), {"mode": "carscan", "roi": [120, 60, 290, 220], "guide_step": step})
+    assert session.complete
+
+    summary = session.run(workers=2, catalog=catalog)
+
+    steps = summary["steps"]
+    assert [s["step"] for s in steps] == [0, 1]
+    for s in steps:
+        assert (session.session_dir / s["image"]).exists()
+        assert (session.session_dir / s["detection"]).exists()
+        assert s["capture_id"] == session.frames[s["step"]][1]["capture_id"]
+        assert s["detect_ms"] > 0 and s["bytes"] > 0
+    with open(session.session_dir / "session.json") as f:
+        assert json.load(f) == summary
+
+    rows = sorted(catalog.query(with_meta=True), key=lambda r: r["guide_step"])
+    assert [r["capture_id"] for r in rows] == [s["capture_id"] for s in steps]
+    for row, s in zip(rows, steps):
+        assert row["damage_count"] == s["damage_regions"]
+        assert row["meta"]["session_id"] == session.session_id
+        assert Path(row["location"]).exists()
+
+    tw, th = SESSION_THUMB_SIZE
+    with Image.open(session.session_dir / summary["contact_sheet"]) as sheet:
+        assert sheet.size == (SESSION_SHEET_COLUMNS * tw, th + LABEL_H)
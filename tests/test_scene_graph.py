@@ -0,0 +1,226 @@
+from PIL import Image, ImageChops, ImageDraw
+from scene_graph import HUD_LAYER, MODE_LAYER, TK_DEFAULTS, TK_RESET, SceneGraph, SceneNode
+
+SIZE = (400, 300)
+
+
+def scene():
+    graph = SceneGraph()
+    graph.put("ring", SceneNode('oval', (100, 60, 220, 180), outline="lime", width=3))
+    graph.put("arrow", SceneNode('polygon', (160, 40, 150, 70, 170, 70), fill="lime"))
+    graph.put("label", SceneNode('text', (160, 200), text="Target 1", fill="lime", font=("Helvetica", 12, "bold")))
+    graph.put("clock", SceneNode('text', (350, 20), HUD_LAYER, text="12:00", fill="white", font=("Helvetica", 14)))
+    return graph
+
+
+def background():
+    img = Image.linear_gradient("L").resize(SIZE).convert("RGBA")
+    ImageDraw.Draw(img).rectangle((150, 100, 250, 250), fill=(200, 40, 40, 255))
+    return img
+
+
+def full(graph, base):
+    frame = base.copy()
+    graph.rasterize(ImageDraw.Draw(frame))
+    return frame
+
+
+def redraw(graph, base, frame, previous):
+    """Bring `frame` up to date the way the stereo view does: only the changed boxes."""
+    for x1, y1, x2, y2 in graph.changed_boxes(previous):
+        box = (max(x1, 0), max(y1, 0), min(x2, SIZE[0]), min(y2, SIZE[1]))
+        if box[0] >= box[2] or box[1] >= box[3]:
+            continue
+        patch = base.crop(box)
+        graph.rasterize(ImageDraw.Draw(patch), box)
+        frame.paste(patch, box[:2])
+
+
+def test_put_of_an_equal_node_keeps_the_version():
+    graph = scene()
+    version = graph.version
+    graph.update("ring", width=3)
+    graph.put("label", SceneNode('text', (160, 200), text="Target 1", fill="lime", font=("Helvetica", 12, "bold")))
+    assert graph.version == version
+    graph.update("ring", outline="red")
+    assert graph.version == version + 1
+
+
+def test_changed_boxes_bring_a_rasterized_frame_up_to_date():
+    graph, base = scene(), background()
+    frame = full(graph, base)
+    changes = [
+        lambda: graph.update("ring", (130, 80, 250, 200)),
+        lambda: graph.update("label", text="Target 2"),
+        lambda: graph.update("arrow", state="hidden"),
+        lambda: graph.remove("clock"),
+        lambda: graph.put("clock", SceneNode('text', (380, 290), HUD_LAYER, text="12:01", fill="white")),
+        lambda: graph.put("card", SceneNode('rectangle', (20, 20, 120, 90), outline="cyan", fill="black", width=2)),
+    ]
+    for change in changes:
+        previous = dict(graph.nodes)
+        change()
+        redraw(graph, base, frame, previous)
+        assert ImageChops.difference(frame, full(graph, base)).getbbox() is None
+
+
+def test_no_changes_no_boxes():
+    graph = scene()
+    assert graph.changed_boxes(dict(graph.nodes)) == []
+
+
+class FakeCanvas:
+    """Records canvas items (kind, coords, options) and their stacking order."""
+
+    def __init__(self):
+        self.items = {}
+        self.stack = []
+        self.deleted = []
+        for kind in TK_DEFAULTS:
+            setattr(self, f"create_{kind}", lambda *coords, kind=kind, **options: self._create(kind, coords, options))
+
+    def _create(self, kind, coords, options):
+        item = len(self.items) + 1
+        options.pop("tags")
+        self.items[item] = [kind, tuple(coords), options]
+        self.stack.append(item)
+        return item
+
+    def delete(self, item):
+        self.deleted.append(item)
+
+    def after_idle(self, callback):
+        return "idle"
+
+    def coords(self, item, *coords):
+        self.items[item][1] = coords
+
+    def itemconfigure(self, item, **options):
+        self.items[item][2].update(options)
+
+    def tag_raise(self, item, above=None):
+        if item in self.stack:
+            self.stack.remove(item)
+            self.stack.insert(self.stack.index(above) + 1, item)
+
+    def tag_lower(self, item, below):
+        self.stack.remove(item)
+        self.stack.insert(self.stack.index(below), item)
+
+    def shown(self, item):
+        """(kind, coords, options) with options at their Tk default left out."""
+        kind, coords, options = self.items[item]
+        defaults = {**TK_RESET, **{k: "" if v is None else v for k, v in TK_DEFAULTS[kind].items()}}
+        return kind, coords, {k: v for k, v in options.items() if defaults.get(k) != v}
+
+
+def assert_matches(graph):
+    """The visible canvas items, bottom to top, are exactly the graph's visible nodes."""
+    canvas = graph.canvas
+    visible = [canvas.shown(item) for item in canvas.stack if canvas.items[item][2].get('state') != "hidden"]
+    expected = [(node.kind, node.coords, node.options) for _, node in graph.ordered() if node.visible]
+    assert visible == expected
+
+
+def test_sync_creates_items_in_layer_order():
+    graph = SceneGraph(FakeCanvas())
+    graph.put("clock", SceneNode('text', (350, 20), HUD_LAYER, text="12:00", fill="white"))
+    graph.put("ring", SceneNode('oval', (100, 60, 220, 180), outline="lime", width=3))
+    graph.sync()
+    assert graph.stats()["created"] == 2
+    assert_matches(graph)
+
+
+def test_sync_resets_options_the_new_node_drops():
+    graph = SceneGraph(FakeCanvas())
+    graph.put("label", SceneNode('text', (10, 10), text="a", state="hidden", anchor="sw", fill="red"))
+    graph.sync()
+    graph.put("label", SceneNode('text', (10, 10), text="a"))
+    graph.sync()
+    assert_matches(graph)
+    (item,) = graph.canvas.items
+    assert graph.canvas.items[item][2] == {'text': "a", 'state': "normal", 'anchor': "center", 'fill': "black"}
+
+
+def test_sync_replaces_the_item_when_the_kind_changes():
+    graph = SceneGraph(FakeCanvas())
+    graph.put("marker", SceneNode('oval', (0, 0, 10, 10), outline="lime"))
+    graph.sync()
+    graph.put("marker", SceneNode('rectangle', (0, 0, 10, 10), outline="lime"))
+    graph.sync()
+    assert graph.stats()["created"] == 2
+    assert graph.canvas.items[1][2]['state'] == "hidden"
+    assert_matches(graph)
+
+
+def test_removed_items_are_pooled_and_reused_with_reset_options():
+    graph = SceneGraph(FakeCanvas())
+    graph.put("a", SceneNode('oval', (0, 0, 10, 10), outline="lime", width=3, dash=(2, 2)))
+    graph.put("b", SceneNode('oval', (20, 0, 30, 10), outline="red"))
+    graph.sync()
+    graph.remove("a")
+    graph.sync()
+    assert graph.stats()["pooled"] == 1
+    assert graph.canvas.items[1][2]['state'] == "hidden"
+
+    graph.put("c", SceneNode('oval', (40, 0, 50, 10), fill="blue"))
+    graph.sync()
+    stats = graph.stats()
+    assert (stats["created"], stats["reused"], stats["items"]) == (2, 1, 2)
+    assert graph.canvas.shown(1) == ('oval', (40, 0, 50, 10), {'fill': "blue"})
+    assert_matches(graph)
+
+
+def test_restack_keeps_layers_with_few_moves():
+    graph = SceneGraph(FakeCanvas())
+    for i in range(5):
+        graph.put(f"n{i}", SceneNode('rectangle', (i, i, i + 5, i + 5), MODE_LAYER))
+    graph.put("hud", SceneNode('text', (0, 0), HUD_LAYER, text="hud"))
+    graph.sync()
+    raises = graph.stats()["raise_calls"]
+
+    # n5 reuses n1's pooled item, which is one move away from its place below the HUD
+    graph.remove("n1")
+    graph.put("n5", SceneNode('rectangle', (9, 9, 19, 19), MODE_LAYER))
+    graph.sync()
+    assert graph.stats()["raise_calls"] == raises + 1
+    assert_matches(graph)
+
+    graph.put("n0", SceneNode('rectangle', (0, 0, 5, 5), HUD_LAYER + 1))
+    graph.sync()
+    assert_matches(graph)
+
+
+def test_pool_reuses_item_ids_across_mode_switches():
+    graph = SceneGraph(FakeCanvas())
+    guides = {f"guide.{i}": SceneNode('oval', (i, 0, i + 10, 10), outline="lime", width=3) for i in range(3)}
+    cards = {f"card.{i}": SceneNode('oval', (0, i, 10, i + 10), fill="black") for i in range(2)}
+    for key, node in guides.items():
+        graph.put(key, node)
+    graph.sync()
+    guide_items = set(graph.canvas.items)
+
+    # Switch modes: the guides go away and the card reuses two of their items
+    for key in guides:
+        graph.remove(key)
+    for key, node in cards.items():
+        graph.put(key, node)
+    graph.sync()
+    stats = graph.stats()
+    assert (stats["created"], stats["reused"], stats["pooled"]) == (3, 2, 3)
+    assert set(graph.canvas.items) == guide_items and graph.canvas.deleted == []
+    for item in graph.canvas.stack:
+        if graph.canvas.items[item][2]['state'] != "hidden":
+            assert graph.canvas.shown(item)[2] == {'fill': "black"}     # outline and width reset
+    assert_matches(graph)
+
+    # And back: the guides take all three pooled items, nothing is created
+    for key in cards:
+        graph.remove(key)
+    for key, node in guides.items():
+        graph.put(key, node)
+    graph.sync()
+    stats = graph.stats()
+    assert (stats["created"], stats["reused"], stats["items"]) == (3, 5, 3)
+    assert graph.canvas.deleted == []
+    assert_matches(graph)
@@ -0,0 +1,124 @@
+import pytest
+from scheduler import RenderScheduler, TickScheduler
+
+
+class FakeClocks:
+    def __init__(self, mono, wall):
+        self.mono = mono
+        self.wall = wall
+
+    def advance(self, seconds):
+        self.mono += seconds
+        self.wall += seconds
+
+
+class FakeRoot:
+    """Tk `after` stand-in; `run_next` advances the clocks to the earliest job and runs it."""
+
+    def __init__(self, clocks):
+        self.clocks = clocks
+        self.jobs = {}
+        self._next_id = 0
+
+    def after(self, ms, callback):
+        self._next_id += 1
+        self.jobs[self._next_id] = (self.clocks.mono + ms / 1000, callback)
+        return self._next_id
+
+    def after_idle(self, callback):
+        return self.after(0, callback)
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_next(self):
+        job = min(self.jobs, key=lambda j: self.jobs[j][0])
+        at, callback = self.jobs.pop(job)
+        self.clocks.advance(max(0.0, at - self.clocks.mono))
+        callback()
+        return self.clocks.mono
+
+
+def make(mono=100.3, wall=1000.5):
+    clocks = FakeClocks(mono, wall)
+    root = FakeRoot(clocks)
+    ticks = TickScheduler(root, slack_ms=10, clock=lambda: clocks.mono, wall_clock=lambda: clocks.wall)
+    return clocks, root, ticks
+
+
+def test_tasks_fire_on_multiples_of_their_interval():
+    clocks, root, ticks = make()
+    runs = []
+    ticks.add("a", 1000, lambda: runs.append(clocks.mono))
+    for _ in range(3):
+        root.run_next()
+    assert runs == pytest.approx([101.0, 102.0, 103.0], abs=0.002)     # Tk timers are whole ms
+
+
+def test_wall_task_fires_on_the_wall_clock_minute():
+    clocks, root, ticks = make()
+    runs = []
+    ticks.add("clock", 60000, lambda: runs.append(clocks.wall), wall=True)
+    root.run_next()
+    root.run_next()
+    assert runs == pytest.approx([1020.0, 1080.0], abs=0.002)
+
+
+def test_tasks_due_within_slack_share_one_wakeup():
+    clocks, root, ticks = make(mono=0.0)
+    runs = []
+    ticks.add("a", 1000, lambda: runs.append(("a", clocks.mono)))
+    ticks.add("b", 1005, lambda: runs.append(("b", clocks.mono)))
+    root.run_next()
+    # One wakeup at the later due time, so neither task runs early
+    assert [name for name, _ in runs] == ["a", "b"]
+    assert [t for _, t in runs] == pytest.approx([1.005, 1.005], abs=0.002)
+    assert ticks.stats()["wakeups"] == 1
+
+
+def test_wall_clock_step_back_stalls_nothing():
+    clocks, root, ticks = make()
+    runs = []
+    ticks.add("frames", 1000, lambda: runs.append("frames"))
+    ticks.add("clock", 60000, lambda: runs.append("clock"), wall=True)
+    root.run_next()
+    clocks.wall -= 3600
+    start = clocks.mono
+    while clocks.mono - start < 61:
+        root.run_next()
+    assert runs.count("frames") >= 60
+    assert "clock" in runs
+
+
+def test_render_requests_within_a_frame_coalesce_into_one_render():
+    clocks, root, _ = make()
+    renders = []
+    scheduler = RenderScheduler(root, lambda: renders.append(clocks.mono), frame_ms=16)
+    for _ in range(10):
+        scheduler.request()
+    assert len(root.jobs) == 1
+    root.run_next()
+    assert len(renders) == 1 and not scheduler.pending
+
+    # Requests right after a render wait out the frame budget, still as one job
+    for _ in range(5):
+        scheduler.request()
+    assert len(root.jobs) == 1
+    due = next(iter(root.jobs.values()))[0]
+    assert due - clocks.mono > 0
+    root.run_next()
+    assert len(renders) == 2
+    assert scheduler.stats() == {"requested": 15, "rendered": 2, "dropped": 13}
+
+
+def test_render_flush_runs_the_pending_render_now():
+    clocks, root, _ = make()
+    renders = []
+    scheduler = RenderScheduler(root, lambda: renders.append(clocks.mono), frame_ms=16)
+    scheduler.request()
+    scheduler.request()
+    scheduler.flush()
+    assert renders == [clocks.mono]
+    assert root.jobs == {} and not scheduler.pending
+    scheduler.flush()
+    assert len(renders) == 1
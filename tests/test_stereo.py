@@ -0,0 +1,39 @@
+from PIL import Image
+from image_processing import load_optional_modules, roi_box
+from modes.carscan_mode import RING_RADIUS, guide_target
+from config import DETECTION_ROI_MARGIN
+from offscreen_renderer import default_lens_params
+from stereo import StereoFrame
+from ui_components import lens_geometry
+
+SIZE = (1000, 520)
+
+
+def stereo_frame():
+    load_optional_modules()
+    params = default_lens_params()
+    geometry = lens_geometry(SIZE, params['ipd'], params['lens_w_ratio'], params['lens_h_ratio'])
+    stereo = StereoFrame(SIZE)
+    stereo.render(Image.new("RGBA", SIZE), geometry)
+    return stereo
+
+
+def test_right_side_target_maps_into_the_right_eye():
+    stereo = stereo_frame()
+    center = guide_target(4, *SIZE)                     # x=0.80
+    roi = roi_box(center, RING_RADIUS + DETECTION_ROI_MARGIN, SIZE)
+    assert roi[0] >= stereo.windows[0] + stereo.eye_width  # entirely right of the left window
+    eye = stereo.eye_at((roi[0] + roi[2]) / 2)
+    assert eye == 1
+    view = stereo.to_view(roi, eye=eye)
+    cx, cy = stereo.point_to_view(center, eye=eye)
+    assert stereo.eye_width <= view[0] < cx < view[2] <= stereo.size[0]
+    assert stereo.to_frame(cx, cy) == tuple(center)
+
+
+def test_left_side_target_stays_in_the_left_eye():
+    stereo = stereo_frame()
+    center = guide_target(2, *SIZE)                     # x=0.20
+    eye = stereo.eye_at(center[0])
+    assert eye == 0
+    assert stereo.to_frame(*stereo.point_to_view(center, eye=eye)) == tuple(center)
@@ -1,18 +1,245 @@
 """UI components and overlay generation for the iVision application."""
+from collections import OrderedDict
+import math
+import threading
 from PIL import Image, ImageDraw
-from config import COLORS, DEFAULT_BRIDGE_MIN
+from config import (COLORS, DEFAULT_BRIDGE_MIN, IPD_RANGE, LENS_W_RANGE, LENS_H_RANGE,
+                    OVERLAY_CACHE_SIZE, OVERLAY_PREWARM_STEPS)
 import time
+from scene_graph import SceneNode, HUD_LAYER, TOPMOST_TAG
+
+
+def lens_geometry(size, ipd_px, lens_w_ratio, lens_h_ratio, bridge_min=DEFAULT_BRIDGE_MIN):
+    """Return (left_bbox, right_bbox) of the lenses, each [x1, y1, x2, y2] in canvas coords."""
+    w, h = size
+    cx = w // 2
+    cy = int(h * 0.53)
+    lw = int(w * lens_w_ratio)
+    lh = int(h * lens_h_ratio)
+    ipd_eff = max(ipd_px, lw + bridge_min)
+    
+    lx_c = (cx - ipd_eff // 2, cy)
+    rx_c = (cx + ipd_eff // 2, cy)
+    
+    def bbox(c):
+        x, y = c
+        return [x - lw//2, y - lh//2, x + lw//2, y + lh//2]
+        
+    return bbox(lx_c), bbox(rx_c)
+
+
+def hud_positions(lens_geometry):
+    """Return {item: (x, y)} anchor points of the HUD items for the given lens geometry."""
+    lx, rx = lens_geometry
+    lw, lh = lx[2]-lx[0], lx[3]-lx[1]
+    return {
+        # Time: top-left of left lens
+        'time': (lx[0] + int(0.08 * lw), lx[1] + int(0.12 * lh)),
+        # Battery: top-right of left lens
+        'battery': (lx[2] - int(0.10 * lw), lx[1] + int(0.12 * lh)),
+        # Navigation: top-right of right lens
+        'navigation': (rx[2] - int(0.08 * (rx[2]-rx[0])), rx[1] + int(0.12 * (rx[3]-rx[1]))),
+        # Performance stats: bottom-left of left lens
+        'perf': (lx[0] + int(0.18 * lw), lx[3] - int(0.18 * lh))
+    }
+
+
+HUD_DEFAULT_TEXT = {
+    'battery': "56% 🔋",
+    'navigation': "23 mins →"
+}
+
+HUD_FONTS = {
+    'time': ("Helvetica", 18, "bold"),
+    'battery': ("Helvetica", 14),
+    'navigation': ("Helvetica", 14),
+    'perf': ("Courier", 10)
+}
+
+
+def slider_grid(value, value_range, steps):
+    """Return slider values within `steps` resolution steps of `value`, nearest first."""
+    lo, hi, res = value_range
+    values = []
+    for i in range(1, steps + 1):
+        for v in (value - i * res, value + i * res):
+            v = round(v, 2)
+            if lo <= v <= hi:
+                values.append(v)
+    return values
+
+def _union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+def _rounded_band(a, b, radius, width):
+    """Boxes covering where two filled, outlined rounded rectangles can differ.
+
+    Only the edges and corners that moved: an edge strip spans the old and
+    new edge plus the outline (drawn inside), a corner box the old and new
+    corner squares.
+    """
+    u = _union(a, b)
+    boxes = []
+    for i, inward in ((0, 1), (1, 1), (2, -1), (3, -1)):
+        if a[i] != b[i]:
+            lo, hi = _reach(a[i], b[i], inward, width + 3)
+            boxes.append((lo, u[1], hi, u[3]) if i % 2 == 0 else (u[0], lo, u[2], hi))
+    for xi, xin in ((0, 1), (2, -1)):
+        for yi, yin in ((1, 1), (3, -1)):
+            if a[xi] != b[xi] or a[yi] != b[yi]:
+                x1, x2 = _reach(a[xi], b[xi], xin, radius + 3)
+                y1, y2 = _reach(a[yi], b[yi], yin, radius + 3)
+                boxes.append((x1, y1, x2, y2))
+    return boxes
+
+def _reach(p, q, inward, depth):
+    """Span from two edge positions `p`, `q` to `depth` px inside, plus a little outside."""
+    lo, hi = min(p, q), max(p, q)
+    return (lo - 2, hi + depth) if inward > 0 else (lo - depth, hi + 3)
+
+def _half_width(ellipse, y):
+    """Half the width of an ellipse (cx, cy, a, b) at row `y`, or None outside it."""
+    cx, cy, a, b = ellipse
+    t = 1 - ((y - cy) / b) ** 2 if a > 0 and b > 0 else 0
+    return a * math.sqrt(t) if t > 0 else None
+
+def _ellipse_band(bboxes, grow, shrink, slabs=8):
+    """Boxes, in horizontal slabs, covering the ellipses in `bboxes` grown by `grow`
+    px, except what lies inside all of them shrunk by `shrink` px."""
+    outers = [((x1 + x2) / 2, (y1 + y2) / 2, (x2 - x1) / 2 + grow, (y2 - y1) / 2 + grow) for x1, y1, x2, y2 in bboxes]
+    inners = [(cx, cy, a - grow - shrink, b - grow - shrink) for cx, cy, a, b in outers]
+    top = math.floor(min(cy - b for _, cy, _, b in outers))
+    bottom = math.ceil(max(cy + b for _, cy, _, b in outers)) + 1
+    step = -(-(bottom - top) // slabs)
+    boxes = []
+    for y1 in range(top, bottom, step):
+        y2 = min(y1 + step, bottom)
+        # Widest extent of the outer ellipses in the slab: at the row nearest their centre
+        spans = [(e[0] - hw, e[0] + hw) for e in outers
+                 if (hw := _half_width(e, min(max(e[1], y1), y2))) is not None]
+        if not spans:
+            continue
+        x1, x2 = math.floor(min(s[0] for s in spans)) - 1, math.ceil(max(s[1] for s in spans)) + 2
+        # Narrowest extent of the inner ellipses: at the row farthest from their centre
+        hx1, hx2 = x1, x2
+        for e in inners:
+            hw = _half_width(e, y1 if abs(y1 - e[1]) > abs(y2 - e[1]) else y2)
+            if hw is None:
+                hx1 = hx2
+                break
+            hx1, hx2 = max(hx1, math.ceil(e[0] - hw) + 1), min(hx2, math.floor(e[0] + hw) - 1)
+        if hx1 >= hx2:
+            boxes.append((x1, y1, x2, y2))
+        else:
+            boxes += [(x1, y1, hx1, y2), (hx2, y1, x2, y2)]
+    return boxes
 
 
 class GlassesOverlay:
-    """Generates realistic AR glasses overlay with adjustable parameters."""
+    """Generates realistic AR glasses overlay with adjustable parameters.
+
+    Generated overlays are kept in a bounded LRU cache. Cached images are shared
+    between callers and must be treated as read-only.
+    """
     
-    def __init__(self, size=(1000, 520)):
+    def __init__(self, size=(1000, 520), cache_size=OVERLAY_CACHE_SIZE, scale=1.0):
         self.size = size
-        
+        self.scale = scale      # fixed pixel sizes (rims, margins) are multiplied by this
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        # Background pre-warm worker (started lazily)
+        self._prewarm_event = threading.Event()
+        self._prewarm_request = None
+        self._prewarm_thread = None
+
+    def _cache_key(self, ipd_px, lens_w_ratio, lens_h_ratio, bridge_min, lower_bar_h_ratio):
+        """Key on the derived pixel geometry so equivalent parameters share an entry."""
+        w, h = self.size
+        lw, lh = int(w * lens_w_ratio), int(h * lens_h_ratio)
+        ipd_eff = max(ipd_px, lw + bridge_min)
+        return (w, h, ipd_eff, lw, lh, bridge_min, int(h * lower_bar_h_ratio), COLORS['glass_tint'])
+
     def generate(self, ipd_px=240, lens_w_ratio=0.30, lens_h_ratio=0.56, 
                  bridge_min=DEFAULT_BRIDGE_MIN, lower_bar_h_ratio=0.12):
-        """Generate glasses overlay and return (overlay_rgba, knob_bbox)."""
+        """Return (overlay_rgba, knob_bbox), rendering only on a cache miss."""
+        key = self._cache_key(ipd_px, lens_w_ratio, lens_h_ratio, bridge_min, lower_bar_h_ratio)
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = self._render(ipd_px, lens_w_ratio, lens_h_ratio, bridge_min, lower_bar_h_ratio)
+        self._store(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        """Insert an entry and evict the least recently used ones."""
+        with self._cache_lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        """Drop all cached overlays (e.g. after changing COLORS['glass_tint'])."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def prewarm(self, ipd_px, lens_w_ratio, lens_h_ratio):
+        """Warm the cache in the background for slider values around the given ones.
+
+        Only the latest request is served; an in-progress warm-up is abandoned as
+        soon as a newer one arrives.
+        """
+        self._prewarm_request = (ipd_px, lens_w_ratio, lens_h_ratio)
+        self._prewarm_event.set()
+        if self._prewarm_thread is None:
+            self._prewarm_thread = threading.Thread(target=self._prewarm_loop,
+                                                    name="overlay-prewarm", daemon=True)
+            self._prewarm_thread.start()
+
+    def _prewarm_candidates(self, ipd_px, lens_w_ratio, lens_h_ratio):
+        """Yield parameter sets one slider at a time, nearest values first."""
+        steps = OVERLAY_PREWARM_STEPS
+        ipds = slider_grid(ipd_px, IPD_RANGE, steps['ipd'])
+        widths = slider_grid(lens_w_ratio, LENS_W_RANGE, steps['lens_w'])
+        heights = slider_grid(lens_h_ratio, LENS_H_RANGE, steps['lens_h'])
+        for i in range(max(len(ipds), len(widths), len(heights))):
+            if i < len(ipds):
+                yield int(ipds[i]), lens_w_ratio, lens_h_ratio
+            if i < len(widths):
+                yield ipd_px, widths[i], lens_h_ratio
+            if i < len(heights):
+                yield ipd_px, lens_w_ratio, heights[i]
+
+    def _prewarm_loop(self):
+        """Worker thread: render missing overlays for the latest prewarm request."""
+        while True:
+            self._prewarm_event.wait()
+            self._prewarm_event.clear()
+            request = self._prewarm_request
+            budget = max(self.cache_size - 1, 0)
+            for params in self._prewarm_candidates(*request):
+                if self._prewarm_event.is_set() or budget == 0:
+                    break
+                budget -= 1
+                key = self._cache_key(*params, DEFAULT_BRIDGE_MIN, 0.12)
+                with self._cache_lock:
+                    if key in self._cache:
+                        self._cache.move_to_end(key)
+                        continue
+                self._store(key, self._render(*params))
+
+    def _render(self, ipd_px=240, lens_w_ratio=0.30, lens_h_ratio=0.56,
+                bridge_min=DEFAULT_BRIDGE_MIN, lower_bar_h_ratio=0.12):
+        """Rasterize glasses overlay and return (overlay_rgba, knob_bbox)."""
         w, h = self.size
         overlay = Image.new("RGBA", (w, h), (0, 0, 0, 0))
         draw = ImageDraw.Draw(overlay)
@@ -38,18 +265,67 @@ class GlassesOverlay:
         self._draw_frame(draw, lx_c, rx_c, lw, lh, cy)
         
         # Draw tinted lenses on top
-        self._draw_tint(draw, lens_bbox, lx_c, rx_c, lw)
+        self._draw_tint(draw, lens_bbox, lx_c, rx_c)
         
         # Draw rims last so they're on top
-        self._draw_rims(draw, lens_bbox, lx_c, rx_c, lw)
+        self._draw_rims(draw, lens_bbox, lx_c, rx_c, self._px(10))
         
         self._draw_bottom_bar(draw, w, h, lower_bar_h_ratio)
 
         return overlay, knob_bbox
 
+    def _layout(self, ipd_px=240, lens_w_ratio=0.30, lens_h_ratio=0.56,
+                bridge_min=DEFAULT_BRIDGE_MIN, lower_bar_h_ratio=0.12):
+        """Boxes of what `_render` draws: (lens ellipses, frame, other parts padded by a pixel or two)."""
+        w, h = self.size
+        cx, cy = w // 2, int(h * 0.53)
+        lw, lh = int(w * lens_w_ratio), int(h * lens_h_ratio)
+        ipd_eff = max(ipd_px, lw + bridge_min)
+        lx, rx = cx - ipd_eff // 2, cx + ipd_eff // 2
+        lenses = [(x - lw//2, cy - lh//2, x + lw//2, cy + lh//2) for x in (lx, rx)]
+        margin = self._px(20) + 2
+        frame = (lx - lw//2 - margin, cy - lh//2 - margin, rx + lw//2 + margin + 1, cy + lh//2 + margin + 1)
+
+        bx1, bx2, by = lx + lw//2, rx - lw//2, cy - lh//8
+        bridge = (min(bx1, bx2) - 2, by - 2, max(bx1, bx2) + 3,
+                  max(by + max(self._px(4), bridge_min//2), cy + self._px(4)) + 3)
+        arm_h = int(lh * 0.18)
+        left_arm = (int(w*0.03) - 2, cy - arm_h//2 - 2, lx - lw//2 + self._px(10) + 3, cy + arm_h//2 + 3)
+        crown_r = arm_h//2 + self._px(8)
+        right_arm = (min(rx + lw//2 - self._px(10), int(w*0.97) - 2*crown_r - self._px(6)) - 2,
+                     cy - max(arm_h//2, crown_r) - 2, int(w*0.97) + 3, cy + max(arm_h//2, crown_r) + 3)
+        bottom = int(h * 0.90)
+        bar = (int(w * 0.18) - 2, bottom - int(h * lower_bar_h_ratio) - 2, int(w * 0.82) + 3,
+               bottom + self._px(8) + 3)
+        return lenses, frame, (bridge, left_arm, right_arm, bar)
+
+    def changed_boxes(self, old, new):
+        """Boxes where the overlays for two `generate` argument tuples can differ.
+
+        Worked out from the geometry alone, so no pixels are compared: a part
+        that moved or resized contributes its old and new extent, and the
+        unchanged middle of the lenses (solid tint) and of the frame is left out.
+        """
+        (old_lenses, old_frame, old_parts), (lenses, frame, parts) = self._layout(*old), self._layout(*new)
+        boxes = []
+        for a, b in zip(old_lenses, lenses):
+            if a != b:
+                # Inside the rims it is all tint; the drop shadows reach a little outside
+                boxes += _ellipse_band((a, b), grow=self._px(6) * 1.5 + 2, shrink=self._px(10) + 2)
+        if old_frame != frame:
+            boxes += _rounded_band(old_frame, frame, radius=self._px(40), width=self._px(8))
+        for a, b in zip(old_parts, parts):
+            if a != b:
+                boxes.append(_union(a, b))
+        return boxes
+
+    def _px(self, value):
+        """A fixed pixel size at this overlay's scale."""
+        return max(1, int(round(value * self.scale)))
+
     def _draw_shadow(self, draw, lens_bbox, lx_c, rx_c):
         """Draw drop shadow for lenses."""
-        for off in range(2, 8, 2):
+        for off in (self._px(2), self._px(4), self._px(6)):
             for center in [lx_c, rx_c]:
                 bbox = lens_bbox(center)
                 shadow_bbox = [bbox[0]+off, bbox[1]+off, bbox[2]+off, bbox[3]+off]
@@ -69,45 +345,46 @@ class GlassesOverlay:
         by = cy - lh//8
         
         if bx2 > bx1:
-            draw.rectangle([bx1, by, bx2, by + max(4, bridge_min//2)], fill=rim_color)
+            draw.rectangle([bx1, by, bx2, by + max(self._px(4), bridge_min//2)], fill=rim_color)
         else:
             draw.line([(lx_c[0] + lw // 2, cy), (rx_c[0] - lw // 2, cy)], 
-                     fill=rim_color, width=4)
+                     fill=rim_color, width=self._px(4))
 
     def _draw_arms(self, draw, w, h, lx_c, rx_c, lw, lh, cy):
         """Draw temple arms and digital crown. Returns knob_bbox."""
         arm_h = int(lh * 0.18)
         
         # Left arm
-        draw.rounded_rectangle([int(w*0.03), cy - arm_h//2, lx_c[0] - lw//2 + 10, cy + arm_h//2],
+        draw.rounded_rectangle([int(w*0.03), cy - arm_h//2, lx_c[0] - lw//2 + self._px(10), cy + arm_h//2],
                               radius=arm_h//2, fill=(22,22,22,255))
         
         # Right arm
-        right_arm_box = [rx_c[0] + lw//2 - 10, cy - arm_h//2, int(w*0.97), cy + arm_h//2]
+        right_arm_box = [rx_c[0] + lw//2 - self._px(10), cy - arm_h//2, int(w*0.97), cy + arm_h//2]
         draw.rounded_rectangle(right_arm_box, radius=arm_h//2, fill=(22,22,22,255))
 
         # Digital crown
-        crown_r = arm_h//2 + 8
-        crown_cx = right_arm_box[2] - crown_r - 6
+        crown_r = arm_h//2 + self._px(8)
+        crown_cx = right_arm_box[2] - crown_r - self._px(6)
         crown_cy = cy
         
         draw.ellipse([crown_cx - crown_r, crown_cy - crown_r, crown_cx + crown_r, crown_cy + crown_r],
-                    fill=(30,30,30,255), outline=(12,12,12,255), width=3)
-        draw.ellipse([crown_cx - crown_r + 6, crown_cy - crown_r + 6,
-                     crown_cx + crown_r - 6, crown_cy + crown_r - 6],
-                    outline=(80,80,80,255), width=2)
+                    fill=(30,30,30,255), outline=(12,12,12,255), width=self._px(3))
+        inset = self._px(6)
+        draw.ellipse([crown_cx - crown_r + inset, crown_cy - crown_r + inset,
+                     crown_cx + crown_r - inset, crown_cy + crown_r - inset],
+                    outline=(80,80,80,255), width=self._px(2))
         
         return (crown_cx - crown_r, crown_cy - crown_r, crown_cx + crown_r, crown_cy + crown_r)
 
     def _draw_frame(self, draw, lx_c, rx_c, lw, lh, cy):
         """Draw outer frame."""
-        frame_margin = 20
+        frame_margin = self._px(20)
         frame_box = [lx_c[0] - lw//2 - frame_margin,
                     cy - lh//2 - frame_margin,
                     rx_c[0] + lw//2 + frame_margin,
                     cy + lh//2 + frame_margin]
-        draw.rounded_rectangle(frame_box, radius=40,
-                              outline=(220,220,220,255), width=8, fill=(40,40,40,80))  # Reduced opacity
+        draw.rounded_rectangle(frame_box, radius=self._px(40),
+                              outline=(220,220,220,255), width=self._px(8), fill=(40,40,40,80))  # Reduced opacity
 
     def _draw_tint(self, draw, lens_bbox, lx_c, rx_c, rim_w=10):
         """Draw lens tint and final rims."""
@@ -123,62 +400,123 @@ class GlassesOverlay:
         sb_top = bottom - int(h * lower_bar_h_ratio)
         sb_left = int(w * 0.18)
         sb_right = int(w * 0.82)
-        draw.rectangle([sb_left, sb_top, sb_right, bottom+8], fill=(20, 20, 20, 255))
+        draw.rectangle([sb_left, sb_top, sb_right, bottom + self._px(8)], fill=(20, 20, 20, 255))
+
+
+def hud_nodes(lens_geometry, texts, perf_visible=False):
+    """SceneNodes for the HUD text items, keyed 'hud.<item>'."""
+    nodes = {}
+    for name, (x, y) in hud_positions(lens_geometry).items():
+        options = {'text': texts.get(name, ""), 'fill': COLORS['hud_text'], 'font': HUD_FONTS[name]}
+        if name == 'perf':
+            options.update(anchor="sw", state="normal" if perf_visible else "hidden")
+        nodes[f"hud.{name}"] = SceneNode('text', (x, y), HUD_LAYER, **options)
+    return nodes
 
 
 class HUDManager:
-    """Manages heads-up display elements."""
+    """Manages heads-up display elements as nodes of the overlay scene graph.
+
+    Item texts come from HUD providers refreshed by a TickScheduler; a text is
+    only pushed to the scene when its value changes.
+    """
     
-    def __init__(self, canvas, canvas_w, canvas_h):
+    def __init__(self, canvas, canvas_w, canvas_h, scene, ticks=None):
         self.canvas = canvas
         self.canvas_w = canvas_w
         self.canvas_h = canvas_h
-        self.hud_items = {}
+        self.scene = scene
+        self.ticks = ticks
+        self.providers = {}
+        self.texts = {}
+        self.perf_visible = False
         
     def create_items(self):
-        """Create HUD items."""
-        time_text = time.strftime("%H:%M")
-        self.hud_items['time'] = self.canvas.create_text(0, 0, text=time_text, fill=COLORS['hud_text'],
-                                                         font=("Helvetica", 18, "bold"))
-        self.hud_items['battery'] = self.canvas.create_text(0, 0, text="56% 🔋", fill=COLORS['hud_text'],
-                                                           font=("Helvetica", 14))
-        self.hud_items['navigation'] = self.canvas.create_text(0, 0, text="23 mins →", fill=COLORS['hud_text'],
-                                                              font=("Helvetica", 14))
+        """Set the initial HUD texts; nodes are added by `position_items`."""
+        self.texts = {'time': time.strftime("%H:%M"), **HUD_DEFAULT_TEXT, 'perf': ""}
+        self.perf_visible = False
         
     def position_items(self, lens_geometry):
         """Position HUD items based on lens geometry."""
-        lx, rx = lens_geometry
-        lw, lh = lx[2]-lx[0], lx[3]-lx[1]
-
-        # Time: top-left of left lens
-        time_x = lx[0] + int(0.08 * lw)
-        time_y = lx[1] + int(0.12 * lh)
-        self.canvas.coords(self.hud_items['time'], time_x, time_y)
-
-        # Battery: top-right of left lens
-        batt_x = lx[2] - int(0.10 * lw)
-        batt_y = lx[1] + int(0.12 * lh)
-        self.canvas.coords(self.hud_items['battery'], batt_x, batt_y)
-
-        # Navigation: top-right of right lens
-        nav_x = rx[2] - int(0.08 * (rx[2]-rx[0]))
-        nav_y = rx[1] + int(0.12 * (rx[3]-rx[1]))
-        self.canvas.coords(self.hud_items['navigation'], nav_x, nav_y)
-
-        self.raise_items()
-        
-    def raise_items(self):
-        """Bring HUD items to front."""
-        for item in self.hud_items.values():
-            if item:
-                self.canvas.tag_raise(item)
+        for key, node in hud_nodes(lens_geometry, self.texts, self.perf_visible).items():
+            self.scene.put(key, node)
+            
+    def add_provider(self, provider, active=True):
+        """Feed HUD item `provider.name` from `provider`, refreshed at its interval."""
+        self.providers[provider.name] = provider
+        if active:
+            self._start(provider.name)
+            
+    def _start(self, name):
+        self.refresh(name)
+        if self.ticks is not None:
+            provider = self.providers[name]
+            self.ticks.add(f"hud.{name}", provider.interval_ms, lambda: self.refresh(name), wall=provider.wall)
+            
+    def refresh(self, name):
+        """Read provider `name` now and show its value if it changed."""
+        text = self.providers[name].read()
+        if text is not None:
+            self._set_text(name, text)
                 
-    def update_time(self):
-        """Update time display."""
-        if 'time' in self.hud_items:
-            self.canvas.itemconfigure(self.hud_items['time'], text=time.strftime("%H:%M"))
+    def _set_text(self, name, text):
+        if self.texts.get(name) == text:
+            return
+        self.texts[name] = text
+        if f"hud.{name}" in self.scene:
+            self.scene.update(f"hud.{name}", text=text)
+            
+    def set_perf_visible(self, visible):
+        """Show or hide the performance stats item (its provider only runs while shown)."""
+        self.perf_visible = visible
+        if "hud.perf" in self.scene:
+            self.scene.update("hud.perf", state="normal" if visible else "hidden")
+        if 'perf' in self.providers:
+            if visible:
+                self._start('perf')
+            elif self.ticks is not None:
+                self.ticks.remove("hud.perf")
             
     def update_navigation(self, text):
         """Update navigation display."""
-        if 'navigation' in self.hud_items:
-            self.canvas.itemconfigure(self.hud_items['navigation'], text=text)
\ No newline at end of file
+        self._set_text('navigation', text)
+
+class StatusToast:
+    """Non-modal status message drawn on the canvas that hides itself after a delay."""
+    
+    def __init__(self, canvas, canvas_w, canvas_h, duration_ms=2500):
+        self.canvas = canvas
+        self.canvas_w = canvas_w
+        self.canvas_h = canvas_h
+        self.duration_ms = duration_ms
+        self.bg_item = None
+        self.text_item = None
+        self._hide_job = None
+        
+    def show(self, text):
+        """Show (or replace) the toast message."""
+        x, y = self.canvas_w // 2, int(self.canvas_h * 0.06)
+        if self.text_item is None:
+            self.bg_item = self.canvas.create_rectangle(0, 0, 0, 0, fill="#0f0f0f",
+                                                        outline=COLORS['hud_text'], tags=(TOPMOST_TAG,))
+            self.text_item = self.canvas.create_text(x, y, text=text, fill=COLORS['hud_text'],
+                                                     font=("Helvetica", 12), tags=(TOPMOST_TAG,))
+        else:
+            self.canvas.itemconfigure(self.text_item, text=text, state="normal")
+            self.canvas.itemconfigure(self.bg_item, state="normal")
+
+        x1, y1, x2, y2 = self.canvas.bbox(self.text_item)
+        self.canvas.coords(self.bg_item, x1 - 10, y1 - 4, x2 + 10, y2 + 4)
+        self.canvas.tag_raise(self.bg_item)
+        self.canvas.tag_raise(self.text_item)
+
+        if self._hide_job is not None:
+            self.canvas.after_cancel(self._hide_job)
+        self._hide_job = self.canvas.after(self.duration_ms, self.hide)
+        
+    def hide(self):
+        """Hide the toast."""
+        self._hide_job = None
+        if self.text_item is not None:
+            self.canvas.itemconfigure(self.text_item, state="hidden")
+            self.canvas.itemconfigure(self.bg_item, state="hidden")